@@ -0,0 +1,204 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ..profiling import profiler
+from .dependencies import require_permission
+from .firebase_auth import firebase_auth
+from .models import ProfilingRequest, UserImportRequest
+from .principal import Principal
+from .ratelimit import rate_limiter
+
+router = APIRouter(prefix="/auth/admin", tags=["admin"])
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def _read_import_records(request: Request) -> List[Any]:
+    """Parse a JSON array or NDJSON request body into raw records"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        records = []
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            records.extend(line for line in lines if line.strip())
+        if buffer.strip():
+            records.append(buffer)
+        return records
+
+    body = await request.body()
+    try:
+        records = json.loads(body)
+    except json.JSONDecodeError:
+        records = None
+    if not isinstance(records, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a JSON array or NDJSON body"
+        )
+    return records
+
+
+async def _import_chunk(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return await firebase_auth.import_users(users) if users else []
+
+
+async def _batch_create_results(records: List[Any]) -> AsyncIterator[bytes]:
+    """Import users chunk by chunk and yield one NDJSON result line per record, in input order"""
+    # Each slot is (index, validation error result or None for a record sent to Firebase)
+    pending: Deque[Tuple[List[Tuple[int, Optional[Dict[str, Any]]]], "asyncio.Task[List[Dict[str, Any]]]"]] = deque()
+    slots: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+    users: List[Dict[str, Any]] = []
+
+    def submit():
+        nonlocal slots, users
+        pending.append((slots, asyncio.ensure_future(_import_chunk(users))))
+        slots, users = [], []
+
+    async def drain_oldest() -> bytes:
+        chunk_slots, task = pending.popleft()
+        results = iter(await task)
+        lines = []
+        for index, invalid in chunk_slots:
+            result = invalid if invalid is not None else next(results)
+            lines.append(json.dumps({"index": index, **result}, default=str).encode("utf-8") + b"\n")
+        return b"".join(lines)
+
+    try:
+        for index, raw_record in enumerate(records):
+            try:
+                if isinstance(raw_record, (bytes, str)):
+                    record = UserImportRequest.model_validate_json(raw_record)
+                else:
+                    record = UserImportRequest.model_validate(raw_record)
+            except ValidationError as e:
+                slots.append((index, {"status": "invalid", "error": e.errors(include_url=False, include_input=False)}))
+                continue
+
+            slots.append((index, None))
+            users.append(record.model_dump())
+            if len(users) >= firebase_auth.import_chunk_size:
+                submit()
+                if len(pending) >= firebase_auth.import_concurrency:
+                    yield await drain_oldest()
+
+        if slots:
+            submit()
+        while pending:
+            yield await drain_oldest()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+@router.post("/users:batchCreate")
+async def batch_create_users(
+    request: Request,
+    current_user: Principal = Depends(require_permission("users:import"))
+):
+    """
+    Create users in bulk from a JSON array or NDJSON body, streaming back one result per record
+    """
+    records = await _read_import_records(request)
+    return StreamingResponse(_batch_create_results(records), media_type="application/x-ndjson")
+
+
+def _export_line(user_record: Any, page_token: Optional[str]) -> bytes:
+    """Serialize a user record with the fields UserResponse exposes"""
+    custom_claims = user_record.custom_claims or {}
+    return json.dumps({
+        "id": user_record.uid,
+        "email": user_record.email,
+        "first_name": custom_claims.get("first_name", ""),
+        "last_name": custom_claims.get("last_name", ""),
+        "is_active": not user_record.disabled,
+        "created_at": str(user_record.user_metadata.creation_timestamp),
+        "page_token": page_token
+    }).encode("utf-8") + b"\n"
+
+
+async def _export_users(page_token: Optional[str], page_size: int) -> AsyncIterator[bytes]:
+    """Yield one NDJSON chunk per page, prefetching the next page while the current one is sent"""
+    next_page = asyncio.ensure_future(firebase_auth.list_users_page(page_token, page_size))
+    try:
+        while next_page is not None:
+            page = await next_page
+            next_page = None
+            if page.next_page_token:
+                next_page = asyncio.ensure_future(firebase_auth.list_users_page(page.next_page_token, page_size))
+
+            yield b"".join(_export_line(user_record, page_token) for user_record in page.users)
+            page_token = page.next_page_token
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+
+
+@router.get("/users:export")
+async def export_users(
+    page_token: Optional[str] = None,
+    page_size: int = Query(1000, ge=1, le=1000),
+    current_user: Principal = Depends(require_permission("users:export"))
+):
+    """
+    Stream every user as NDJSON, one page at a time.
+    Each line carries the page_token of its page; pass it back to resume an interrupted export.
+    """
+    return StreamingResponse(_export_users(page_token, page_size), media_type="application/x-ndjson")
+
+
+@router.get("/transport")
+async def transport_stats(current_user: Principal = Depends(require_permission("stats:read"))):
+    """
+    Connection pool sizes, open connections and reuse ratios for Firebase/Google traffic
+    """
+    return firebase_auth.transport.stats()
+
+
+@router.get("/backend")
+async def backend_stats(current_user: Principal = Depends(require_permission("stats:read"))):
+    """
+    Circuit breaker state, concurrency limit and rejections of each Firebase operation in this worker
+    """
+    return firebase_auth.backend_guard.stats()
+
+
+@router.get("/rate-limits")
+async def rate_limit_stats(current_user: Principal = Depends(require_permission("stats:read"))):
+    """
+    Configured rate limits, their store and the number of keys tracked in this worker
+    """
+    return rate_limiter.stats()
+
+
+@router.get("/profiling")
+async def profiling_status(current_user: Principal = Depends(require_permission("stats:read"))):
+    """
+    Whether request profiling is on in this worker, its sample rate and where profiles are written
+    """
+    return profiler.stats()
+
+
+@router.put("/profiling")
+async def set_profiling(
+    body: ProfilingRequest,
+    current_user: Principal = Depends(require_permission("profiling:write"))
+):
+    """
+    Turn request profiling on or off in the worker that serves this request.
+    Turning it off writes the session's folded-stack profiles.
+    """
+    if body.enabled:
+        profiler.enable(body.sample_rate)
+        return profiler.stats()
+
+    files = profiler.disable()
+    return {**profiler.stats(), "files": files}
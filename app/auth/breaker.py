@@ -0,0 +1,265 @@
+"""
+Circuit breakers and adaptive concurrency limits for Firebase backend calls.
+
+Each backend operation (verify_id_token, get_user, sign_in_with_password, ...)
+gets its own guard. The circuit breaker opens when too many recent calls
+failed or were slow, fails calls fast while open, and lets one probe through
+per cooldown until a probe succeeds. The concurrency limit is AIMD: it grows
+by one per limit's worth of fast successes and shrinks by a factor on every
+failure or slow call; calls beyond it are rejected at once instead of queueing
+behind a slow backend. Both reject with BackendUnavailableError, served as 503.
+
+Guards are entered and left on the event loop thread, so they take no lock.
+"""
+
+import contextlib
+import os
+import time
+from collections import deque
+from typing import Any, ContextManager, Deque, Dict, Optional
+
+from ..metrics import BACKEND_REJECTED
+
+# Error codes of the Admin SDK (FirebaseError.code) that mean the backend, not the request, failed
+BACKEND_FAILURE_CODES = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "UNKNOWN", "RESOURCE_EXHAUSTED"}
+# Exception class names (requests, httpx, google-auth) that mean the same
+BACKEND_FAILURE_NAMES = ("Timeout", "Connect", "Unavailable", "DeadlineExceeded", "InternalError")
+
+
+class BackendUnavailableError(Exception):
+    """Raised instead of calling a backend operation whose breaker is open or whose limit is reached"""
+
+    def __init__(self, operation: str, reason: str, retry_after: float):
+        super().__init__(f"{operation} unavailable: {reason}")
+        self.operation = operation
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Whether an error counts against the backend (timeouts, 5xx) rather than the caller (bad token)"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, str) and (code in BACKEND_FAILURE_CODES or code.startswith("HTTP_5")):
+        return True
+    name = type(error).__name__
+    return any(marker in name for marker in BACKEND_FAILURE_NAMES)
+
+
+def unavailable(operation: str, error: BaseException) -> BackendUnavailableError:
+    """Report a failed backend call as unavailable (503 + Retry-After) rather than the caller's fault"""
+    return BackendUnavailableError(operation, f"backend failure: {error}", 1.0)
+
+
+class CircuitBreaker:
+    """Opens when the failure ratio over the last `window` calls reaches `failure_ratio`"""
+
+    def __init__(self, failure_ratio: float = 0.5, window: int = 20, min_calls: int = 10, cooldown: float = 5.0):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def allow(self, now: float) -> bool:
+        """Whether a call may go ahead; while open, one probe is let through per cooldown"""
+        if self.state == "closed":
+            return True
+        if now < self._retry_at:
+            return False
+        self.state = "half_open"
+        self._retry_at = now + self.cooldown
+        return True
+
+    def retry_after(self, now: float) -> float:
+        return max(self._retry_at - now, 0.0)
+
+    def record(self, failed: bool, now: float) -> None:
+        if self.state == "open":
+            # Finished after the breaker opened; the next probe decides
+            return
+        if self.state == "half_open":
+            # The probe decides: close with a clean window, or stay open for another cooldown
+            if failed:
+                self._open(now)
+            else:
+                self.state = "closed"
+                self._outcomes.clear()
+                self._failures = 0
+            return
+
+        outcomes = self._outcomes
+        if len(outcomes) == outcomes.maxlen and outcomes[0]:
+            self._failures -= 1
+        outcomes.append(failed)
+        if failed:
+            self._failures += 1
+            if len(outcomes) >= self.min_calls and self._failures >= self.failure_ratio * len(outcomes):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = "open"
+        self.opened += 1
+        self._retry_at = now + self.cooldown
+        self._outcomes.clear()
+        self._failures = 0
+
+
+class AdaptiveLimit:
+    """AIMD limit on calls in flight (queued or running) for one operation"""
+
+    def __init__(self, initial: int = 16, min_limit: int = 2, max_limit: int = 64, backoff: float = 0.9):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, congested: bool) -> None:
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if congested:
+            self.limit = max(self.limit * self.backoff, self.min_limit)
+        elif in_flight * 2 >= self.limit:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+
+
+class OperationGuard:
+    """The breaker and concurrency limit of one backend operation"""
+
+    def __init__(self, name: str, breaker: CircuitBreaker, limit: AdaptiveLimit, slow_call_seconds: float):
+        self.name = name
+        self.breaker = breaker
+        self.limit = limit
+        self.slow_call_seconds = slow_call_seconds
+        self.rejected = 0
+        self._open = BACKEND_REJECTED.labels(name, "open")
+        self._overloaded = BACKEND_REJECTED.labels(name, "overloaded")
+
+    def admit(self) -> float:
+        """Reserve a slot for one call, returning its start time, or raise if the call must not be made"""
+        now = time.monotonic()
+        if not self.breaker.allow(now):
+            self.rejected += 1
+            self._open.inc()
+            raise BackendUnavailableError(self.name, "circuit open", self.breaker.retry_after(now))
+        if not self.limit.try_acquire():
+            self.rejected += 1
+            self._overloaded.inc()
+            # A rejected probe does not count; the breaker stays open until the next one
+            if self.breaker.state == "half_open":
+                self.breaker.state = "open"
+            raise BackendUnavailableError(self.name, "overloaded", 1.0)
+        return now
+
+    def release(self, started: float, error: Optional[BaseException]) -> None:
+        """Free the call's slot and record whether it failed or was slow"""
+        now = time.monotonic()
+        congested = (error is not None and is_backend_failure(error)) or now - started > self.slow_call_seconds
+        self.limit.release(congested)
+        self.breaker.record(congested, now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "opened": self.breaker.opened,
+            "limit": int(self.limit.limit),
+            "in_flight": self.limit.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+class _GuardedCall:
+    """Holds one call's slot in an OperationGuard for the duration of a with block"""
+
+    __slots__ = ("_guard", "_started")
+
+    def __init__(self, guard: OperationGuard):
+        self._guard = guard
+
+    def __enter__(self) -> "_GuardedCall":
+        self._started = self._guard.admit()
+        return self
+
+    def __exit__(self, exc_type: Any, error: Optional[BaseException], traceback: Any) -> None:
+        self._guard.release(self._started, error)
+
+
+_UNGUARDED = contextlib.nullcontext()
+
+
+class BackendGuard:
+    """Creates and holds one OperationGuard per backend operation"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        failure_ratio: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        cooldown: float = 5.0,
+        slow_call_seconds: float = 2.0,
+        initial_limit: int = 16,
+        min_limit: int = 2,
+        max_limit: int = 64,
+        backoff: float = 0.9,
+    ):
+        self.enabled = enabled
+        self.failure_ratio = failure_ratio
+        self.window = window
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.slow_call_seconds = slow_call_seconds
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self._operations: Dict[str, OperationGuard] = {}
+
+    @classmethod
+    def from_env(cls) -> "BackendGuard":
+        """Build a guard from AUTH_BREAKER_* and AUTH_CONCURRENCY_* environment variables"""
+        return cls(
+            enabled=os.getenv("AUTH_BREAKER_ENABLED", "true").lower() == "true",
+            failure_ratio=float(os.getenv("AUTH_BREAKER_FAILURE_RATIO", "0.5")),
+            window=int(os.getenv("AUTH_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("AUTH_BREAKER_MIN_CALLS", "10")),
+            cooldown=float(os.getenv("AUTH_BREAKER_COOLDOWN_SECONDS", "5")),
+            slow_call_seconds=float(os.getenv("AUTH_BREAKER_SLOW_CALL_SECONDS", "2")),
+            initial_limit=int(os.getenv("AUTH_CONCURRENCY_INITIAL", "16")),
+            min_limit=int(os.getenv("AUTH_CONCURRENCY_MIN", "2")),
+            max_limit=int(os.getenv("AUTH_CONCURRENCY_MAX", "64")),
+            backoff=float(os.getenv("AUTH_CONCURRENCY_BACKOFF", "0.9")),
+        )
+
+    def call(self, name: str) -> ContextManager[Any]:
+        """Context manager guarding one call of an operation; raises BackendUnavailableError on entry"""
+        if not self.enabled:
+            return _UNGUARDED
+        return _GuardedCall(self.operation(name))
+
+    def operation(self, name: str) -> OperationGuard:
+        """The guard for one operation, created on first use"""
+        guard = self._operations.get(name)
+        if guard is None:
+            guard = self._operations[name] = OperationGuard(
+                name,
+                CircuitBreaker(self.failure_ratio, self.window, self.min_calls, self.cooldown),
+                AdaptiveLimit(self.initial_limit, self.min_limit, self.max_limit, self.backoff),
+                self.slow_call_seconds,
+            )
+        return guard
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "operations": {name: guard.stats() for name, guard in self._operations.items()}}
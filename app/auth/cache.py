@@ -0,0 +1,145 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Set, Tuple
+
+from .principal import Principal
+
+
+class PrincipalCache:
+    """Bounded LRU cache of verified principals keyed by token digest; hits share the immutable Principal"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+        # token digest -> (fresh until, usable while the backend is down until, uid, principal)
+        self._entries: "OrderedDict[str, Tuple[float, float, str, Principal]]" = OrderedDict()
+        self._keys_by_uid: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PrincipalCache":
+        """Build a cache from AUTH_CACHE_* environment variables"""
+        return cls(
+            max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000")),
+            ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300")),
+            enabled=os.getenv("AUTH_CACHE_ENABLED", "true").lower() == "true",
+        )
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        """Digest a bearer token so raw tokens are never kept in memory"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token, if still fresh"""
+        if not self.enabled:
+            return None
+
+        key = self.token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, stale_until, uid, principal = entry
+            now = time.time()
+            if expires_at <= now:
+                # Kept past the TTL while the token itself is valid, in case the backend goes down
+                if stale_until <= now:
+                    self._remove(key, uid)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def get_stale(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for a token past its TTL but not yet expired"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(self.token_key(token))
+            if entry is None or entry[1] <= time.time():
+                return None
+            self.stale_hits += 1
+            return entry[3]
+
+    def set(self, token: str, principal: Principal, token_exp: Optional[float] = None) -> None:
+        """Cache a principal until the token expires or the TTL elapses"""
+        if not self.enabled or self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        stale_until = expires_at
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+            stale_until = float(token_exp)
+
+        key = self.token_key(token)
+        uid = principal["uid"]
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._remove_uid_key(previous[2], key)
+
+            self._entries[key] = (expires_at, stale_until, uid, principal)
+            self._keys_by_uid.setdefault(uid, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                old_key, (_, _, old_uid, _) = self._entries.popitem(last=False)
+                self._remove_uid_key(old_uid, old_key)
+                self.evictions += 1
+
+    def evict_uid(self, uid: str) -> int:
+        """Drop every cached principal for a user, returning how many were removed"""
+        with self._lock:
+            keys = self._keys_by_uid.pop(uid, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all cached principals and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_uid.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.stale_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: str, uid: str) -> None:
+        self._entries.pop(key, None)
+        self._remove_uid_key(uid, key)
+
+    def _remove_uid_key(self, uid: str, key: str) -> None:
+        keys = self._keys_by_uid.get(uid)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_uid[uid]
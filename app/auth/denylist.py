@@ -0,0 +1,207 @@
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .refresh_tokens import RefreshTokenStore
+
+# Re-read revocations this far behind the last one seen, in case another worker committed late
+SYNC_OVERLAP_SECONDS = 2.0
+
+
+def _hash_pair(key: str) -> Tuple[int, int]:
+    """Two 32-bit hashes for double hashing (h1 + i * h2)"""
+    # Filters never leave the process, so the built-in (per-process seeded) hash is enough
+    value = hash(key) & 0xFFFFFFFFFFFFFFFF
+    return value & 0xFFFFFFFF, (value >> 32) | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over a bytearray, sized for a capacity and false-positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, hashes: Tuple[int, int]) -> None:
+        h1, h2 = hashes
+        bits = self._bits
+        for i in range(self.num_hashes):
+            index = (h1 + i * h2) % self.num_bits
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def contains(self, hashes: Tuple[int, int]) -> bool:
+        h1, h2 = hashes
+        bits = self._bits
+        for i in range(self.num_hashes):
+            index = (h1 + i * h2) % self.num_bits
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class _Generation:
+    """One Bloom filter holding the revocations made during a time window"""
+
+    def __init__(self, capacity: int, error_rate: float, started_at: float):
+        self.filter = BloomFilter(capacity, error_rate)
+        self.started_at = started_at
+        self.newest = started_at
+
+
+class AccessTokenDenylist:
+    """Bloom-filter prefilter over revoked sessions and users, confirmed against the exact store"""
+
+    def __init__(
+        self,
+        store: RefreshTokenStore,
+        ttl_seconds: float,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1.0,
+        enabled: bool = True,
+    ):
+        self.store = store
+        # Access-token lifetime: a revocation only matters until tokens issued before it expire
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.enabled = enabled
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self._generations: List[_Generation] = []
+        # Start by loading every revocation that can still match an unexpired token
+        self._cursor = time.time() - ttl_seconds
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, store: RefreshTokenStore, ttl_seconds: float) -> "AccessTokenDenylist":
+        """Build a denylist from AUTH_DENYLIST_* environment variables"""
+        return cls(
+            store,
+            ttl_seconds,
+            capacity=int(os.getenv("AUTH_DENYLIST_CAPACITY", "100000")),
+            error_rate=float(os.getenv("AUTH_DENYLIST_ERROR_RATE", "0.001")),
+            sync_interval=float(os.getenv("AUTH_DENYLIST_SYNC_SECONDS", "1")),
+            enabled=os.getenv("AUTH_DENYLIST_ENABLED", "true").lower() == "true",
+        )
+
+    def is_revoked(self, sid: Optional[str], uid: str, issued_at: float) -> bool:
+        """Check an access token's session and user, touching the store only on a filter hit"""
+        if not self.enabled:
+            return False
+
+        now = time.time()
+        if self.store.shared and now - self._last_sync >= self.sync_interval:
+            self._sync(now)
+
+        self.checks += 1
+        generations = self._generations
+        if not generations:
+            return False
+        if generations[0].newest + self.ttl_seconds <= now:
+            with self._lock:
+                self._expire(now)
+            generations = self._generations
+
+        user_key = _hash_pair("u:" + uid)
+        session_key = _hash_pair("s:" + sid) if sid else None
+        for gen in generations:
+            if gen.filter.contains(user_key) or (session_key is not None and gen.filter.contains(session_key)):
+                break
+        else:
+            return False
+
+        self.filter_hits += 1
+        revoked = self.store.is_revoked(sid, uid, issued_at)
+        if not revoked:
+            # Either a true false positive or a token issued after its user logged out everywhere
+            self.false_positives += 1
+        return revoked
+
+    def revoke_session(self, sid: str, revoked_at: Optional[float] = None) -> None:
+        """Add a revoked session to the filter (the store records it separately)"""
+        self._add("s:" + sid, revoked_at or time.time())
+
+    def revoke_user(self, uid: str, revoked_at: Optional[float] = None) -> None:
+        """Add a logged-out-everywhere user to the filter (the store records it separately)"""
+        self._add("u:" + uid, revoked_at or time.time())
+
+    def _add(self, key: str, revoked_at: float) -> None:
+        hashes = _hash_pair(key)
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            current = self._generations[-1] if self._generations else None
+            if current is not None and current.filter.contains(hashes):
+                # Already present (pushed locally, or re-read in the sync overlap)
+                current.newest = max(current.newest, revoked_at)
+                return
+
+            if (
+                current is None
+                or current.filter.count >= current.filter.capacity
+                or now - current.started_at >= self.ttl_seconds / 2
+            ):
+                # Start a new generation instead of rebuilding: old ones expire as a whole
+                current = _Generation(self.capacity, self.error_rate, now)
+                self._generations = self._generations + [current]
+            current.filter.add(hashes)
+            current.newest = max(current.newest, revoked_at)
+
+    def _expire(self, now: float) -> None:
+        # A generation can go once every token issued before its newest revocation has expired
+        live = [gen for gen in self._generations if gen.newest + self.ttl_seconds > now]
+        if len(live) != len(self._generations):
+            self._generations = live
+
+    def _sync(self, now: float) -> None:
+        """Pick up revocations made by other workers sharing the store"""
+        self._last_sync = now
+        try:
+            revocations = self.store.revocations_since(self._cursor - SYNC_OVERLAP_SECONDS)
+        except Exception as e:
+            print(f"Denylist sync failed: {e}")
+            return
+
+        for kind, key, revoked_at in revocations:
+            if revoked_at + self.ttl_seconds > now:
+                self._add(("s:" if kind == "session" else "u:") + key, revoked_at)
+            self._cursor = max(self._cursor, revoked_at)
+
+        with self._lock:
+            self._expire(now)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return filter size, fill and observed and expected false-positive rates"""
+        generations = self._generations
+        misses = 1.0
+        for gen in generations:
+            misses *= 1 - gen.filter.false_positive_rate()
+        return {
+            "enabled": self.enabled,
+            "generations": len(generations),
+            "entries": sum(gen.filter.count for gen in generations),
+            "size_bytes": sum(gen.filter.size_bytes for gen in generations),
+            "expected_false_positive_rate": 1 - misses,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+        }
@@ -1,15 +1,18 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
+from ..metrics import StageTimer
 from .firebase_auth import firebase_auth
+from .permissions import policy
+from .principal import Principal
 
 # Security scheme for Bearer token
 security = HTTPBearer()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
     """
-    Dependency to get current authenticated user from Firebase token
+    Dependency to get current authenticated user from an access token or Firebase ID token
     """
     token = credentials.credentials
     
@@ -20,7 +23,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_data = await firebase_auth.verify_token(token)
+    # Tokens we minted ourselves are verified in memory; anything else is a Firebase ID token
+    with StageTimer("get_current_user"):
+        if firebase_auth.is_access_token(token):
+            user_data = firebase_auth.verify_access_token(token)
+        else:
+            user_data = await firebase_auth.verify_token(token)
     
     if not user_data:
         raise HTTPException(
@@ -32,7 +40,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return user_data
 
 
-async def get_current_active_user(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Dependency to get current active user
     """
@@ -44,24 +52,59 @@ async def get_current_active_user(current_user: Dict[str, Any] = Depends(get_cur
     return current_user
 
 
-async def require_role(required_role: str):
+# Role and permission checkers are built once per argument and reused across routes
+_role_checkers: Dict[str, Callable[..., Any]] = {}
+_permission_checkers: Dict[Tuple[str, ...], Callable[..., Any]] = {}
+
+
+def require_role(required_role: str) -> Callable[..., Any]:
     """
-    Dependency factory to require specific role
+    Dependency factory to require a role, or a role that inherits from it
     """
-    async def role_checker(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
-        user_role = current_user.get("role", "user")
-        
-        if user_role != required_role and user_role != "admin":
+    checker = _role_checkers.get(required_role)
+    if checker is not None:
+        return checker
+
+    policy.check_known_role(required_role)
+
+    async def role_checker(current_user: Principal = Depends(get_current_user)) -> Principal:
+        if not policy.has_role(current_user.role, required_role):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied. Required role: {required_role}"
             )
         
         return current_user
-    
+
+    _role_checkers[required_role] = role_checker
     return role_checker
 
 
+def require_permission(*permissions: str) -> Callable[..., Any]:
+    """
+    Dependency factory to require one or more permissions from an active user
+    """
+    key = tuple(sorted(permissions))
+    checker = _permission_checkers.get(key)
+    if checker is not None:
+        return checker
+
+    required_mask = policy.permission_mask(*key)
+    detail = f"Access denied. Required permission: {', '.join(key)}"
+
+    async def permission_checker(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+        if not policy.has_permissions(current_user.role, required_mask):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        
+        return current_user
+
+    _permission_checkers[key] = permission_checker
+    return permission_checker
+
+
 # Predefined role dependencies
 require_admin = require_role("admin")
-require_user = require_role("user") 
\ No newline at end of file
+require_user = require_role("user")
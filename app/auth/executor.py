@@ -0,0 +1,176 @@
+import asyncio
+import contextlib
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..metrics import StageTimer
+from .breaker import BackendGuard
+
+
+class BackendCallCounter:
+    """Counts the backend calls made within one request or test block"""
+
+    def __init__(self):
+        self.operations: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.operations)
+
+    def record(self, func: Callable[..., Any]) -> None:
+        self.operations.append(call_name(func))
+
+
+def call_name(func: Callable[..., Any]) -> str:
+    """Name a backend call for counters and metrics, e.g. get_user"""
+    return getattr(func, "__name__", repr(func)).lstrip("_")
+
+
+_backend_calls: ContextVar[Optional[BackendCallCounter]] = ContextVar("backend_calls", default=None)
+
+
+@contextlib.contextmanager
+def track_backend_calls() -> Iterator[BackendCallCounter]:
+    """Count every BackendExecutor call made in the current context"""
+    counter = BackendCallCounter()
+    token = _backend_calls.set(counter)
+    try:
+        yield counter
+    finally:
+        _backend_calls.reset(token)
+
+
+def record_backend_call(func: Callable[..., Any]) -> None:
+    """Count a backend call made outside the executor, such as an async REST request"""
+    counter = _backend_calls.get()
+    if counter is not None:
+        counter.record(func)
+
+
+class BackendExecutor:
+    """Bounded thread pool that keeps blocking Firebase Admin SDK calls off the event loop"""
+
+    def __init__(self, max_workers: int = 16, enabled: bool = True):
+        self.max_workers = max_workers
+        self.enabled = enabled
+        # Optional hook run in the calling thread before each backend call
+        self.before_call: Optional[Callable[[Callable[..., Any]], None]] = None
+        # Per-operation breakers and concurrency limits; the service installs its own
+        self.guard = BackendGuard(enabled=False)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # A pool's threads do not survive fork, so each worker process starts its own
+        self._pool_pid = 0
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_run_time = 0.0
+
+    @classmethod
+    def from_env(cls) -> "BackendExecutor":
+        """Build an executor from AUTH_EXECUTOR_* environment variables"""
+        return cls(
+            max_workers=int(os.getenv("AUTH_EXECUTOR_MAX_WORKERS", "16")),
+            enabled=os.getenv("AUTH_EXECUTOR_ENABLED", "true").lower() == "true",
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking call in the pool and await its result"""
+        record_backend_call(func)
+        name = call_name(func)
+
+        # Timed from the awaiting coroutine, so the stage includes any wait for a free thread.
+        # The guard rejects before anything is queued when the operation is failing or saturated
+        with self.guard.call(name), StageTimer(name):
+            if not self.enabled:
+                if self.before_call is not None:
+                    self.before_call(func)
+                return func(*args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            # Whichever of _call and the finally below gets here first takes the call off the queue
+            dequeued: List[bool] = []
+            call = functools.partial(self._call, func, time.perf_counter(), dequeued, args, kwargs)
+            with self._lock:
+                self.queued += 1
+            try:
+                return await loop.run_in_executor(self._get_pool(), call)
+            finally:
+                with self._lock:
+                    if not dequeued:
+                        # Cancelled while still queued: the pool drops the call without running it
+                        dequeued.append(True)
+                        self.queued -= 1
+
+    def _call(
+        self, func: Callable[..., Any], submitted_at: float, dequeued: List[bool], args: tuple, kwargs: Dict[str, Any]
+    ) -> Any:
+        started_at = time.perf_counter()
+        wait_time = started_at - submitted_at
+        with self._lock:
+            if not dequeued:
+                dequeued.append(True)
+                self.queued -= 1
+            self.in_flight += 1
+            self.total_wait_time += wait_time
+            if wait_time > self.max_wait_time:
+                self.max_wait_time = wait_time
+
+        failed = False
+        try:
+            if self.before_call is not None:
+                self.before_call(func)
+            return func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            run_time = time.perf_counter() - started_at
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_run_time += run_time
+                if failed:
+                    self.failed += 1
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="firebase-backend",
+                    )
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; a new pool is created on next use"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pool_pid == os.getpid():
+            pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, in-flight count and wait-time metrics"""
+        with self._lock:
+            completed = self.completed
+            return {
+                "enabled": self.enabled,
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "in_flight": self.in_flight,
+                "completed": completed,
+                "failed": self.failed,
+                "avg_wait_ms": (self.total_wait_time / completed * 1000) if completed else 0.0,
+                "max_wait_ms": self.max_wait_time * 1000,
+                "avg_run_ms": (self.total_run_time / completed * 1000) if completed else 0.0,
+            }
@@ -1,47 +1,180 @@
+import asyncio
 import os
-import firebase_admin
-from firebase_admin import auth, credentials
-from firebase_admin.auth import UserRecord
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
+import hashlib
+import importlib
 import json
+import secrets
+import threading
+import time
 from datetime import datetime, timedelta
 import jwt
+from ..metrics import AUTH_OUTCOMES, StageTimer, failure_outcome
+from .breaker import BackendGuard, BackendUnavailableError, is_backend_failure, unavailable
+from .cache import PrincipalCache
+from .denylist import AccessTokenDenylist
+from .executor import BackendExecutor
+from .identity_toolkit import IdentityToolkitClient
+from .jwks import LocalTokenVerifier
+from .principal import Principal
+from .refresh_tokens import RefreshTokenError, RefreshTokenStore
+from .singleflight import SingleFlight
+from .sqlite_store import store_call
+from .transport import HttpTransport
+
+if TYPE_CHECKING:
+    from firebase_admin import App
+    from firebase_admin.auth import ImportUserRecord, UserImportHash, UserRecord
+
+
+class _LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# The Admin SDK (and requests/google-auth beneath it) is imported on the first backend call
+auth = _LazyModule("firebase_admin.auth")
+
+# Hot-path outcome counters, bound once
+_ACCESS_TOKEN_VALID = AUTH_OUTCOMES.labels("access", "valid")
+_ID_TOKEN_VALID = AUTH_OUTCOMES.labels("firebase", "valid")
+
+
+class TokenRevokedError(Exception):
+    """Raised when a token's session or user has been revoked"""
+
+
+# Example values from the docs: access tokens carry the caller's role, so anyone could sign one with these
+PLACEHOLDER_JWT_SECRETS = frozenset({"your-secret-key", "your-super-secret-jwt-key-change-this-in-production"})
+
+
+def load_jwt_secret() -> str:
+    """Read JWT_SECRET, refusing known placeholders and using a random per-process key when unset"""
+    secret = os.getenv("JWT_SECRET", "")
+    if secret in PLACEHOLDER_JWT_SECRETS:
+        raise ValueError("JWT_SECRET is set to an example value; generate a secret of your own")
+    if not secret:
+        print("JWT_SECRET is not set; signing tokens with a random key that is lost on restart")
+        return secrets.token_urlsafe(32)
+    return secret
 
 
 class FirebaseAuthService:
     def __init__(self):
-        self._initialize_firebase()
-        self.jwt_secret = os.getenv("JWT_SECRET", "your-secret-key")
+        # Only configuration is read here; the Admin SDK is set up by initialize() on first use
+        self.transport = HttpTransport.from_env()
+        self._credential: Any = None
+        self._firebase_app: Optional["App"] = None
+        self._firebase_pid = 0
+        self._init_lock = threading.Lock()
+        self.jwt_secret = load_jwt_secret()
         self.jwt_algorithm = "HS256"
+        self.jwt_issuer = os.getenv("JWT_ISSUER", "authentication-api")
+        # Pre-built decoder and key for verifying our own access tokens in memory
+        self._jwt_decoder = jwt.PyJWT(options={"require": ["exp", "iat", "iss"]})
+        self._jwt_key = jwt.algorithms.HMACAlgorithm(jwt.algorithms.HMACAlgorithm.SHA256).prepare_key(self.jwt_secret)
         self.access_token_expiry = timedelta(hours=1)
         self.refresh_token_expiry = timedelta(days=7)
+        self.refresh_tokens = RefreshTokenStore.from_env(self.refresh_token_expiry.total_seconds())
+        self.denylist = AccessTokenDenylist.from_env(self.refresh_tokens, self.access_token_expiry.total_seconds())
+        self.principal_cache = PrincipalCache.from_env()
+        self.executor = BackendExecutor.from_env()
+        self.executor.before_call = self._prepare_backend_call
+        self.identity_toolkit = IdentityToolkitClient.from_env(self.transport)
+        # One breaker and concurrency limit per backend operation, shared by the executor and REST calls
+        self.backend_guard = BackendGuard.from_env()
+        self.executor.guard = self.backend_guard
+        self.identity_toolkit.guard = self.backend_guard
+        self.single_flight = SingleFlight.from_env()
+        self.token_verifier: Optional[LocalTokenVerifier] = None
+        # "user" reads claims from a single get_user; "token" reads them from the verified ID token
+        self.claims_source = os.getenv("AUTH_CLAIMS_SOURCE", "user")
+        self.claims_max_age = float(os.getenv("AUTH_CLAIMS_MAX_AGE_SECONDS", "3600"))
+        # Bulk import settings; Firebase accepts at most 1000 users per import_users call
+        self.import_chunk_size = min(int(os.getenv("AUTH_IMPORT_CHUNK_SIZE", "1000")), 1000)
+        self.import_hash_rounds = int(os.getenv("AUTH_IMPORT_PBKDF2_ROUNDS", "10000"))
+        self.import_concurrency = int(os.getenv("AUTH_IMPORT_CONCURRENCY", "4"))
+
+    def load_credential(self) -> Any:
+        """Parse the Firebase credentials once; the result is safe to share with forked workers"""
+        if self._credential is not None:
+            return self._credential
 
-    def _initialize_firebase(self):
+        from firebase_admin import credentials
+
+        # Try to get Firebase credentials from environment
+        firebase_credentials = os.getenv("FIREBASE_CREDENTIALS")
+        if firebase_credentials:
+            cred_dict = json.loads(firebase_credentials)
+            cred = credentials.Certificate(cred_dict)
+        else:
+            # Fallback to service account file
+            service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_PATH")
+            if service_account_path and os.path.exists(service_account_path):
+                cred = credentials.Certificate(service_account_path)
+            else:
+                # Use default credentials (for development)
+                cred = credentials.ApplicationDefault()
+        self._credential = cred
+        return cred
+
+    def initialize(self) -> None:
+        """Initialize the Firebase Admin SDK for this process; no-op once done, redone after fork"""
+        if self._firebase_app is not None and self._firebase_pid == os.getpid():
+            return
+        with self._init_lock:
+            if self._firebase_app is not None and self._firebase_pid == os.getpid():
+                return
+            self._firebase_app = self._initialize_firebase()
+            self._firebase_pid = os.getpid()
+            self.token_verifier = self._build_token_verifier()
+            if self.token_verifier is not None:
+                # Keys are fetched and refreshed in the background, never while serving a request
+                self.token_verifier.start()
+
+    def _initialize_firebase(self) -> "App":
         """Initialize Firebase Admin SDK"""
+        import firebase_admin
+
         try:
-            # Try to get Firebase credentials from environment
-            firebase_credentials = os.getenv("FIREBASE_CREDENTIALS")
-            if firebase_credentials:
-                cred_dict = json.loads(firebase_credentials)
-                cred = credentials.Certificate(cred_dict)
-            else:
-                # Fallback to service account file
-                service_account_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_PATH")
-                if service_account_path and os.path.exists(service_account_path):
-                    cred = credentials.Certificate(service_account_path)
-                else:
-                    # Use default credentials (for development)
-                    cred = credentials.ApplicationDefault()
-            
-            firebase_admin.initialize_app(cred)
+            cred = self.load_credential()
+            if self._firebase_app is not None:
+                # Inherited from the parent process: its HTTP sessions share the parent's sockets
+                firebase_admin.delete_app(self._firebase_app)
+
+            # Explicit (connect, read) timeouts for every Admin SDK request
+            return firebase_admin.initialize_app(cred, {"httpTimeout": self.transport.timeout})
         except Exception as e:
             print(f"Firebase initialization error: {e}")
             raise
 
+    def _build_token_verifier(self) -> Optional[LocalTokenVerifier]:
+        """Build the local ID token verifier when AUTH_LOCAL_VERIFY is enabled"""
+        if os.getenv("AUTH_LOCAL_VERIFY", "false").lower() != "true":
+            return None
+
+        project_id = os.getenv("FIREBASE_PROJECT_ID") or self._firebase_app.project_id
+        return LocalTokenVerifier.from_env(project_id, self.transport)
+
+    def _prepare_backend_call(self, func) -> None:
+        """Initialize the Admin SDK and route its traffic through the pooled transport before a call"""
+        if getattr(func, "__module__", "").startswith("firebase_admin"):
+            self.initialize()
+            self.transport.configure_admin_sdk(self._firebase_app)
+
     async def create_user(self, email: str, password: str, first_name: str, last_name: str) -> Dict[str, Any]:
         """Create a new user in Firebase"""
         try:
-            user_record = auth.create_user(
+            user_record = await self.executor.run(
+                auth.create_user,
                 email=email,
                 password=password,
                 display_name=f"{first_name} {last_name}",
@@ -49,7 +182,7 @@ class FirebaseAuthService:
             )
             
             # Set custom claims
-            auth.set_custom_user_claims(user_record.uid, {
+            await self.executor.run(auth.set_custom_user_claims, user_record.uid, {
                 "first_name": first_name,
                 "last_name": last_name,
                 "role": "user"
@@ -63,25 +196,79 @@ class FirebaseAuthService:
                 "is_active": not user_record.disabled,
                 "created_at": user_record.user_metadata.creation_timestamp
             }
+        except BackendUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to create user: {str(e)}")
 
+    async def import_users(self, users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create a chunk of users, claims included, with a single bulk import call"""
+        if len(users) > self.import_chunk_size:
+            raise ValueError(f"Cannot import more than {self.import_chunk_size} users at once")
+
+        # Hashing a full chunk takes seconds of CPU; keep it out of the guarded call so it never counts as slow
+        records, hash_alg = await asyncio.get_running_loop().run_in_executor(None, self._hash_chunk, users)
+        try:
+            result = await self.executor.run(auth.import_users, records, hash_alg=hash_alg)
+            errors = {error.index: error.reason for error in result.errors}
+        except Exception as e:
+            # Failed as a whole or rejected by the guard: report it per user rather than abort the stream
+            errors = {index: str(e) for index in range(len(records))}
+
+        results = []
+        for index, record in enumerate(records):
+            if index in errors:
+                results.append({"email": record.email, "status": "failed", "error": errors[index]})
+            else:
+                results.append({"uid": record.uid, "email": record.email, "status": "created"})
+        return results
+
+    def _hash_chunk(self, users: List[Dict[str, Any]]) -> Tuple[List["ImportUserRecord"], "UserImportHash"]:
+        """Hash passwords and build the import records for one chunk of users"""
+        from firebase_admin.auth import ImportUserRecord, UserImportHash
+
+        records = []
+        for user in users:
+            salt = secrets.token_bytes(16)
+            password_hash = hashlib.pbkdf2_hmac(
+                "sha256", user["password"].encode("utf-8"), salt, self.import_hash_rounds
+            )
+            records.append(ImportUserRecord(
+                uid=user.get("uid") or secrets.token_hex(14),
+                email=user["email"],
+                email_verified=False,
+                display_name=f"{user['first_name']} {user['last_name']}",
+                custom_claims={
+                    "first_name": user["first_name"],
+                    "last_name": user["last_name"],
+                    "role": user.get("role", "user")
+                },
+                password_hash=password_hash,
+                password_salt=salt
+            ))
+        return records, UserImportHash.pbkdf2_sha256(rounds=self.import_hash_rounds)
+
+    async def list_users_page(self, page_token: Optional[str] = None, max_results: int = 1000):
+        """Fetch one page of users from Firebase"""
+        return await self.executor.run(auth.list_users, page_token=page_token, max_results=max_results)
+
     async def sign_in_user(self, email: str, password: str) -> Dict[str, Any]:
         """Sign in user with email and password"""
         try:
-            # In a real implementation, you would use Firebase Auth REST API
-            # For now, we'll simulate the authentication
-            user_record = auth.get_user_by_email(email)
+            # Check the password with the Identity Toolkit REST API, then load claims
+            sign_in = await self.identity_toolkit.sign_in_with_password(email, password)
+            user_record = await self.get_user(sign_in["localId"])
             
             if user_record.disabled:
                 raise Exception("User account is disabled")
             
-            # Generate JWT tokens
-            access_token = self._generate_access_token(user_record.uid, user_record.email)
-            refresh_token = self._generate_refresh_token(user_record.uid)
+            # Custom claims are already on the user record
+            custom_claims = user_record.custom_claims or {}
             
-            # Get custom claims
-            custom_claims = auth.get_custom_user_claims(user_record.uid)
+            # Generate JWT tokens for a new session
+            sid = await store_call(self.refresh_tokens.shared, self.refresh_tokens.issue, user_record.uid)
+            access_token = self._generate_access_token(user_record.uid, user_record.email, custom_claims, sid)
+            refresh_token = self._generate_refresh_token(user_record.uid, sid, sid)
             
             return {
                 "access_token": access_token,
@@ -95,64 +282,216 @@ class FirebaseAuthService:
                     "created_at": str(user_record.user_metadata.creation_timestamp)
                 }
             }
+        except BackendUnavailableError:
+            raise
         except Exception as e:
+            if is_backend_failure(e):
+                # Firebase failed, not the credentials: tell the client to retry instead of rejecting them
+                raise unavailable("sign_in", e) from e
             raise Exception(f"Authentication failed: {str(e)}")
 
-    async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+    async def verify_token(self, token: str) -> Optional[Principal]:
         """Verify Firebase ID token"""
+        cached_user = self.principal_cache.get(token)
+        if cached_user is not None:
+            _ID_TOKEN_VALID.inc()
+            return cached_user
+
         try:
-            decoded_token = auth.verify_id_token(token)
-            user_record = auth.get_user(decoded_token["uid"])
-            custom_claims = auth.get_custom_user_claims(user_record.uid)
-            
-            return {
-                "uid": user_record.uid,
-                "email": user_record.email,
-                "first_name": custom_claims.get("first_name", ""),
-                "last_name": custom_claims.get("last_name", ""),
-                "role": custom_claims.get("role", "user")
-            }
+            # Concurrent verifications of the same token share one backend round-trip
+            # Principals are immutable, so every waiter can share the one instance
+            user_data = await self.single_flight.do(
+                ("verify_token", PrincipalCache.token_key(token)),
+                lambda: self._verify_token_uncached(token)
+            )
+            _ID_TOKEN_VALID.inc()
+            return user_data
+        except Exception as e:
+            if not isinstance(e, BackendUnavailableError) and not is_backend_failure(e):
+                AUTH_OUTCOMES.labels("firebase", failure_outcome(e)).inc()
+                print(f"Token verification failed: {e}")
+                return None
+            # Firebase is failing or saturated: a principal verified earlier for this unexpired token will do
+            stale_user = self.principal_cache.get_stale(token)
+            if stale_user is None:
+                if isinstance(e, BackendUnavailableError):
+                    raise
+                raise unavailable("verify_token", e) from e
+            _ID_TOKEN_VALID.inc()
+            return stale_user
+
+    async def _verify_token_uncached(self, token: str) -> Principal:
+        """Verify a token against Firebase and cache the resulting user data"""
+        self.initialize()
+        if self.token_verifier is not None:
+            with StageTimer("verify_id_token_local"):
+                decoded_token = self.token_verifier.verify(token)
+        else:
+            decoded_token = await self.executor.run(auth.verify_id_token, token)
+        user_data = None
+        if self.claims_source == "token":
+            user_data = self._user_from_token(decoded_token)
+
+        if user_data is None:
+            user_record = await self.get_user(decoded_token["uid"])
+            user_data = Principal.from_claims(user_record.uid, user_record.email, user_record.custom_claims or {})
+        self.principal_cache.set(token, user_data, decoded_token.get("exp"))
+        return user_data
+
+    async def get_user(self, uid: str) -> "UserRecord":
+        """Fetch a user record, sharing the call with any identical lookup in flight"""
+        return await self.single_flight.do(("get_user", uid), lambda: self.executor.run(auth.get_user, uid))
+
+    def _user_from_token(self, decoded_token: Dict[str, Any]) -> Optional[Principal]:
+        """Build user data from a verified ID token, or None if its claims are missing or stale"""
+        if "role" not in decoded_token:
+            return None
+
+        issued_at = decoded_token.get("iat", 0)
+        if time.time() - issued_at > self.claims_max_age:
+            return None
+
+        return Principal.from_claims(decoded_token["uid"], decoded_token.get("email", ""), decoded_token)
+
+    async def set_user_claims(self, uid: str, claims: Dict[str, Any]) -> None:
+        """Replace a user's custom claims and drop their cached principals"""
+        await self.executor.run(auth.set_custom_user_claims, uid, claims)
+        self.invalidate_user(uid)
+
+    async def set_user_disabled(self, uid: str, disabled: bool = True) -> None:
+        """Enable or disable a user and drop their cached principals"""
+        await self.executor.run(auth.update_user, uid, disabled=disabled)
+        self.invalidate_user(uid)
+
+    def invalidate_user(self, uid: str) -> int:
+        """Evict every cached principal belonging to a user"""
+        return self.principal_cache.evict_uid(uid)
+
+    def is_access_token(self, token: str) -> bool:
+        """Check whether a bearer token was minted by this service rather than Firebase"""
+        try:
+            return jwt.get_unverified_header(token).get("alg") == self.jwt_algorithm
+        except jwt.InvalidTokenError:
+            return False
+
+    def verify_access_token(self, token: str) -> Optional[Principal]:
+        """Verify one of our own access tokens in memory, without calling Firebase"""
+        try:
+            with StageTimer("verify_access_token"):
+                payload = self._jwt_decoder.decode(
+                    token,
+                    self._jwt_key,
+                    algorithms=[self.jwt_algorithm],
+                    issuer=self.jwt_issuer,
+                )
+
+                if payload.get("type") != "access":
+                    raise Exception("Invalid token type")
+
+                if self.denylist.is_revoked(payload.get("sid"), payload["user_id"], payload["iat"]):
+                    raise TokenRevokedError("Token has been revoked")
+
+            _ACCESS_TOKEN_VALID.inc()
+            return Principal.from_claims(payload["user_id"], payload["email"], payload)
         except Exception as e:
-            print(f"Token verification failed: {e}")
+            AUTH_OUTCOMES.labels("access", failure_outcome(e)).inc()
+            print(f"Access token verification failed: {e}")
             return None
 
-    def _generate_access_token(self, user_id: str, email: str) -> str:
-        """Generate JWT access token"""
+    def _generate_access_token(
+        self,
+        user_id: str,
+        email: str,
+        claims: Optional[Dict[str, Any]] = None,
+        sid: Optional[str] = None
+    ) -> str:
+        """Generate JWT access token, tied to the refresh token session it was issued for"""
+        claims = claims or {}
         payload = {
             "user_id": user_id,
+            "sid": sid,
             "email": email,
+            "first_name": claims.get("first_name", ""),
+            "last_name": claims.get("last_name", ""),
+            "role": claims.get("role", "user"),
             "exp": datetime.utcnow() + self.access_token_expiry,
-            "iat": datetime.utcnow(),
+            # Sub-second, so a token issued just after a logout-everywhere in the same second stays valid
+            "iat": time.time(),
+            "iss": self.jwt_issuer,
             "type": "access"
         }
         return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
 
-    def _generate_refresh_token(self, user_id: str) -> str:
-        """Generate JWT refresh token"""
+    def _generate_refresh_token(self, user_id: str, jti: Optional[str] = None, sid: Optional[str] = None) -> str:
+        """Generate JWT refresh token, starting a new session (token family) unless a jti is given"""
+        jti = jti or self.refresh_tokens.issue(user_id)
         payload = {
             "user_id": user_id,
+            "jti": jti,
+            "sid": sid or jti,
             "exp": datetime.utcnow() + self.refresh_token_expiry,
             "iat": datetime.utcnow(),
+            "iss": self.jwt_issuer,
             "type": "refresh"
         }
         return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
 
-    async def refresh_access_token(self, refresh_token: str) -> Optional[str]:
-        """Refresh access token using refresh token"""
+    def _decode_refresh_token(self, refresh_token: str) -> Dict[str, Any]:
+        """Verify a refresh token's signature, expiry and type"""
+        payload = jwt.decode(refresh_token, self.jwt_secret, algorithms=[self.jwt_algorithm])
+        
+        if payload.get("type") != "refresh" or not payload.get("jti"):
+            raise Exception("Invalid token type")
+        return payload
+
+    async def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
+        """Exchange a refresh token for a new access token and a rotated refresh token"""
         try:
-            payload = jwt.decode(refresh_token, self.jwt_secret, algorithms=[self.jwt_algorithm])
+            payload = self._decode_refresh_token(refresh_token)
+            user_id = payload.get("user_id")
+            sid = payload.get("sid")
+            # Load the user first: if that fails the token must stay usable, or the retry would look like reuse
+            user_record = await self.get_user(user_id)
             
-            if payload.get("type") != "refresh":
-                raise Exception("Invalid token type")
+            if user_record.disabled:
+                raise Exception("User account is disabled")
             
-            user_id = payload.get("user_id")
-            user_record = auth.get_user(user_id)
+            try:
+                # Rotation consumes the token; presenting it again revokes the whole session
+                new_jti = await store_call(self.refresh_tokens.shared, self.refresh_tokens.rotate, payload["jti"], user_id)
+            except RefreshTokenError as e:
+                if e.code == "reused" and sid:
+                    self.denylist.revoke_session(sid)
+                raise
             
-            return self._generate_access_token(user_id, user_record.email)
+            return {
+                "access_token": self._generate_access_token(user_id, user_record.email, user_record.custom_claims, sid),
+                "refresh_token": self._generate_refresh_token(user_id, new_jti, sid)
+            }
+        except BackendUnavailableError:
+            raise
         except Exception as e:
             print(f"Token refresh failed: {e}")
             return None
 
+    def revoke_refresh_token(self, refresh_token: str) -> bool:
+        """Revoke the session a refresh token belongs to"""
+        try:
+            payload = self._decode_refresh_token(refresh_token)
+        except Exception as e:
+            print(f"Refresh token revocation failed: {e}")
+            return False
+        
+        self.refresh_tokens.revoke(payload["jti"])
+        if payload.get("sid"):
+            self.denylist.revoke_session(payload["sid"])
+        return True
+
+    def revoke_user_sessions(self, uid: str) -> None:
+        """Revoke every refresh and access token issued to a user so far"""
+        self.refresh_tokens.revoke_user(uid)
+        self.denylist.revoke_user(uid)
+
 
 # Global instance
 firebase_auth = FirebaseAuthService() 
\ No newline at end of file
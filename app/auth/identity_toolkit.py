@@ -0,0 +1,102 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from ..metrics import StageTimer
+from .breaker import BackendGuard
+from .executor import record_backend_call
+from .transport import HttpTransport
+
+if TYPE_CHECKING:
+    import httpx
+
+DEFAULT_BASE_URL = "https://identitytoolkit.googleapis.com/v1"
+
+
+class SignInError(Exception):
+    """Raised when the Identity Toolkit rejects a sign-in"""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class IdentityToolkitClient:
+    """Async client for the Identity Toolkit REST API, sharing the pooled httpx transport"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        transport: HttpTransport,
+        base_url: str = DEFAULT_BASE_URL,
+        max_concurrency: int = 32,
+        timeout: float = 10.0,
+    ):
+        self.api_key = api_key
+        self.transport = transport
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        # Per-operation breakers and concurrency limits; the service installs its own
+        self.guard = BackendGuard(enabled=False)
+
+    @classmethod
+    def from_env(cls, transport: HttpTransport) -> "IdentityToolkitClient":
+        """Build a client from FIREBASE_API_KEY and AUTH_SIGNIN_* environment variables"""
+        base_url = os.getenv("FIREBASE_AUTH_REST_URL", DEFAULT_BASE_URL)
+        emulator_host = os.getenv("FIREBASE_AUTH_EMULATOR_HOST")
+        if emulator_host:
+            base_url = f"http://{emulator_host}/identitytoolkit.googleapis.com/v1"
+
+        return cls(
+            api_key=os.getenv("FIREBASE_API_KEY") or ("emulator" if emulator_host else None),
+            transport=transport,
+            base_url=base_url,
+            max_concurrency=int(os.getenv("AUTH_SIGNIN_MAX_CONCURRENCY", "32")),
+            timeout=float(os.getenv("AUTH_SIGNIN_TIMEOUT", "10")),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def sign_in_with_password(self, email: str, password: str) -> Dict[str, Any]:
+        """Verify an email/password pair, returning the accounts:signInWithPassword response"""
+        if not self.configured:
+            raise SignInError("PASSWORD_SIGN_IN_NOT_CONFIGURED")
+
+        record_backend_call(self.sign_in_with_password)
+        with self.guard.call("sign_in_with_password"):
+            async with self._semaphore():
+                with StageTimer("sign_in_with_password"):
+                    response = await self.transport.arequest(
+                        "POST",
+                        f"{self.base_url}/accounts:signInWithPassword",
+                        params={"key": self.api_key},
+                        json={"email": email, "password": password, "returnSecureToken": True},
+                        timeout=self.timeout,
+                    )
+            # Raised inside the guard, so server errors count against the backend
+            if response.status_code >= 500:
+                raise SignInError(f"HTTP_{response.status_code}")
+
+        if response.status_code != 200:
+            raise SignInError(self._error_code(response))
+        return response.json()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop, so keep one per loop
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores = {loop: semaphore}
+        return semaphore
+
+    @staticmethod
+    def _error_code(response: "httpx.Response") -> str:
+        try:
+            return response.json()["error"]["message"]
+        except Exception:
+            return f"HTTP_{response.status_code}"
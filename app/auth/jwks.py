@@ -0,0 +1,194 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+
+from .breaker import BackendUnavailableError
+from .transport import HttpTransport
+
+# Google's public certificates for Firebase ID tokens, keyed by kid
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class LocalTokenVerifier:
+    """Verifies Firebase ID tokens locally against in-memory public keys"""
+
+    def __init__(
+        self,
+        project_id: str,
+        key_source: str = GOOGLE_CERTS_URL,
+        refresh_margin: float = 300.0,
+        file_reload_interval: float = 60.0,
+        min_refresh_interval: float = 30.0,
+        leeway: float = 0.0,
+        transport: Optional[HttpTransport] = None,
+    ):
+        self.project_id = project_id
+        self.issuer = f"https://securetoken.google.com/{project_id}"
+        self.key_source = key_source
+        self.refresh_margin = refresh_margin
+        self.file_reload_interval = file_reload_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.leeway = leeway
+        self.transport = transport
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._last_refresh = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Set by verify() on an unknown kid, to refresh ahead of schedule
+        self._wake = threading.Event()
+        self._loaded = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, project_id: str, transport: Optional[HttpTransport] = None) -> "LocalTokenVerifier":
+        """Build a verifier from AUTH_JWKS_* environment variables"""
+        return cls(
+            project_id=project_id,
+            key_source=os.getenv("AUTH_JWKS_SOURCE", GOOGLE_CERTS_URL),
+            refresh_margin=float(os.getenv("AUTH_JWKS_REFRESH_MARGIN_SECONDS", "300")),
+            transport=transport,
+        )
+
+    @property
+    def is_remote(self) -> bool:
+        return self.key_source.startswith(("http://", "https://"))
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Verify an ID token's RS256 signature, issuer, audience and expiry"""
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") != "RS256":
+            raise jwt.InvalidAlgorithmError("ID token must be signed with RS256")
+
+        kid = header.get("kid")
+        key = self._get_key(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"No public key for kid {kid!r}")
+
+        decoded = jwt.decode(
+            token,
+            key,
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"require": ["exp", "iat", "sub"]},
+        )
+        if not decoded["sub"] or len(decoded["sub"]) > 128:
+            raise jwt.InvalidTokenError("ID token has an invalid subject")
+
+        decoded["uid"] = decoded["sub"]
+        return decoded
+
+    def refresh(self) -> None:
+        """Load keys from the configured source and record when they expire"""
+        raw, max_age = self._load_source()
+        keys = self._parse_keys(raw)
+        with self._lock:
+            self._keys = keys
+            self._last_refresh = time.time()
+            self._expires_at = self._last_refresh + max_age
+
+    def start(self, wait: float = 0.0) -> bool:
+        """Start loading and refreshing keys in the background, waiting up to wait seconds for the first load"""
+        if self._refresher is None or not self._refresher.is_alive():
+            self._stop.clear()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="jwks-refresher", daemon=True)
+            self._refresher.start()
+        return self._loaded.wait(wait) if wait > 0 else self._loaded.is_set()
+
+    def stop(self) -> None:
+        """Stop the background refresher"""
+        self._stop.set()
+        self._wake.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=1)
+            self._refresher = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return loaded key ids and refresh timing"""
+        return {
+            "key_source": self.key_source,
+            "kids": sorted(self._keys),
+            "last_refresh": self._last_refresh,
+            "expires_at": self._expires_at,
+        }
+
+    def _get_key(self, kid: Optional[str]) -> Any:
+        key = self._keys.get(kid)
+        if key is None:
+            # Never fetch here: this runs on the event loop, so ask the refresher instead
+            if self._refresher is None or not self._refresher.is_alive():
+                self.start()
+            if not self._loaded.is_set():
+                raise BackendUnavailableError("verify_id_token", "public keys not loaded yet", 1.0)
+            if time.time() - self._last_refresh >= self.min_refresh_interval:
+                # Keys are published ahead of use, so an unknown kid usually means a missed rotation:
+                # have the client retry once the refresher has fetched them
+                self._wake.set()
+                raise BackendUnavailableError("verify_id_token", "refreshing public keys", 1.0)
+        return key
+
+    def _refresh_loop(self) -> None:
+        while True:
+            # However it was woken, refresh at most once per min_refresh_interval
+            if self._stop.wait(max(self._last_attempt + self.min_refresh_interval - time.time(), 0.0)):
+                return
+            self._wake.clear()
+            self._last_attempt = time.time()
+            try:
+                self.refresh()
+                self._loaded.set()
+            except Exception as e:
+                print(f"Public key refresh failed: {e}")
+
+            if not self._keys:
+                delay = self.min_refresh_interval
+            elif self.is_remote:
+                delay = max(self._expires_at - self.refresh_margin - time.time(), self.min_refresh_interval)
+            else:
+                delay = self.file_reload_interval
+            self._wake.wait(delay)
+            if self._stop.is_set():
+                return
+
+    def _load_source(self) -> Tuple[Dict[str, Any], float]:
+        if self.is_remote:
+            if self.transport is not None:
+                response = self.transport.request("GET", self.key_source)
+            else:
+                import httpx
+
+                response = httpx.get(self.key_source, timeout=10.0)
+            response.raise_for_status()
+            match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+            max_age = float(match.group(1)) if match else 3600.0
+            return response.json(), max_age
+
+        with open(self.key_source, "r") as file:
+            return json.load(file), self.file_reload_interval
+
+    @staticmethod
+    def _parse_keys(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse either a JWKS document or Google's {kid: PEM certificate} mapping"""
+        from cryptography.x509 import load_pem_x509_certificate
+
+        if "keys" in raw:
+            return {
+                jwk["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+                for jwk in raw["keys"]
+                if jwk.get("kty") == "RSA"
+            }
+
+        return {
+            kid: load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+            for kid, pem in raw.items()
+        }
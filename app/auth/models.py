@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
 
@@ -32,8 +32,23 @@ class AuthResponse(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
 
 
 class RefreshTokenRequest(BaseModel):
-    refresh_token: str 
\ No newline at end of file
+    refresh_token: str
+
+
+class UserImportRequest(BaseModel):
+    email: EmailStr
+    password: str
+    first_name: str
+    last_name: str
+    role: str = "user"
+    uid: Optional[str] = None
+
+
+class ProfilingRequest(BaseModel):
+    enabled: bool
+    sample_rate: Optional[float] = Field(None, gt=0, le=1)
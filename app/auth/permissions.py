@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Any, Dict, FrozenSet, Iterable, Tuple
+
+# Role declarations: each role grants permissions and inherits every grant of its parent roles.
+# "*" grants every declared permission.
+DEFAULT_ROLES: Dict[str, Dict[str, Any]] = {
+    "user": {
+        "permissions": ["profile:read", "resources:create"],
+    },
+    "admin": {
+        "inherits": ["user"],
+        "permissions": ["*"],
+    },
+}
+
+# Permissions that exist even if no role grants them explicitly
+DEFAULT_PERMISSIONS = [
+    "profile:read",
+    "resources:create",
+    "resources:delete",
+    "users:import",
+    "users:export",
+    "stats:read",
+    "profiling:write",
+]
+
+_NO_ROLES: FrozenSet[str] = frozenset()
+
+
+class AuthorizationPolicy:
+    """Roles and permissions compiled once into bitmasks and role sets for O(1) checks"""
+
+    def __init__(self, roles: Dict[str, Dict[str, Any]], permissions: Iterable[str] = ()):
+        self.roles = roles
+        self.permissions = permissions
+        self.compile()
+
+    @classmethod
+    def from_env(cls) -> "AuthorizationPolicy":
+        """Load role declarations from AUTH_ROLES_FILE, falling back to the built-in roles"""
+        roles_file = os.getenv("AUTH_ROLES_FILE")
+        if roles_file:
+            with open(roles_file, "r") as file:
+                return cls(json.load(file), DEFAULT_PERMISSIONS)
+        return cls(DEFAULT_ROLES, DEFAULT_PERMISSIONS)
+
+    def compile(self) -> None:
+        """Resolve inheritance and assign each permission a bit"""
+        names = set(self.permissions)
+        for definition in self.roles.values():
+            names.update(p for p in definition.get("permissions", []) if p != "*")
+
+        self.permission_bits = {name: 1 << index for index, name in enumerate(sorted(names))}
+        self._all_bits = (1 << len(self.permission_bits)) - 1
+        self.role_masks: Dict[str, int] = {}
+        self.role_closure: Dict[str, FrozenSet[str]] = {}
+        for role in self.roles:
+            self._resolve(role, ())
+
+    def _resolve(self, role: str, stack: Tuple[str, ...]) -> None:
+        if role in self.role_masks:
+            return
+        if role in stack:
+            raise ValueError(f"Role inheritance cycle: {' -> '.join(stack + (role,))}")
+        if role not in self.roles:
+            raise ValueError(f"Unknown role {role!r} inherited by {stack[-1]!r}")
+
+        definition = self.roles[role]
+        mask = 0
+        for permission in definition.get("permissions", []):
+            mask |= self._all_bits if permission == "*" else self.permission_bits[permission]
+
+        closure = {role}
+        for parent in definition.get("inherits", []):
+            self._resolve(parent, stack + (role,))
+            mask |= self.role_masks[parent]
+            closure |= self.role_closure[parent]
+
+        self.role_masks[role] = mask
+        self.role_closure[role] = frozenset(closure)
+
+    def permission_mask(self, *permissions: str) -> int:
+        """Combine permission names into one bitmask, rejecting undeclared names"""
+        mask = 0
+        for permission in permissions:
+            if permission not in self.permission_bits:
+                raise ValueError(f"Unknown permission {permission!r}")
+            mask |= self.permission_bits[permission]
+        return mask
+
+    def check_known_role(self, role: str) -> None:
+        if role not in self.roles:
+            raise ValueError(f"Unknown role {role!r}")
+
+    def has_permissions(self, role: str, mask: int) -> bool:
+        """Check a role against a precomputed permission mask"""
+        return self.role_masks.get(role, 0) & mask == mask
+
+    def has_role(self, role: str, required_role: str) -> bool:
+        """Check whether a role is, or inherits from, the required role"""
+        return required_role in self.role_closure.get(role, _NO_ROLES)
+
+
+# Global policy, compiled at startup
+policy = AuthorizationPolicy.from_env()
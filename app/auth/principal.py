@@ -0,0 +1,109 @@
+"""
+The authenticated caller of a request.
+
+A Principal is immutable, so the principal cache hands one instance to every
+request that presents the same token instead of copying a dict per hit. Role
+names are interned, so a full cache holds one string per role. It still reads
+like the dict it replaced: principal["email"], principal.get("role") and
+dict(principal) all work. The user shapes our responses embed are serialized
+once per instance, on first use.
+"""
+
+import importlib.util
+import json
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator
+
+if importlib.util.find_spec("orjson") is not None:
+    from orjson import dumps as _dumps
+else:
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+FIELDS = ("uid", "email", "first_name", "last_name", "role")
+_FIELD_SET = frozenset(FIELDS)
+
+
+class Principal(Mapping):
+    """A verified user's uid, email, names and role; read-only and safe to share between requests"""
+
+    __slots__ = FIELDS + ("_user_json", "_summary_json", "_profile_json")
+
+    uid: str
+    email: str
+    first_name: str
+    last_name: str
+    role: str
+
+    def __init__(self, uid: str, email: str, first_name: str = "", last_name: str = "", role: str = "user"):
+        init = object.__setattr__
+        init(self, "uid", uid)
+        init(self, "email", email)
+        init(self, "first_name", first_name)
+        init(self, "last_name", last_name)
+        init(self, "role", sys.intern(role) if type(role) is str else role)
+        init(self, "_user_json", None)
+        init(self, "_summary_json", None)
+        init(self, "_profile_json", None)
+
+    @classmethod
+    def from_claims(cls, uid: str, email: str, claims: Mapping) -> "Principal":
+        """Build a principal from custom claims or a token payload carrying first_name, last_name and role"""
+        return cls(uid, email, claims.get("first_name", ""), claims.get("last_name", ""), claims.get("role", "user"))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Principal is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Principal is immutable; cannot delete {name!r}")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Principal(uid={self.uid!r}, email={self.email!r}, role={self.role!r})"
+
+    @property
+    def user_json(self) -> bytes:
+        """{"id", "email", "first_name", "last_name", "role"} as JSON"""
+        return self._memo("_user_json", lambda: {
+            "id": self.uid,
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "role": self.role,
+        })
+
+    @property
+    def summary_json(self) -> bytes:
+        """{"id", "email", "role"} as JSON"""
+        return self._memo("_summary_json", lambda: {"id": self.uid, "email": self.email, "role": self.role})
+
+    @property
+    def profile_json(self) -> bytes:
+        """The UserResponse shape as JSON, for a principal known to be active"""
+        return self._memo("_profile_json", lambda: {
+            "id": self.uid,
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "is_active": True,
+            "created_at": "",
+        })
+
+    def _memo(self, slot: str, build: Callable[[], Any]) -> bytes:
+        data = getattr(self, slot)
+        if data is None:
+            # Racing threads serialize the same bytes; either result may win
+            data = _dumps(build())
+            object.__setattr__(self, slot, data)
+        return data
@@ -0,0 +1,257 @@
+"""
+Per-IP and per-account rate limiting for the unauthenticated auth endpoints.
+
+Each limit is a GCRA (generic cell rate algorithm) bucket: `limit` requests per
+`period` seconds, refilling evenly, with a burst of up to `limit`. A bucket is a
+single float per key, its theoretical arrival time (TAT), so the in-memory
+store is a dict of floats. Rejected requests get a 429 with `Retry-After`.
+"""
+
+import math
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Request, status
+
+from ..metrics import AUTH_RATE_LIMITED
+from .sqlite_store import SQLiteDatabase, store_call
+
+# Idle keys checked per request while an old generation drains, so sweeping never stalls a request
+SWEEP_BATCH = 8
+
+# name -> (env var, default "<requests>/<period seconds>")
+DEFAULT_LIMITS = {
+    "login_ip": ("AUTH_RATE_LIMIT_LOGIN_IP", "20/60"),
+    "login_account": ("AUTH_RATE_LIMIT_LOGIN_ACCOUNT", "5/60"),
+    "signup_ip": ("AUTH_RATE_LIMIT_SIGNUP_IP", "10/3600"),
+    "refresh_ip": ("AUTH_RATE_LIMIT_REFRESH_IP", "60/60"),
+}
+
+
+class RateLimitStore:
+    """Holds the TAT of every key of one limit"""
+
+    def __init__(self, name: str, window: float):
+        self.name = name
+        # Longest a TAT can stay ahead of the clock; a key untouched for this long is idle
+        self.window = window
+
+    @classmethod
+    def from_env(cls, name: str, window: float) -> "RateLimitStore":
+        """Build the backend named by AUTH_RATE_LIMIT_STORE ("memory" or "sqlite")"""
+        backend = os.getenv("AUTH_RATE_LIMIT_STORE", "memory").lower()
+        if backend == "sqlite":
+            return SQLiteRateLimitStore(os.getenv("AUTH_RATE_LIMIT_STORE_PATH", "rate_limits.db"), name, window)
+        if backend != "memory":
+            raise ValueError(f"Unknown rate limit store {backend!r}")
+        return MemoryRateLimitStore(name, window)
+
+    def acquire(self, key: str, emission: float) -> float:
+        """Take one request from the key's bucket; return 0 if allowed, else the seconds until it would be"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend}
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """In-process store in two generations of dicts, so idle keys expire without a full scan"""
+
+    backend = "memory"
+    shared = False
+
+    def __init__(self, name: str, window: float):
+        super().__init__(name, window)
+        # Keys touched this window, and keys last touched the window before. Keys are
+        # built-in hashes of the client key: buckets never leave the process, and an int
+        # is smaller than the IP or email it stands for
+        self._current: Dict[int, float] = {}
+        self._previous: Dict[int, float] = {}
+        self._rotate_at = time.monotonic() + window
+
+    def acquire(self, key: str, emission: float) -> float:
+        # Called on the event loop thread only, so the dicts need no lock
+        now = time.monotonic()
+        if now >= self._rotate_at:
+            self._rotate(now)
+        elif self._previous:
+            self._sweep(now)
+
+        slot = hash(key)
+        current = self._current
+        tat = current.get(slot)
+        if tat is None:
+            tat = self._previous.pop(slot, now)
+        if tat < now:
+            tat = now
+        wait = tat + emission - self.window - now
+        if wait > 0:
+            current[slot] = tat
+            return wait
+        current[slot] = tat + emission
+        return 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "keys": len(self._current) + len(self._previous)}
+
+    def _rotate(self, now: float) -> None:
+        # Whatever is left of the old generation was last touched over a window ago: every bucket is full
+        self._previous = self._current
+        self._current = {}
+        self._rotate_at = now + self.window
+
+    def _sweep(self, now: float) -> None:
+        previous, current = self._previous, self._current
+        for _ in range(SWEEP_BATCH):
+            if not previous:
+                break
+            slot, tat = previous.popitem()
+            # Drop full buckets; carry forward the few still refilling
+            if tat > now and slot not in current:
+                current[slot] = tat
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Store in a local SQLite file shared by every worker process on the host"""
+
+    backend = "sqlite"
+    shared = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            name TEXT NOT NULL,
+            key TEXT NOT NULL,
+            tat REAL NOT NULL,
+            PRIMARY KEY (name, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS rate_limits_tat ON rate_limits (tat);
+    """
+
+    def __init__(self, path: str, name: str, window: float, purge_interval: float = 60.0):
+        super().__init__(name, window)
+        self.path = path
+        self._db = SQLiteDatabase(path, self.SCHEMA, purge_interval)
+
+    def acquire(self, key: str, emission: float) -> float:
+        now = time.time()
+        with self._db.transaction() as conn:
+            row = conn.execute(
+                "SELECT tat FROM rate_limits WHERE name = ? AND key = ?", (self.name, key)
+            ).fetchone()
+            tat = max(row[0], now) if row is not None else now
+            wait = tat + emission - self.window - now
+            if wait <= 0:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (name, key, tat) VALUES (?, ?, ?)",
+                    (self.name, key, tat + emission),
+                )
+                self._maybe_purge(conn, now)
+        return max(wait, 0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._db.connection() as conn:
+            keys = conn.execute(
+                "SELECT COUNT(*) FROM rate_limits WHERE name = ?", (self.name,)
+            ).fetchone()[0]
+        return {"backend": self.backend, "keys": keys, "path": self.path}
+
+    def _maybe_purge(self, conn: sqlite3.Connection, now: float) -> None:
+        if not self._db.purge_due(now):
+            return
+        # Buckets whose TAT has passed are full again: the row carries no information
+        conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+
+
+class RateLimit:
+    """`limit` requests per `period` seconds for each key"""
+
+    def __init__(self, name: str, limit: int, period: float, store: Optional[RateLimitStore] = None):
+        if limit < 1 or period <= 0:
+            raise ValueError(f"Rate limit {name} needs at least one request per positive period")
+        self.name = name
+        self.limit = limit
+        self.period = period
+        # Time one request takes to refill
+        self.emission = period / limit
+        self.store = store if store is not None else MemoryRateLimitStore(name, period)
+        self._rejected = AUTH_RATE_LIMITED.labels(name)
+
+    def acquire(self, key: str) -> float:
+        wait = self.store.acquire(key, self.emission)
+        if wait:
+            self._rejected.inc()
+        return wait
+
+
+class RateLimiter:
+    """The named limits applied to the auth endpoints"""
+
+    def __init__(self, limits: Dict[str, RateLimit], enabled: bool = True, forwarded_hops: int = 0):
+        self.limits = limits
+        self.enabled = enabled
+        # Proxies in front of the app; the client address is read from X-Forwarded-For that many hops back
+        self.forwarded_hops = forwarded_hops
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build the limiter from AUTH_RATE_LIMIT_* environment variables"""
+        limits = {}
+        for name, (variable, default) in DEFAULT_LIMITS.items():
+            count, _, period = os.getenv(variable, default).partition("/")
+            limits[name] = RateLimit(name, int(count), float(period), RateLimitStore.from_env(name, float(period)))
+        return cls(
+            limits,
+            enabled=os.getenv("AUTH_RATE_LIMIT_ENABLED", "true").lower() == "true",
+            forwarded_hops=int(os.getenv("AUTH_RATE_LIMIT_FORWARDED_HOPS", "0")),
+        )
+
+    def client_ip(self, request: Request) -> str:
+        """The caller's address, looking past the configured number of trusted proxies"""
+        if self.forwarded_hops:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                hops = [hop.strip() for hop in forwarded.split(",")]
+                return hops[max(len(hops) - self.forwarded_hops, 0)]
+        return request.client.host if request.client else "unknown"
+
+    def check(self, **keys: str) -> float:
+        """Count one request against each named limit (limit=key); return the longest wait, 0 if allowed"""
+        if not self.enabled:
+            return 0.0
+        wait = 0.0
+        for name, key in keys.items():
+            wait = max(wait, self.limits[name].acquire(key))
+        return wait
+
+    def enforce(self, **keys: str) -> None:
+        """Like check, but raise a 429 with Retry-After when any limit is exhausted"""
+        wait = self.check(**keys)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    @property
+    def shared(self) -> bool:
+        """Whether any limit keeps its buckets in a store shared across workers"""
+        return any(limit.store.shared for limit in self.limits.values())
+
+    async def aenforce(self, **keys: str) -> None:
+        """enforce for async routes, run in a thread when a store is shared so its lock waits block no one"""
+        await store_call(self.enabled and self.shared, self.enforce, **keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "limits": {
+                name: {"limit": limit.limit, "period": limit.period, **limit.store.stats()}
+                for name, limit in self.limits.items()
+            },
+        }
+
+
+rate_limiter = RateLimiter.from_env()
@@ -0,0 +1,321 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .sqlite_store import SQLiteDatabase
+
+# Expired entries dropped per write, so purging never stalls a single request
+PURGE_BATCH = 64
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be rotated"""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class RefreshTokenStore:
+    """Tracks refresh token IDs (jti) by family so tokens rotate once and can be revoked"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.issued = 0
+        self.rotated = 0
+        self.reuse_detected = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, ttl_seconds: float) -> "RefreshTokenStore":
+        """Build the backend named by AUTH_REFRESH_STORE ("memory" or "sqlite")"""
+        backend = os.getenv("AUTH_REFRESH_STORE", "memory").lower()
+        if backend == "sqlite":
+            return SQLiteRefreshTokenStore(
+                os.getenv("AUTH_REFRESH_STORE_PATH", "refresh_tokens.db"),
+                ttl_seconds,
+            )
+        if backend != "memory":
+            raise ValueError(f"Unknown refresh token store {backend!r}")
+        return MemoryRefreshTokenStore(ttl_seconds)
+
+    @staticmethod
+    def new_jti() -> str:
+        return secrets.token_urlsafe(16)
+
+    def issue(self, uid: str) -> str:
+        """Record the first token of a new family (one per sign-in) and return its jti"""
+        raise NotImplementedError
+
+    def rotate(self, jti: str, uid: str) -> str:
+        """Consume a token and return the jti of its successor in the same family"""
+        raise NotImplementedError
+
+    def revoke(self, jti: str) -> None:
+        """Revoke the family a token belongs to (logout of one session)"""
+        raise NotImplementedError
+
+    def revoke_user(self, uid: str) -> None:
+        """Revoke every token issued to a user so far (logout everywhere)"""
+        raise NotImplementedError
+
+    def is_revoked(self, family: Optional[str], uid: str, issued_at: float) -> bool:
+        """Check whether a session was revoked, or its user was logged out after issued_at"""
+        raise NotImplementedError
+
+    def revocations_since(self, since: float) -> List[Tuple[str, str, float]]:
+        """Return ("session", family, revoked_at) and ("user", uid, revoked_at) revoked after since"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        """Return live token counts and rotation counters"""
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            "issued": self.issued,
+            "rotated": self.rotated,
+            "reuse_detected": self.reuse_detected,
+            "rejected": self.rejected,
+        }
+
+    def _reject(self, code: str) -> RefreshTokenError:
+        self.rejected += 1
+        if code == "reused":
+            self.reuse_detected += 1
+        return RefreshTokenError(code)
+
+
+class MemoryRefreshTokenStore(RefreshTokenStore):
+    """In-process store; dict lookups and insertion-ordered TTL expiry"""
+
+    backend = "memory"
+    # Private to this process, so every revocation is seen as it happens
+    shared = False
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__(ttl_seconds)
+        # Every token lives for ttl_seconds, so insertion order is also expiry order
+        self._tokens: "OrderedDict[str, Tuple[str, str, float, bool]]" = OrderedDict()
+        self._revoked_families: "OrderedDict[str, float]" = OrderedDict()
+        self._revoked_users: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def issue(self, uid: str) -> str:
+        jti = self.new_jti()
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            # The first jti doubles as the family id
+            self._tokens[jti] = (jti, uid, now, False)
+            self.issued += 1
+        return jti
+
+    def rotate(self, jti: str, uid: str) -> str:
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            entry = self._tokens.get(jti)
+            if entry is None or entry[1] != uid or entry[2] + self.ttl_seconds <= now:
+                raise self._reject("unknown")
+
+            family, _, issued_at, used = entry
+            if self.is_revoked(family, uid, issued_at):
+                raise self._reject("revoked")
+            if used:
+                # A consumed token came back: assume it was stolen and end the session
+                self._revoked_families.setdefault(family, now)
+                raise self._reject("reused")
+
+            # Keep the consumed entry until it expires so reuse can still be detected
+            self._tokens[jti] = (family, uid, issued_at, True)
+            new_jti = self.new_jti()
+            self._tokens[new_jti] = (family, uid, now, False)
+            self.rotated += 1
+        return new_jti
+
+    def revoke(self, jti: str) -> None:
+        with self._lock:
+            entry = self._tokens.get(jti)
+            if entry is not None:
+                self._revoked_families.setdefault(entry[0], time.time())
+
+    def revoke_user(self, uid: str) -> None:
+        with self._lock:
+            self._revoked_users.pop(uid, None)
+            self._revoked_users[uid] = time.time()
+
+    def is_revoked(self, family: Optional[str], uid: str, issued_at: float) -> bool:
+        return family in self._revoked_families or issued_at <= self._revoked_users.get(uid, 0.0)
+
+    def revocations_since(self, since: float) -> List[Tuple[str, str, float]]:
+        revocations = []
+        with self._lock:
+            # Both maps are kept in revocation order, so walk back from the newest entry
+            for kind, revoked in (("session", self._revoked_families), ("user", self._revoked_users)):
+                for key in reversed(revoked):
+                    revoked_at = revoked[key]
+                    if revoked_at <= since:
+                        break
+                    revocations.append((kind, key, revoked_at))
+        return revocations
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "tokens": len(self._tokens),
+            "revoked_families": len(self._revoked_families),
+            "revoked_users": len(self._revoked_users),
+        })
+        return stats
+
+    def _purge(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        for _ in range(PURGE_BATCH):
+            jti = next(iter(self._tokens), None)
+            if jti is None or self._tokens[jti][2] > cutoff:
+                break
+            del self._tokens[jti]
+
+        # Anything revoked more than one TTL ago only covers tokens that have expired anyway
+        for revoked in (self._revoked_families, self._revoked_users):
+            for _ in range(PURGE_BATCH):
+                key = next(iter(revoked), None)
+                if key is None or revoked[key] > cutoff:
+                    break
+                del revoked[key]
+
+
+class SQLiteRefreshTokenStore(RefreshTokenStore):
+    """Store in a local SQLite file shared by every worker process on the host"""
+
+    backend = "sqlite"
+    shared = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS refresh_tokens (
+            jti TEXT PRIMARY KEY,
+            family TEXT NOT NULL,
+            uid TEXT NOT NULL,
+            issued_at REAL NOT NULL,
+            used INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS refresh_tokens_issued_at ON refresh_tokens (issued_at);
+        CREATE TABLE IF NOT EXISTS revoked_families (
+            family TEXT PRIMARY KEY,
+            revoked_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS revoked_families_revoked_at ON revoked_families (revoked_at);
+        CREATE TABLE IF NOT EXISTS revoked_users (
+            uid TEXT PRIMARY KEY,
+            revoked_at REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS revoked_users_revoked_at ON revoked_users (revoked_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, purge_interval: float = 60.0):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._db = SQLiteDatabase(path, self.SCHEMA, purge_interval)
+
+    def issue(self, uid: str) -> str:
+        jti = self.new_jti()
+        now = time.time()
+        with self._db.connection() as conn:
+            conn.execute(
+                "INSERT INTO refresh_tokens (jti, family, uid, issued_at) VALUES (?, ?, ?, ?)",
+                (jti, jti, uid, now),
+            )
+            self.issued += 1
+            self._maybe_purge(conn, now)
+        return jti
+
+    def rotate(self, jti: str, uid: str) -> str:
+        now = time.time()
+        # On reuse, keep the family revocation recorded
+        with self._db.transaction(commit_on=(RefreshTokenError,)) as conn:
+            new_jti = self._rotate(conn, jti, uid, now)
+            self.rotated += 1
+        return new_jti
+
+    def _rotate(self, conn: sqlite3.Connection, jti: str, uid: str, now: float) -> str:
+        row = conn.execute(
+            "SELECT family, uid, issued_at, used FROM refresh_tokens WHERE jti = ?", (jti,)
+        ).fetchone()
+        if row is None or row[1] != uid or row[2] + self.ttl_seconds <= now:
+            raise self._reject("unknown")
+
+        family, _, issued_at, used = row
+        if self._is_revoked(conn, family, uid, issued_at):
+            raise self._reject("revoked")
+        if used:
+            # A consumed token came back: assume it was stolen and end the session
+            conn.execute(
+                "INSERT OR IGNORE INTO revoked_families (family, revoked_at) VALUES (?, ?)", (family, now)
+            )
+            raise self._reject("reused")
+
+        new_jti = self.new_jti()
+        conn.execute("UPDATE refresh_tokens SET used = 1 WHERE jti = ?", (jti,))
+        conn.execute(
+            "INSERT INTO refresh_tokens (jti, family, uid, issued_at) VALUES (?, ?, ?, ?)",
+            (new_jti, family, uid, now),
+        )
+        return new_jti
+
+    def revoke(self, jti: str) -> None:
+        with self._db.connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO revoked_families (family, revoked_at) "
+                "SELECT family, ? FROM refresh_tokens WHERE jti = ?",
+                (time.time(), jti),
+            )
+
+    def revoke_user(self, uid: str) -> None:
+        with self._db.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO revoked_users (uid, revoked_at) VALUES (?, ?)", (uid, time.time())
+            )
+
+    def is_revoked(self, family: Optional[str], uid: str, issued_at: float) -> bool:
+        with self._db.connection() as conn:
+            return self._is_revoked(conn, family, uid, issued_at)
+
+    def _is_revoked(self, conn: sqlite3.Connection, family: Optional[str], uid: str, issued_at: float) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM revoked_families WHERE family = ? "
+            "UNION ALL SELECT 1 FROM revoked_users WHERE uid = ? AND revoked_at >= ?",
+            (family, uid, issued_at),
+        ).fetchone()
+        return row is not None
+
+    def revocations_since(self, since: float) -> List[Tuple[str, str, float]]:
+        with self._db.connection() as conn:
+            return conn.execute(
+                "SELECT 'session', family, revoked_at FROM revoked_families WHERE revoked_at > ? "
+                "UNION ALL SELECT 'user', uid, revoked_at FROM revoked_users WHERE revoked_at > ?",
+                (since, since),
+            ).fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._db.connection() as conn:
+            for name, table in (
+                ("tokens", "refresh_tokens"),
+                ("revoked_families", "revoked_families"),
+                ("revoked_users", "revoked_users"),
+            ):
+                stats[name] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        stats["path"] = self.path
+        return stats
+
+    def _maybe_purge(self, conn: sqlite3.Connection, now: float) -> None:
+        if not self._db.purge_due(now):
+            return
+        cutoff = now - self.ttl_seconds
+        conn.execute("DELETE FROM refresh_tokens WHERE issued_at <= ?", (cutoff,))
+        conn.execute("DELETE FROM revoked_families WHERE revoked_at <= ?", (cutoff,))
+        conn.execute("DELETE FROM revoked_users WHERE revoked_at <= ?", (cutoff,))
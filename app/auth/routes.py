@@ -1,5 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPBearer
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from .models import (
     UserSignupRequest, 
     UserLoginRequest, 
@@ -8,18 +7,24 @@ from .models import (
     TokenResponse,
     RefreshTokenRequest
 )
+from .breaker import BackendUnavailableError
 from .firebase_auth import firebase_auth
+from ..responses import FastJSONResponse, ModelResponse, RawJSONResponse
 from .dependencies import get_current_user
-from typing import Dict, Any
+from .principal import Principal
+from .ratelimit import rate_limiter
+from .sqlite_store import store_call
+from typing import Optional
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserSignupRequest):
+async def signup(user_data: UserSignupRequest, request: Request):
     """
     Create a new user account
     """
+    await rate_limiter.aenforce(signup_ip=rate_limiter.client_ip(request))
     try:
         # Create user in Firebase
         user = await firebase_auth.create_user(
@@ -35,12 +40,14 @@ async def signup(user_data: UserSignupRequest):
             password=user_data.password
         )
         
-        return AuthResponse(
+        return ModelResponse(AuthResponse(
             access_token=auth_result["access_token"],
             refresh_token=auth_result["refresh_token"],
             user=UserResponse(**auth_result["user"])
-        )
+        ), status_code=status.HTTP_201_CREATED)
         
+    except BackendUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,22 +56,31 @@ async def signup(user_data: UserSignupRequest):
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(user_data: UserLoginRequest):
+async def login(user_data: UserLoginRequest, request: Request):
     """
     Authenticate user and return access tokens
     """
+    # Per IP against credential stuffing, per account and IP against guessing one account's password.
+    # Keyed on the IP too, so wrong passwords sent from elsewhere cannot lock the owner out
+    client_ip = rate_limiter.client_ip(request)
+    await rate_limiter.aenforce(
+        login_ip=client_ip,
+        login_account=f"{user_data.email.lower()} {client_ip}"
+    )
     try:
         auth_result = await firebase_auth.sign_in_user(
             email=user_data.email,
             password=user_data.password
         )
         
-        return AuthResponse(
+        return ModelResponse(AuthResponse(
             access_token=auth_result["access_token"],
             refresh_token=auth_result["refresh_token"],
             user=UserResponse(**auth_result["user"])
-        )
+        ))
         
+    except BackendUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,23 +89,27 @@ async def login(user_data: UserLoginRequest):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(refresh_data: RefreshTokenRequest):
+async def refresh_token(refresh_data: RefreshTokenRequest, request: Request):
     """
     Refresh access token using refresh token
     """
+    await rate_limiter.aenforce(refresh_ip=rate_limiter.client_ip(request))
     try:
-        new_access_token = await firebase_auth.refresh_access_token(
+        tokens = await firebase_auth.refresh_access_token(
             refresh_data.refresh_token
         )
         
-        if not new_access_token:
+        if not tokens:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
         
-        return TokenResponse(access_token=new_access_token)
+        # The submitted refresh token is now spent; clients must store the new one
+        return ModelResponse(TokenResponse(**tokens))
         
+    except BackendUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,38 +118,36 @@ async def refresh_token(refresh_data: RefreshTokenRequest):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """
     Get current user information
     """
-    return UserResponse(
-        id=current_user["uid"],
-        email=current_user["email"],
-        first_name=current_user["first_name"],
-        last_name=current_user["last_name"],
-        is_active=True,
-        created_at=""  # You might want to fetch this from your database
-    )
+    # The UserResponse shape, with an empty created_at; you might want to fetch that from your database
+    return RawJSONResponse(current_user.profile_json)
 
 
 @router.post("/logout")
-async def logout():
+async def logout(refresh_data: Optional[RefreshTokenRequest] = None):
+    """
+    Logout user, revoking the session of the given refresh token (client should discard tokens)
+    """
+    if refresh_data is not None:
+        await store_call(firebase_auth.refresh_tokens.shared, firebase_auth.revoke_refresh_token, refresh_data.refresh_token)
+    return FastJSONResponse({"message": "Successfully logged out"})
+
+
+@router.post("/logout-all")
+async def logout_all(current_user: Principal = Depends(get_current_user)):
     """
-    Logout user (client should discard tokens)
+    Revoke every refresh token issued to the current user
     """
-    return {"message": "Successfully logged out"}
+    await store_call(firebase_auth.refresh_tokens.shared, firebase_auth.revoke_user_sessions, current_user.uid)
+    return FastJSONResponse({"message": "Successfully logged out of all sessions"})
 
 
 @router.get("/verify")
-async def verify_token(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def verify_token(current_user: Principal = Depends(get_current_user)):
     """
     Verify if the current token is valid
     """
-    return {
-        "valid": True,
-        "user": {
-            "id": current_user["uid"],
-            "email": current_user["email"],
-            "role": current_user["role"]
-        }
-    } 
\ No newline at end of file
+    return RawJSONResponse(b'{"valid":true,"user":' + current_user.summary_json + b"}")
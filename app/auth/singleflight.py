@@ -0,0 +1,51 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one in-flight awaitable"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        """Build from the AUTH_SINGLE_FLIGHT_ENABLED environment variable"""
+        return cls(enabled=os.getenv("AUTH_SINGLE_FLIGHT_ENABLED", "true").lower() == "true")
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await func(), or join an identical call that is already in flight"""
+        if not self.enabled:
+            return await func()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        else:
+            self.shared += 1
+
+        # Shield so one caller being cancelled does not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every waiter was cancelled
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls ran and how many joined an in-flight call"""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
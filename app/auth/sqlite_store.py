@@ -0,0 +1,80 @@
+"""
+The SQLite file behind the stores that every worker process on a host shares.
+
+Each process opens its own connection, in WAL mode so readers never wait for a
+writer. Writers wait up to BUSY_TIMEOUT seconds for another worker's
+transaction. These calls block, so async code paths run them in a thread
+whenever the store is shared.
+"""
+
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple, Type
+
+# Seconds a writer waits for another worker's transaction before failing
+BUSY_TIMEOUT = 5.0
+
+
+async def store_call(shared: bool, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call func on the default executor when it touches a shared store, inline for in-memory ones"""
+    if not shared:
+        return func(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+class SQLiteDatabase:
+    """A SQLite file with one connection per process, serialized within the process by a lock"""
+
+    def __init__(self, path: str, schema: str, purge_interval: float = 60.0):
+        self.path = path
+        self.schema = schema
+        self.purge_interval = purge_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """This process's connection, held exclusively for the with block (autocommit)"""
+        with self._lock:
+            yield self._connect()
+
+    @contextmanager
+    def transaction(self, commit_on: Tuple[Type[BaseException], ...] = ()) -> Iterator[sqlite3.Connection]:
+        """A write transaction; rolled back on error unless the error is one of commit_on"""
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front, so two workers cannot both act on the same read
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except commit_on:
+                conn.execute("COMMIT")
+                raise
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def purge_due(self, now: float) -> bool:
+        """Whether purge_interval has passed since the last purge; claims the purge if so"""
+        if now - self._last_purge < self.purge_interval:
+            return False
+        self._last_purge = now
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker opens its own
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
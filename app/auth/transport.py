@@ -0,0 +1,254 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # httpx and requests are imported on first use, keeping them off the startup path
+    import httpx
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+# Status codes worth retrying with backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods safe to send again after the server answered; a retried POST (a sign-in, a user
+# import) could run twice, and a 429 on sign-in is an account lockout that retries only extend
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP sessions for Firebase Admin SDK and Google REST traffic"""
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        keepalive_expiry: float = 60.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        http2: bool = True,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # HTTP/2 needs the optional h2 package
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._adapters: Dict[str, "HTTPAdapter"] = {}
+        self._client: Optional["httpx.Client"] = None
+        # Pooled connections must not cross a fork, so the sync client is tied to a pid
+        self._client_pid = 0
+        self._async_client: Optional["httpx.AsyncClient"] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._admin_sdk_app: Any = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_created = 0
+        self.retried = 0
+
+    @classmethod
+    def from_env(cls) -> "HttpTransport":
+        """Build a transport from AUTH_HTTP_* environment variables"""
+        return cls(
+            pool_connections=int(os.getenv("AUTH_HTTP_POOL_CONNECTIONS", "10")),
+            pool_maxsize=int(os.getenv("AUTH_HTTP_POOL_MAXSIZE", "32")),
+            connect_timeout=float(os.getenv("AUTH_HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("AUTH_HTTP_READ_TIMEOUT", "30")),
+            keepalive_expiry=float(os.getenv("AUTH_HTTP_KEEPALIVE_EXPIRY", "60")),
+            retries=int(os.getenv("AUTH_HTTP_RETRIES", "3")),
+            backoff_factor=float(os.getenv("AUTH_HTTP_BACKOFF_FACTOR", "0.5")),
+            http2=os.getenv("AUTH_HTTP2", "true").lower() == "true",
+        )
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout in the form requests accepts"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def _retry(self) -> "Retry":
+        from urllib3.util.retry import Retry
+
+        return Retry(
+            total=self.retries,
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=self.backoff_factor,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+
+    def mount(
+        self,
+        session: "requests.Session",
+        name: str,
+        adapter_class: Optional[type] = None,
+        **adapter_kwargs: Any
+    ) -> None:
+        """Mount a sized, retrying keep-alive adapter on a requests session"""
+        if adapter_class is None:
+            from requests.adapters import HTTPAdapter
+
+            adapter_class = HTTPAdapter
+        adapter = adapter_class(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self._retry(),
+            **adapter_kwargs
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        self._adapters[name] = adapter
+
+    def configure_admin_sdk(self, app: Any) -> None:
+        """Route the Admin SDK's auth traffic through pooled adapters (once per app)"""
+        if self._admin_sdk_app is app:
+            return
+        with self._lock:
+            if self._admin_sdk_app is app:
+                return
+            self._admin_sdk_app = app
+
+            # The SDK does not expose its sessions publicly, so reach into the auth client
+            from cachecontrol import CacheControlAdapter
+            from firebase_admin import auth as admin_auth
+
+            try:
+                client = admin_auth._get_client(app)
+                self.mount(client._user_manager.http_client.session, "admin_sdk")
+                self.mount(client._token_verifier.request.session, "admin_sdk_certs", CacheControlAdapter)
+            except Exception as e:
+                print(f"Could not configure Admin SDK transport: {e}")
+
+    def client(self) -> "httpx.Client":
+        """Shared synchronous httpx client for REST calls made from worker threads"""
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    import httpx
+
+                    # A client inherited across fork is dropped, not closed: its sockets belong to the parent
+                    self._client = httpx.Client(
+                        timeout=self._httpx_timeout(),
+                        transport=httpx.HTTPTransport(http2=self.http2, limits=self._limits(), retries=self.retries),
+                    )
+                    self._client_pid = os.getpid()
+        return self._client
+
+    def async_client(self) -> "httpx.AsyncClient":
+        """Shared async httpx client for REST calls made from the event loop"""
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            # Connections are bound to the loop that opened them
+            self._async_client = httpx.AsyncClient(
+                timeout=self._httpx_timeout(),
+                transport=httpx.AsyncHTTPTransport(http2=self.http2, limits=self._limits(), retries=self.retries),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    def request(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a request on the shared sync client, retrying idempotent methods on retryable statuses"""
+        retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            self.requests += 1
+            response = self.client().request(method, url, extensions={"trace": self._trace}, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            self.retried += 1
+            time.sleep(self._backoff(attempt))
+        return response
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a request on the shared async client, retrying idempotent methods on retryable statuses"""
+        retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            self.requests += 1
+            response = await self.async_client().request(method, url, extensions={"trace": self._atrace}, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            self.retried += 1
+            await asyncio.sleep(self._backoff(attempt))
+        return response
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_factor * (2 ** attempt)
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self.connections_created += 1
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]) -> None:
+        self._trace(event_name, info)
+
+    def _limits(self) -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(
+            max_connections=self.pool_connections * self.pool_maxsize,
+            max_keepalive_connections=self.pool_maxsize,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _httpx_timeout(self) -> "httpx.Timeout":
+        import httpx
+
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    def close(self) -> None:
+        """Close the shared httpx clients; they are recreated on next use"""
+        if self._client is not None and self._client_pid == os.getpid():
+            self._client.close()
+        self._client = None
+        self._async_client = None
+        self._async_client_loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return open connections and connection reuse for every pool"""
+        pools: Dict[str, Any] = {}
+        for name, adapter in self._adapters.items():
+            created = handled = idle = 0
+            for key in adapter.poolmanager.pools.keys():
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                created += pool.num_connections
+                handled += pool.num_requests
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            pools[name] = _pool_stats(created, handled)
+            # urllib3 only tracks connections parked in the pool, not ones in use
+            pools[name]["idle_connections"] = idle
+
+        open_connections = 0
+        for client in (self._client, self._async_client):
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            if pool is not None:
+                open_connections += len(pool.connections)
+        pools["rest"] = _pool_stats(self.connections_created, self.requests)
+        pools["rest"]["open_connections"] = open_connections
+        pools["rest"]["retried"] = self.retried
+
+        return {
+            "http2": self.http2,
+            "pool_maxsize": self.pool_maxsize,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "pools": pools,
+        }
+
+
+def _pool_stats(created: int, handled: int) -> Dict[str, Any]:
+    return {
+        "connections_created": created,
+        "requests": handled,
+        "reuse_ratio": max(1 - created / handled, 0.0) if handled else 0.0,
+    }
@@ -1,86 +1,80 @@
 from fastapi import APIRouter, Depends
-from app.auth.dependencies import get_current_user, get_current_active_user, require_admin, require_user
-from typing import Dict, Any
+from app.auth.dependencies import get_current_user, get_current_active_user, require_admin, require_user, require_permission
+from app.auth.principal import Principal
+from app.responses import FastJSONResponse, RawJSONResponse
 
 router = APIRouter(prefix="/protected", tags=["protected"])
 
 
 @router.get("/user-info")
-async def get_user_info(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_user_info(current_user: Principal = Depends(get_current_user)):
     """
     Get information about the currently authenticated user
     """
-    return {
-        "message": "User information retrieved successfully",
-        "user": {
-            "id": current_user["uid"],
-            "email": current_user["email"],
-            "first_name": current_user["first_name"],
-            "last_name": current_user["last_name"],
-            "role": current_user["role"]
-        }
-    }
+    return RawJSONResponse(
+        b'{"message":"User information retrieved successfully","user":' + current_user.user_json + b"}"
+    )
 
 
 @router.get("/active-only")
-async def active_users_only(current_user: Dict[str, Any] = Depends(get_current_active_user)):
+async def active_users_only(current_user: Principal = Depends(get_current_active_user)):
     """
     Endpoint that only allows active users
     """
-    return {
+    return FastJSONResponse({
         "message": "This endpoint is only accessible to active users",
-        "user_email": current_user["email"]
-    }
+        "user_email": current_user.email
+    })
 
 
 @router.get("/admin-only")
-async def admin_only(current_user: Dict[str, Any] = Depends(require_admin)):
+async def admin_only(current_user: Principal = Depends(require_admin)):
     """
     Endpoint that only allows admin users
     """
-    return {
+    return FastJSONResponse({
         "message": "This endpoint is only accessible to admin users",
-        "admin_email": current_user["email"]
-    }
+        "admin_email": current_user.email
+    })
 
 
 @router.get("/user-or-admin")
-async def user_or_admin(current_user: Dict[str, Any] = Depends(require_user)):
+async def user_or_admin(current_user: Principal = Depends(require_user)):
     """
     Endpoint that allows both regular users and admins
     """
-    return {
+    return FastJSONResponse({
         "message": "This endpoint is accessible to users and admins",
-        "user_email": current_user["email"],
-        "user_role": current_user["role"]
-    }
+        "user_email": current_user.email,
+        "user_role": current_user.role
+    })
 
 
 @router.post("/create-resource")
 async def create_resource(
     resource_data: dict,
-    current_user: Dict[str, Any] = Depends(get_current_active_user)
+    current_user: Principal = Depends(require_permission("resources:create"))
 ):
     """
-    Example of creating a resource with user authentication
+    Example of creating a resource (requires the resources:create permission)
     """
-    return {
+    return FastJSONResponse({
         "message": "Resource created successfully",
         "resource": resource_data,
-        "created_by": current_user["email"],
-        "user_id": current_user["uid"]
-    }
+        "created_by": current_user.email,
+        "user_id": current_user.uid
+    })
 
 
 @router.delete("/delete-resource/{resource_id}")
 async def delete_resource(
     resource_id: str,
-    current_user: Dict[str, Any] = Depends(require_admin)
+    current_user: Principal = Depends(require_permission("resources:delete"))
 ):
     """
-    Example of deleting a resource (admin only)
+    Example of deleting a resource (requires the resources:delete permission)
     """
-    return {
+    return FastJSONResponse({
         "message": f"Resource {resource_id} deleted successfully",
-        "deleted_by": current_user["email"]
-    } 
\ No newline at end of file
+        "deleted_by": current_user.email
+    })
@@ -1,15 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from .auth.routes import router as auth_router
+from .auth.admin_routes import router as admin_router
+from .auth.breaker import BackendUnavailableError
+from .auth.firebase_auth import firebase_auth
 from .example_protected_routes import router as protected_router
+from .metrics import MetricsMiddleware, registry
+from .profiling import ProfilingMiddleware, profiler
+from .responses import FastJSONResponse
+import math
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker process, after any fork, so every worker sets up its own Admin SDK app
+    if os.getenv("AUTH_INIT_ON_STARTUP", "true").lower() == "true":
+        firebase_auth.initialize()
+        if firebase_auth.token_verifier is not None:
+            # Give the first public-key fetch a chance to finish before serving ID tokens
+            wait = float(os.getenv("AUTH_JWKS_STARTUP_WAIT_SECONDS", "10"))
+            if not firebase_auth.token_verifier.start(wait):
+                print("Public keys not loaded yet; ID tokens are answered with 503 until they are")
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="Authentication API",
     description="A FastAPI application with Firebase authentication",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -21,12 +44,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampled request profiling, switched on at runtime through /auth/admin/profiling
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Per-route latency and in-flight requests, exposed at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    registry.gauge("auth_backend_queue_depth", "Backend calls waiting for an executor thread").set_function(
+        lambda: firebase_auth.executor.queued
+    )
+
+# Static payloads are encoded once at startup, and their routes registered first
+# so the router matches them before any prefixed route
+HEALTH_BODY = FastJSONResponse({"status": "healthy", "message": "Authentication API is running"}).body
+ROOT_BODY = FastJSONResponse({
+    "message": "Welcome to Authentication API",
+    "docs": "/docs",
+    "redoc": "/redoc",
+    "endpoints": {
+        "auth": "/auth",
+        "protected": "/protected"
+    }
+}).body
+
+# Health check endpoint
+@app.get("/health")
+async def health_check():
+    return Response(content=HEALTH_BODY, media_type="application/json")
+
+# Root endpoint
+@app.get("/")
+async def root():
+    return Response(content=ROOT_BODY, media_type="application/json")
+
+# Prometheus scrape endpoint
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include authentication routes
 app.include_router(auth_router)
 
+# Include admin routes
+app.include_router(admin_router)
+
 # Include protected routes (examples)
 app.include_router(protected_router)
 
+# Firebase is failing or saturated: tell clients when to come back instead of letting them time out
+@app.exception_handler(BackendUnavailableError)
+async def backend_unavailable_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication backend unavailable, retry later"},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))}
+    )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -34,21 +109,3 @@ async def global_exception_handler(request, exc):
         status_code=500,
         content={"detail": "Internal server error"}
     )
-
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "message": "Authentication API is running"}
-
-# Root endpoint
-@app.get("/")
-async def root():
-    return {
-        "message": "Welcome to Authentication API",
-        "docs": "/docs",
-        "redoc": "/redoc",
-        "endpoints": {
-            "auth": "/auth",
-            "protected": "/protected"
-        }
-    } 
\ No newline at end of file
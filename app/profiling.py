@@ -0,0 +1,237 @@
+"""
+Opt-in request profiling for production.
+
+When enabled, a fraction of requests is sampled. While a sampled request is in
+flight, a background thread samples the event loop thread's Python stack, and
+the request's authentication stages (get_current_user -> verify_id_token ->
+get_user, ...) are recorded with their wall times. Both are aggregated as
+folded stacks, the input format of flamegraph.pl, inferno and speedscope, and
+written to the output directory once per flush interval and when disabled:
+
+  cpu-<pid>-<session>.folded   stack samples of the event loop thread
+  wall-<pid>-<session>.folded  wall time per stage chain, in microseconds
+
+Profiling is per process. Disabled, the middleware is a pass-through and no
+thread, hook or context variable is set up.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import set_span_sink
+
+# Stages finished by the sampled request running in the current context
+_request_spans: ContextVar[Optional[List[Tuple[str, float, float]]]] = ContextVar("request_spans", default=None)
+
+
+class RequestProfiler:
+    """Samples requests and aggregates their stack samples and stage timings as folded stacks"""
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        sample_rate: float = 0.01,
+        interval: float = 0.005,
+        flush_interval: float = 10.0,
+    ):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.enabled = False
+        self.session = ""
+        self.sampled_requests = 0
+        self._in_flight = 0
+        self._loop_thread: Optional[int] = None
+        self._cpu: Counter = Counter()
+        self._wall: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # The sampler thread does not survive fork, so it is started per process on first use
+        self._sampler_pid = 0
+        self._last_flush = 0.0
+        self._switch_interval = sys.getswitchinterval()
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        """Build a profiler from PROFILE_* environment variables, enabling it if PROFILE_ENABLED is set"""
+        profiler = cls(
+            output_dir=os.getenv("PROFILE_DIR", "profiles"),
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")),
+            interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000,
+            flush_interval=float(os.getenv("PROFILE_FLUSH_SECONDS", "10")),
+        )
+        if os.getenv("PROFILE_ENABLED", "false").lower() == "true":
+            profiler.enable()
+        return profiler
+
+    def enable(self, sample_rate: Optional[float] = None) -> None:
+        """Start sampling requests, beginning a new profiling session unless one is running"""
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if self.enabled:
+            return
+
+        with self._lock:
+            self._cpu.clear()
+            self._wall.clear()
+            self.sampled_requests = 0
+        self.session = time.strftime("%Y%m%dT%H%M%S")
+        self._stop = threading.Event()
+        self._sampler_pid = 0
+        # The sampler needs the GIL to take a sample; let it preempt CPU-bound request code as often as it samples
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        set_span_sink(self._record_span)
+        self.enabled = True
+
+    def disable(self) -> List[str]:
+        """Stop sampling and write the session's profiles, returning the paths written"""
+        if not self.enabled:
+            return []
+        self.enabled = False
+        set_span_sink(None)
+        sys.setswitchinterval(self._switch_interval)
+        self._stop.set()
+        return self.flush()
+
+    async def profile_request(self, app: Callable, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Run one request while sampling the loop thread and collecting its stages"""
+        self._loop_thread = threading.get_ident()
+        self._ensure_sampler()
+        spans: List[Tuple[str, float, float]] = []
+        token = _request_spans.set(spans)
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            await app(scope, receive, send)
+        finally:
+            ended = time.perf_counter()
+            _request_spans.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            folded = fold_spans(f"{scope['method']} {route}", started, ended, spans)
+            with self._lock:
+                self._in_flight -= 1
+                self.sampled_requests += 1
+                self._wall.update(folded)
+
+    def flush(self) -> List[str]:
+        """Write the session's aggregated profiles, returning the paths written"""
+        with self._lock:
+            profiles = {"cpu": dict(self._cpu), "wall": dict(self._wall)}
+        self._last_flush = time.monotonic()
+        if not self.session:
+            return []
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for kind, counts in profiles.items():
+            path = os.path.join(self.output_dir, f"{kind}-{os.getpid()}-{self.session}.folded")
+            with open(path + ".tmp", "w") as file:
+                for stack, count in sorted(counts.items()):
+                    if count > 0:
+                        file.write(f"{stack} {count}\n")
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+        return paths
+
+    def stats(self) -> Dict[str, Any]:
+        """Return whether profiling is on, what it samples and how much it has collected"""
+        with self._lock:
+            cpu_samples = sum(self._cpu.values())
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval * 1000,
+            "session": self.session,
+            "sampled_requests": self.sampled_requests,
+            "cpu_samples": cpu_samples,
+            "output_dir": os.path.abspath(self.output_dir),
+        }
+
+    def _record_span(self, stage: str, started: float, elapsed: float) -> None:
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, started, started + elapsed))
+
+    def _ensure_sampler(self) -> None:
+        if self._sampler_pid == os.getpid():
+            return
+        with self._lock:
+            if self._sampler_pid == os.getpid():
+                return
+            self._sampler_pid = os.getpid()
+            threading.Thread(target=self._sample_loop, args=(self._stop,), name="request-profiler", daemon=True).start()
+
+    def _sample_loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            if self._in_flight and self._loop_thread is not None:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    stack = fold_frame(frame)
+                    with self._lock:
+                        self._cpu[stack] += 1
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+
+def fold_frame(frame: Any) -> str:
+    """Render a Python stack as one folded line, outermost frame first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        name = f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+        names.append(name.replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def fold_spans(root: str, started: float, ended: float, spans: List[Tuple[str, float, float]]) -> Dict[str, int]:
+    """Nest a request's stages by time containment and return self time per chain, in microseconds"""
+    root = root.replace(";", ":")
+    # Each node is [chain, duration, time spent in child stages]
+    nodes: List[List[Any]] = []
+    open_nodes: List[Tuple[float, int]] = []
+    top_level = 0.0
+    for stage, start, end in sorted(spans, key=lambda span: (span[1], -span[2])):
+        while open_nodes and open_nodes[-1][0] < end:
+            open_nodes.pop()
+        parent = open_nodes[-1][1] if open_nodes else None
+        chain = f"{nodes[parent][0] if parent is not None else root};{stage}"
+        nodes.append([chain, end - start, 0.0])
+        if parent is None:
+            top_level += end - start
+        else:
+            nodes[parent][2] += end - start
+        open_nodes.append((end, len(nodes) - 1))
+
+    folded: Counter = Counter()
+    folded[root] += round(max(ended - started - top_level, 0.0) * 1e6)
+    for chain, duration, children in nodes:
+        folded[chain] += round(max(duration - children, 0.0) * 1e6)
+    return folded
+
+
+class ProfilingMiddleware:
+    """ASGI middleware handing sampled requests to the profiler; a pass-through while it is off"""
+
+    def __init__(self, app: Any, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        profiler = self.profiler
+        if profiler.enabled and scope["type"] == "http" and random.random() < profiler.sample_rate:
+            await profiler.profile_request(self.app, scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+profiler = RequestProfiler.from_env()
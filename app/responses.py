@@ -0,0 +1,32 @@
+import importlib.util
+
+import pydantic_core
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+# orjson is in requirements.txt, but fall back to the stdlib encoder if it is missing
+_BASE_RESPONSE = ORJSONResponse if importlib.util.find_spec("orjson") is not None else JSONResponse
+
+
+class FastJSONResponse(_BASE_RESPONSE):
+    """JSON response rendered with orjson when available.
+
+    Returning it from a route also skips FastAPI's jsonable_encoder pass, so
+    content must already be JSON-compatible (dicts, lists, str, numbers).
+    """
+
+
+class RawJSONResponse(Response):
+    """Send bytes that already are JSON, such as pre-serialized fragments joined together"""
+
+    media_type = "application/json"
+
+
+class ModelResponse(Response):
+    """Serialize an already-built Pydantic model once, skipping FastAPI's re-validation"""
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        return pydantic_core.to_json(content)
+
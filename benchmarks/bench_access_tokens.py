@@ -0,0 +1,73 @@
+"""
+Compare requests/sec for /auth/me on one worker when authenticating with a
+Firebase ID token (stubbed backend) versus one of our own HS256 access tokens.
+
+Run with: python -m benchmarks.bench_access_tokens
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.routes import router as auth_router
+
+BACKEND_LATENCY = 0.005
+CONCURRENT_CLIENTS = 16
+DURATION = 3.0
+
+app = FastAPI()
+app.include_router(auth_router)
+
+
+def _slow(result):
+    def call(*args, **kwargs):
+        time.sleep(BACKEND_LATENCY)
+        return result(*args, **kwargs)
+    return call
+
+
+fake_auth = SimpleNamespace(
+    verify_id_token=_slow(lambda token: {"uid": "bench-user", "exp": time.time() + 3600}),
+    get_user=_slow(lambda uid: SimpleNamespace(uid=uid, email="bench@example.com", custom_claims={"role": "user"})),
+)
+
+
+async def measure(label: str, token: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    completed = 0
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + DURATION
+
+        async def client_loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get("/auth/me", headers=headers)
+                assert response.status_code == 200
+                completed += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(CONCURRENT_CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{label}: {completed / elapsed:8.1f} req/s")
+
+
+def main():
+    firebase_auth_module.auth = fake_auth
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.enabled = False
+
+    access_token = service._generate_access_token("bench-user", "bench@example.com", {"role": "user"})
+    asyncio.run(measure("firebase id token ", "bench-id-token"))
+    asyncio.run(measure("own access token  ", access_token))
+    service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
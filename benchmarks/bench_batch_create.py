@@ -0,0 +1,69 @@
+"""
+Throughput of /auth/admin/users:batchCreate against a local import_users stub.
+
+Run with: python -m benchmarks.bench_batch_create [users]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+
+IMPORT_LATENCY = 0.2
+
+
+class StubImportAuth:
+    def __init__(self):
+        self.imported = 0
+
+    def import_users(self, users, hash_alg=None):
+        time.sleep(IMPORT_LATENCY)
+        self.imported += len(users)
+        return SimpleNamespace(errors=[])
+
+
+async def run(total_users: int):
+    service = firebase_auth_module.firebase_auth
+    token = service._generate_access_token("bench-admin", "admin@example.com", {"role": "admin"})
+    body = "".join(
+        json.dumps({"email": f"user{n}@example.com", "password": "secret123", "first_name": "User", "last_name": str(n)}) + "\n"
+        for n in range(total_users)
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        created = 0
+        async with client.stream(
+            "POST",
+            "/auth/admin/users:batchCreate",
+            content=body,
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+        ) as response:
+            async for line in response.aiter_lines():
+                if line and json.loads(line)["status"] == "created":
+                    created += 1
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{created} users in {elapsed:.2f}s: {created / elapsed:,.0f} users/sec "
+        f"(chunk={service.import_chunk_size}, concurrency={service.import_concurrency}, "
+        f"pbkdf2 rounds={service.import_hash_rounds})"
+    )
+
+
+def main():
+    total_users = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    firebase_auth_module.auth = StubImportAuth()
+    asyncio.run(run(total_users))
+    firebase_auth_module.firebase_auth.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare computing a pull request's diffs cold, warm and after a small push.
+
+Builds a throwaway repository of BENCH_FILES files of BENCH_FILE_LINES lines,
+a feature branch changing BENCH_CHANGED of them in several places, and one
+more commit changing BENCH_PUSHED of those. Each scenario is timed over
+BENCH_REPEATS runs:
+
+- uncached: no cache at all, every run diffs every file
+- cold: an empty cache, as for the first event of a PR
+- warm: every blob pair cached, as for a comment edit or re-requested review
+- push: the cache holds the previous head, only the pushed files are diffed
+
+Run with: python -m benchmarks.bench_diff_cache
+"""
+
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+import main as event_logger
+
+FILES = int(os.getenv("BENCH_FILES", "400"))
+FILE_LINES = int(os.getenv("BENCH_FILE_LINES", "400"))
+CHANGED = int(os.getenv("BENCH_CHANGED", "200"))
+PUSHED = int(os.getenv("BENCH_PUSHED", "5"))
+REPEATS = int(os.getenv("BENCH_REPEATS", "5"))
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "Bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+
+def git(repo: str, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", repo, *args], check=True, capture_output=True, text=True, env={**os.environ, **GIT_ENV}
+    ).stdout.strip()
+
+
+def write_files(repo: str, count: int, revision: int) -> None:
+    for number in range(count):
+        lines = [f"def function_{number}_{line}(): return {line}\n" for line in range(FILE_LINES)]
+        for line in range(revision, FILE_LINES, 50):
+            lines[line] = f"def function_{number}_{line}(): return {line} + {revision}\n"
+        with open(os.path.join(repo, "src", f"module_{number:04d}.py"), "w") as file:
+            file.writelines(lines)
+
+
+def commit(repo: str, message: str) -> str:
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+def build_repository(repo: str):
+    os.makedirs(os.path.join(repo, "src"))
+    git(repo, "init", "-q", "-b", "main")
+    write_files(repo, FILES, 0)
+    base = commit(repo, "base")
+    write_files(repo, CHANGED, 1)
+    head = commit(repo, "feature")
+    write_files(repo, PUSHED, 2)
+    pushed = commit(repo, "push")
+    return base, head, pushed
+
+
+def timed(run) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        samples.append(run())
+    return statistics.median(samples)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        repo = os.path.join(directory, "repo")
+        base, head, pushed = build_repository(repo)
+        print(f"{FILES} files of {FILE_LINES} lines, {CHANGED} changed, {PUSHED} re-pushed, median of {REPEATS}")
+
+        def run(cache_path, commits, warm_with=None):
+            if cache_path and os.path.exists(cache_path):
+                os.remove(cache_path)
+            cache = event_logger.DiffCache(cache_path) if cache_path else None
+            if warm_with:
+                event_logger.diff_pull_request(repo, base, warm_with, cache)
+            started = time.perf_counter()
+            files = event_logger.diff_pull_request(repo, base, commits, cache)
+            elapsed = time.perf_counter() - started
+            if cache is not None:
+                cache.close()
+            assert len(files) == CHANGED
+            return elapsed
+
+        cache_path = os.path.join(directory, "diffs.db")
+        results = {
+            "uncached": timed(lambda: run(None, head)),
+            "cold": timed(lambda: run(cache_path, head)),
+            "warm": timed(lambda: run(cache_path, head, warm_with=head)),
+            "push": timed(lambda: run(cache_path, pushed, warm_with=head)),
+        }
+        for name, seconds in results.items():
+            print(f"{name:>9} {seconds * 1000:8.1f}ms  x{results['uncached'] / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare logging a large GitHub event in full against the streaming summary.
+
+Writes synthetic pull_request events of BENCH_EVENT_MB megabytes (a long body,
+thousands of labels, reviewers and commits) and runs main.py on each in a
+fresh process per mode, reporting wall time and the child's peak RSS. The
+baseline row is an interpreter that only imports main.py.
+
+Run with: python -m benchmarks.bench_event_parsing
+"""
+
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SIZES_MB = [int(size) for size in os.getenv("BENCH_EVENT_MB", "4,16,64").split(",")]
+MODES = ("baseline", "full", "summary")
+
+
+def write_event(path: str, size_mb: int) -> None:
+    size = size_mb * 1024 * 1024
+    item = {"login": "reviewer", "id": 1, "node_id": "MDQ6VXNlcjE=", "url": "https://api.github.com/users/reviewer"}
+    # Half the payload in the body, half in lists of small objects
+    count = size // 2 // len(json.dumps(item))
+    event = {
+        "action": "synchronize",
+        "number": 1234,
+        "pull_request": {
+            "number": 1234,
+            "body": "Refactor the token pipeline.\n" * (size // 2 // 29),
+            "labels": [{"name": f"label-{i}", "color": "ededed"} for i in range(count // 4)],
+            "requested_reviewers": [dict(item, id=i) for i in range(count // 2)],
+            "head": {"sha": "a" * 40, "ref": "feature"},
+            "base": {"sha": "b" * 40, "ref": "main"},
+            "changed_files": 87,
+            "additions": 4012,
+            "deletions": 1377,
+        },
+        "commits": [{"sha": f"{i:040x}", "message": "wip"} for i in range(count // 4)],
+    }
+    with open(path, "w") as file:
+        json.dump(event, file)
+
+
+def child(mode: str, path: str) -> None:
+    import main
+
+    started = time.perf_counter()
+    if mode != "baseline":
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            main.main([path] + (["--full"] if mode == "full" else []))
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_rss_kb() / 1024}))
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss survives exec and can report the parent's peak; VmHWM belongs to this process image
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(mode: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_event_parsing", "--child", mode, path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'event':>7} {'mode':>9} {'wall':>9} {'peak RSS':>10}")
+        for size_mb in SIZES_MB:
+            path = os.path.join(directory, f"event-{size_mb}.json")
+            write_event(path, size_mb)
+            for mode in MODES:
+                result = run(mode, path)
+                print(f"{size_mb:>5}MB {mode:>9} {result['seconds'] * 1000:>7.0f}ms {result['peak_rss_mb']:>8.1f}MB")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,73 @@
+"""
+Measure how batch replay of archived events scales with worker processes.
+
+Writes BENCH_EVENTS synthetic pull_request events of about BENCH_EVENT_KB each,
+both as an NDJSON archive and as a directory of files, then replays each with
+1, 2, 4, ... workers up to BENCH_MAX_WORKERS (default: the CPU count) and
+reports events/sec and the speedup over one worker.
+
+Run with: python -m benchmarks.bench_event_replay
+"""
+
+import json
+import os
+import tempfile
+
+import main as event_logger
+
+EVENTS = int(os.getenv("BENCH_EVENTS", "2000"))
+EVENT_KB = int(os.getenv("BENCH_EVENT_KB", "64"))
+
+
+def synthetic_event(number: int) -> dict:
+    reviewers = [{"login": f"reviewer-{i}", "id": i, "type": "User"} for i in range(EVENT_KB * 4)]
+    return {
+        "action": "synchronize",
+        "number": number,
+        "pull_request": {
+            "body": "Refactor the token pipeline.\n" * (EVENT_KB * 12),
+            "requested_reviewers": reviewers,
+            "head": {"sha": f"{number:040x}"},
+            "base": {"sha": "b" * 40},
+            "changed_files": number % 50,
+            "additions": number * 3,
+            "deletions": number,
+        },
+    }
+
+
+def worker_counts() -> list:
+    maximum = int(os.getenv("BENCH_MAX_WORKERS", "0")) or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= maximum:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != maximum:
+        counts.append(maximum)
+    return counts
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "events.ndjson")
+        files = os.path.join(directory, "events")
+        os.makedirs(files)
+        with open(archive, "w") as ndjson:
+            for number in range(EVENTS):
+                line = json.dumps(synthetic_event(number))
+                ndjson.write(line + "\n")
+                with open(os.path.join(files, f"{number:06d}.json"), "w") as file:
+                    file.write(line)
+        print(f"{EVENTS} events, {os.path.getsize(archive) / EVENTS / 1024:.0f} KB each, {os.cpu_count()} CPUs")
+
+        for label, source in (("ndjson", archive), ("directory", files)):
+            base = None
+            for workers in worker_counts():
+                output = os.path.join(directory, f"results-{label}-{workers}.ndjson")
+                stats = event_logger.replay(source, output, workers=workers)
+                rate = stats["events_per_second"]
+                base = base or rate
+                print(f"{label:>9} workers={workers:<3} {rate:8.0f} events/s  x{rate / base:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Load test /auth/verify against a stubbed slow Firebase backend, with blocking
+Admin SDK calls run inline on the event loop versus through BackendExecutor.
+
+Run with: python -m benchmarks.bench_executor
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.routes import router as auth_router
+
+BACKEND_LATENCY = 0.02
+CONCURRENT_CLIENTS = 32
+REQUESTS_PER_CLIENT = 10
+
+app = FastAPI()
+app.include_router(auth_router)
+
+
+def _slow(result):
+    def call(*args, **kwargs):
+        time.sleep(BACKEND_LATENCY)
+        return result(*args, **kwargs)
+    return call
+
+
+fake_auth = SimpleNamespace(
+    verify_id_token=_slow(lambda token: {"uid": "bench-user", "exp": time.time() + 3600}),
+    get_user=_slow(lambda uid: SimpleNamespace(uid=uid, email="bench@example.com", custom_claims={"role": "user"})),
+)
+
+
+async def client_loop(client: httpx.AsyncClient, client_id: int):
+    headers = {"Authorization": f"Bearer bench-token-{client_id}"}
+    for _ in range(REQUESTS_PER_CLIENT):
+        response = await client.get("/auth/verify", headers=headers)
+        assert response.status_code == 200
+
+
+async def measure(executor_enabled: bool):
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.enabled = False
+    service.executor.enabled = executor_enabled
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, i) for i in range(CONCURRENT_CLIENTS)))
+        elapsed = time.perf_counter() - start
+
+    total = CONCURRENT_CLIENTS * REQUESTS_PER_CLIENT
+    label = "executor" if executor_enabled else "inline  "
+    print(f"{label}: {total / elapsed:8.1f} req/s ({total} requests, {CONCURRENT_CLIENTS} clients) stats={service.executor.stats()}")
+
+
+def main():
+    firebase_auth_module.auth = fake_auth
+    asyncio.run(measure(executor_enabled=False))
+    asyncio.run(measure(executor_enabled=True))
+    firebase_auth_module.firebase_auth.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
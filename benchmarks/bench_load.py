@@ -0,0 +1,301 @@
+"""
+Load-test the app in process against a fake Firebase backend.
+
+Serves app.main:app through httpx's ASGI transport, or with BENCH_SERVER=uvicorn
+on a localhost port in the same process and event loop. The Admin SDK and the
+Identity Toolkit are replaced by benchmarks.fake_firebase (BENCH_LATENCY_MS,
+BENCH_JITTER_MS, BENCH_ERROR_RATE). Each scenario sends BENCH_REQUESTS requests
+from BENCH_CONCURRENCY clients and reports requests/sec and p50/p95/p99.
+Clients send their next request as soon as the last one completes. Each
+scenario runs BENCH_ROUNDS times (default 3), each round starting with an
+empty principal cache, and the round with the best throughput is kept: noise
+from other processes only ever slows a round down. Above
+AUTH_CONCURRENCY_INITIAL clients, the backend guard sheds calls with 503s
+until its limit has grown.
+
+- login: POST /auth/login, cycling through the fake users
+- verify_id_token: GET /auth/verify with Firebase ID tokens; the first pass
+  over the users misses the principal cache, later ones hit it
+- verify_access_token: GET /auth/verify with our own access tokens
+- refresh: POST /auth/refresh, each client rotating its own session
+- protected_*: GET /protected/user-info, GET /protected/admin-only and
+  POST /protected/create-resource with access tokens
+
+Results are compared with the baseline stored for the same settings in
+BENCH_BASELINE (default benchmarks/baselines/load.json). The run exits with
+status 1 if a scenario's throughput drops, or its p99 grows, by more than
+BENCH_TOLERANCE (default 0.3), or if it fails more requests. Baselines are
+machine-specific: record them with --update-baseline on the machine that
+runs the comparison.
+
+Run with: python -m benchmarks.bench_load [--update-baseline]
+Environment: BENCH_SERVER (asgi or uvicorn), BENCH_CONCURRENCY (default 16),
+BENCH_REQUESTS (default 2000), BENCH_USERS (default 1000), BENCH_SCENARIOS
+(comma-separated, default all), BENCH_ROUNDS
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import socket
+import sys
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from app.auth.firebase_auth import firebase_auth
+from app.main import app
+from benchmarks.fake_firebase import FakeFirebase, installed
+
+BASELINE = os.getenv("BENCH_BASELINE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load.json"))
+TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.3"))
+
+
+class Session:
+    """One load-test client: an admin user, its access token and its latest refresh token"""
+
+    def __init__(self, index: int, access_token: str, refresh_token: str):
+        self.index = index
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+Scenario = Callable[[httpx.AsyncClient, FakeFirebase, Session, int], Awaitable[httpx.Response]]
+
+
+async def _login(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.post("/auth/login", json={"email": backend.email(n), "password": backend.password(n)})
+
+
+async def _verify_id_token(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.get("/auth/verify", headers={"Authorization": f"Bearer {backend.id_token(n)}"})
+
+
+async def _verify_access_token(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.get("/auth/verify", headers=session.headers)
+
+
+async def _refresh(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    response = await client.post("/auth/refresh", json={"refresh_token": session.refresh_token})
+    if response.status_code == 200:
+        # The old refresh token is spent; presenting it again would revoke the session
+        session.refresh_token = response.json()["refresh_token"]
+    return response
+
+
+async def _user_info(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.get("/protected/user-info", headers=session.headers)
+
+
+async def _admin_only(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.get("/protected/admin-only", headers=session.headers)
+
+
+async def _create_resource(client: httpx.AsyncClient, backend: FakeFirebase, session: Session, n: int) -> httpx.Response:
+    return await client.post("/protected/create-resource", json={"name": f"resource-{n}"}, headers=session.headers)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login": _login,
+    "verify_id_token": _verify_id_token,
+    "verify_access_token": _verify_access_token,
+    "refresh": _refresh,
+    "protected_user_info": _user_info,
+    "protected_admin_only": _admin_only,
+    "protected_create_resource": _create_resource,
+}
+
+
+@contextlib.asynccontextmanager
+async def serving(server: str, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    """A client for the app, in process over ASGI or over TCP to uvicorn on localhost"""
+    if server == "asgi":
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            yield client
+        return
+
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    uvicorn_server = uvicorn.Server(uvicorn.Config(
+        app, host="127.0.0.1", port=port, lifespan="off", log_level="warning", access_log=False
+    ))
+    task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            yield client
+    finally:
+        uvicorn_server.should_exit = True
+        await task
+
+
+async def open_sessions(client: httpx.AsyncClient, backend: FakeFirebase, count: int) -> List[Session]:
+    """Log one admin user in per client"""
+    sessions = []
+    for number in range(count):
+        index = number * backend.admin_every
+        response = await client.post("/auth/login", json={"email": backend.email(index), "password": backend.password(index)})
+        response.raise_for_status()
+        tokens = response.json()
+        sessions.append(Session(index, tokens["access_token"], tokens["refresh_token"]))
+    return sessions
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    backend: FakeFirebase,
+    scenario: Scenario,
+    sessions: Sequence[Session],
+    requests: int,
+) -> Dict[str, Any]:
+    """Send `requests` requests from one coroutine per session, returning throughput and latency percentiles"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    numbers = itertools.count()
+
+    async def client_loop(session: Session) -> None:
+        n = next(numbers)
+        while n < requests:
+            started = time.perf_counter()
+            response = await scenario(client, backend, session, n)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            n = next(numbers)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(session) for session in sessions))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def run_suite(
+    backend: FakeFirebase,
+    concurrency: int = 16,
+    requests: int = 2000,
+    server: str = "asgi",
+    scenarios: Optional[Sequence[str]] = None,
+    rounds: int = 3,
+) -> Dict[str, Dict[str, Any]]:
+    """Run each scenario in turn against the app wired to backend, keeping each one's fastest round"""
+    results = {}
+    with installed(backend):
+        async with serving(server, concurrency) as client:
+            # Sessions are set up against a healthy backend; only the scenarios see failures
+            error_rate, backend.error_rate = backend.error_rate, 0.0
+            sessions = await open_sessions(client, backend, concurrency)
+            backend.error_rate = error_rate
+            for name in scenarios or SCENARIOS:
+                for _ in range(rounds):
+                    firebase_auth.principal_cache.clear()
+                    result = await run_scenario(client, backend, SCENARIOS[name], sessions, requests)
+                    if name not in results or result["rps"] > results[name]["rps"]:
+                        results[name] = result
+    return results
+
+
+def regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Describe every scenario that is slower or fails more often than its baseline"""
+    problems = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: {result['rps']:.0f} req/s, baseline {base['rps']:.0f}")
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p99 {result['p99_ms']:.1f}ms, baseline {base['p99_ms']:.1f}ms")
+        if result["errors"] / result["requests"] > base["errors"] / base["requests"]:
+            problems.append(f"{name}: {result['errors']} of {result['requests']} failed, baseline {base['errors']}")
+    return problems
+
+
+def main():
+    server = os.getenv("BENCH_SERVER", "asgi")
+    concurrency = int(os.getenv("BENCH_CONCURRENCY", "16"))
+    requests = int(os.getenv("BENCH_REQUESTS", "2000"))
+    latency_ms = float(os.getenv("BENCH_LATENCY_MS", "5"))
+    jitter_ms = float(os.getenv("BENCH_JITTER_MS", "0"))
+    error_rate = float(os.getenv("BENCH_ERROR_RATE", "0"))
+    scenarios = [name for name in os.getenv("BENCH_SCENARIOS", ",".join(SCENARIOS)).split(",") if name]
+    rounds = int(os.getenv("BENCH_ROUNDS", "3"))
+    backend = FakeFirebase(
+        users=int(os.getenv("BENCH_USERS", "1000")),
+        latency=latency_ms / 1000,
+        jitter=jitter_ms / 1000,
+        error_rate=error_rate,
+    )
+    # Baselines are only comparable between runs with the same settings
+    settings = (
+        f"{server} concurrency={concurrency} requests={requests} users={backend.users} "
+        f"latency={latency_ms:g}ms jitter={jitter_ms:g}ms errors={error_rate:g} rounds={rounds}"
+    )
+
+    results = asyncio.run(run_suite(backend, concurrency, requests, server, scenarios, rounds))
+
+    baselines: Dict[str, Any] = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as file:
+            baselines = json.load(file)
+    baseline = baselines.get(settings, {})
+
+    print(settings)
+    print(f"{'scenario':>26} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7} {'baseline':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = f"{result['rps'] / base['rps'] - 1:+.0%}" if base else "-"
+        print(
+            f"{name:>26} {result['rps']:8.0f} {result['p50_ms']:6.1f}ms {result['p95_ms']:6.1f}ms "
+            f"{result['p99_ms']:6.1f}ms {result['errors']:7d} {change:>9}"
+        )
+    print(f"backend calls: {dict(backend.calls)}")
+
+    if "--update-baseline" in sys.argv:
+        baselines[settings] = {**baseline, **results}
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline written to {BASELINE}")
+        return
+
+    if not baseline:
+        print("No baseline for these settings; record one with --update-baseline")
+        return
+    problems = regressions(results, baseline, TOLERANCE)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Microbenchmark local RS256 ID token verification on a single core.
+
+Run with: python -m benchmarks.bench_local_verifier
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.auth.jwks import LocalTokenVerifier
+
+PROJECT_ID = "bench-project"
+DURATION = 3.0
+
+
+def main():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "bench", "alg": "RS256"})
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as key_file:
+        json.dump({"keys": [jwk]}, key_file)
+
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+            "aud": PROJECT_ID,
+            "sub": "bench-user",
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+
+    verifier = LocalTokenVerifier(PROJECT_ID, key_source=key_file.name)
+    verifier.start(wait=10)
+    verifier.verify(token)
+
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        verifier.verify(token)
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    verifier.stop()
+    os.unlink(key_file.name)
+    print(f"local RS256 verification: {count / elapsed:,.0f} verifications/sec ({elapsed * 1e6 / count:.1f}us each)")
+
+
+if __name__ == "__main__":
+    main()
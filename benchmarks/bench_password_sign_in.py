@@ -0,0 +1,102 @@
+"""
+Login throughput for /auth/login against a local Identity Toolkit stub server
+(signInWithPassword with simulated Google latency) and a stubbed Admin SDK.
+
+Run with: python -m benchmarks.bench_password_sign_in
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.identity_toolkit import IdentityToolkitClient
+
+STUB_LATENCY = 0.02
+DURATION = 3.0
+
+
+class StubIdentityToolkit(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(STUB_LATENCY)
+        data = json.dumps({"localId": payload["email"], "email": payload["email"], "idToken": "stub"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+fake_auth = SimpleNamespace(
+    get_user=lambda uid: SimpleNamespace(
+        uid=uid,
+        email=uid,
+        disabled=False,
+        custom_claims={"role": "user"},
+        user_metadata=SimpleNamespace(creation_timestamp=0),
+    )
+)
+
+
+async def measure(concurrency: int):
+    completed = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + DURATION
+
+        async def client_loop(client_id: int):
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/auth/login",
+                    json={"email": f"user{client_id}@example.com", "password": "secret123"},
+                )
+                assert response.status_code == 200, response.text
+                completed += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{concurrency:3d} concurrent clients: {completed / elapsed:8.1f} logins/sec")
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def main():
+    server = StubServer(("127.0.0.1", 0), StubIdentityToolkit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    service = firebase_auth_module.firebase_auth
+    firebase_auth_module.auth = fake_auth
+    service.identity_toolkit = IdentityToolkitClient(
+        api_key="bench-key",
+        transport=service.transport,
+        base_url=f"http://127.0.0.1:{server.server_port}/v1",
+    )
+
+    for concurrency in (1, 16, 64):
+        asyncio.run(measure(concurrency))
+    print(f"transport: {service.transport.stats()['pools']['rest']}")
+
+    server.shutdown()
+    service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
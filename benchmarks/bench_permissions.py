@@ -0,0 +1,79 @@
+"""
+Authorization checks/sec with hundreds of roles and deep inheritance.
+
+Run with: python -m benchmarks.bench_permissions
+"""
+
+import asyncio
+import random
+import time
+
+from fastapi import HTTPException
+
+from app.auth import dependencies
+from app.auth.permissions import AuthorizationPolicy
+
+ROLE_COUNT = 500
+PERMISSION_COUNT = 200
+CHECKS = 500_000
+
+
+def build_policy() -> AuthorizationPolicy:
+    rng = random.Random(42)
+    permissions = [f"perm:{n}" for n in range(PERMISSION_COUNT)]
+    roles = {}
+    for n in range(ROLE_COUNT):
+        parents = rng.sample(range(n), min(n, 3))
+        roles[f"role-{n}"] = {
+            "inherits": [f"role-{p}" for p in parents],
+            "permissions": rng.sample(permissions, 5),
+        }
+    return AuthorizationPolicy(roles, permissions)
+
+
+def main():
+    start = time.perf_counter()
+    policy = build_policy()
+    print(f"compiled {ROLE_COUNT} roles / {PERMISSION_COUNT} permissions in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    rng = random.Random(7)
+    roles = [f"role-{rng.randrange(ROLE_COUNT)}" for _ in range(1000)]
+    masks = [policy.permission_mask(f"perm:{rng.randrange(PERMISSION_COUNT)}") for _ in range(1000)]
+
+    start = time.perf_counter()
+    for n in range(CHECKS):
+        policy.has_permissions(roles[n % 1000], masks[n % 997])
+    elapsed = time.perf_counter() - start
+    print(f"permission checks: {CHECKS / elapsed:,.0f}/sec")
+
+    start = time.perf_counter()
+    for n in range(CHECKS):
+        policy.has_role(roles[n % 1000], roles[n % 997])
+    elapsed = time.perf_counter() - start
+    print(f"role checks:       {CHECKS / elapsed:,.0f}/sec")
+
+    # Full FastAPI dependency callable, as run per request
+    dependencies.policy.roles = policy.roles
+    dependencies.policy.permissions = policy.permissions
+    dependencies.policy.compile()
+    checker = dependencies.require_permission("perm:0")
+    users = [{"uid": "u", "role": role} for role in roles]
+
+    async def run_checks():
+        allowed = 0
+        for n in range(CHECKS // 5):
+            try:
+                await checker(users[n % 1000])
+                allowed += 1
+            except HTTPException:
+                pass
+        return allowed
+
+    start = time.perf_counter()
+    asyncio.run(run_checks())
+    elapsed = time.perf_counter() - start
+    print(f"dependency checks: {CHECKS // 5 / elapsed:,.0f}/sec")
+
+
+if __name__ == "__main__":
+    main()
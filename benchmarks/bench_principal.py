@@ -0,0 +1,184 @@
+"""
+Allocations and latency of authenticated requests, and memory of cached principals.
+
+Calls the ASGI app directly, with no HTTP client in the measurement, with the
+Firebase backend replaced by benchmarks.fake_firebase. Routes are hit with one
+of our access tokens, and /auth/verify also with a Firebase ID token whose
+principal is already cached. For each route it reports:
+
+- the mean latency over BENCH_REQUESTS requests, without tracing
+- with tracemalloc on, the peak memory traced while serving one request
+  (averaged) and the memory left behind per request
+
+Routing and middleware allocate far more than authentication does, so the
+same is measured for the handlers alone: get_current_user, then the route
+function, then the rendered body. Decoding an access token dominates that
+peak, so the route functions are also measured on their own, given a user
+authenticated once up front. Last comes the memory per cached principal,
+found by filling the principal cache through verify_token with
+BENCH_PRINCIPALS distinct ID tokens.
+
+Run with: python -m benchmarks.bench_principal
+"""
+
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app import example_protected_routes
+from app.auth import routes
+from app.auth.dependencies import get_current_user
+from app.auth.firebase_auth import firebase_auth
+from app.main import app
+from benchmarks.fake_firebase import FakeFirebase, installed
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "5000"))
+PRINCIPALS = int(os.getenv("BENCH_PRINCIPALS", "10000"))
+
+
+async def call(path: str, token: str) -> Tuple[int, bytes]:
+    """One GET request through the whole ASGI app, middleware included"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status: List[int] = []
+    body: List[bytes] = []
+
+    async def receive() -> Dict[str, object]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, object]) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        else:
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status[0], b"".join(body)
+
+
+def handler(route: Callable[[Any], Awaitable[Any]], token: str) -> Callable[[], Awaitable[bytes]]:
+    """Authenticate, run the route function and render its body, without routing or middleware"""
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def run() -> bytes:
+        response = await route(await get_current_user(credentials))
+        return response.body
+
+    return run
+
+
+async def route_only(route: Callable[[Any], Awaitable[Any]], token: str) -> Callable[[], Awaitable[bytes]]:
+    """Run the route function and render its body for a user authenticated once"""
+    user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+    async def run() -> bytes:
+        response = await route(user)
+        return response.body
+
+    return run
+
+
+async def measure(request: Callable[[], Awaitable[Any]]) -> Dict[str, float]:
+    await request()
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await request()
+    latency = (time.perf_counter() - started) / REQUESTS
+
+    gc.collect()
+    tracemalloc.start()
+    peaks = 0
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(REQUESTS):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await request()
+        peaks += tracemalloc.get_traced_memory()[1] - before
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return {"latency_us": latency * 1e6, "peak_bytes": peaks / REQUESTS, "retained_bytes": retained / REQUESTS}
+
+
+def report(name: str, kind: str, result: Dict[str, float]) -> None:
+    print(
+        f"{name:>22} {kind:>12} {result['latency_us']:8.1f}us {result['peak_bytes']:11.0f} B "
+        f"{result['retained_bytes']:7.1f} B"
+    )
+
+
+async def cached_principal_bytes(backend: FakeFirebase) -> float:
+    firebase_auth.principal_cache.clear()
+    firebase_auth.principal_cache.max_size = PRINCIPALS
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for index in range(PRINCIPALS):
+        await firebase_auth.verify_token(backend.id_token(index))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    firebase_auth.principal_cache.clear()
+    return used / PRINCIPALS
+
+
+async def run() -> None:
+    backend = FakeFirebase(users=PRINCIPALS, latency=0)
+    with installed(backend):
+        access_token = firebase_auth._generate_access_token(
+            backend.uid(0), backend.email(0), {"first_name": "Load", "last_name": "User0", "role": "admin"}
+        )
+        id_token = backend.id_token(0)
+        targets = [
+            ("/auth/verify", "access", access_token),
+            ("/auth/verify", "id (cached)", id_token),
+            ("/auth/me", "access", access_token),
+            ("/protected/user-info", "access", access_token),
+            ("/protected/admin-only", "access", access_token),
+        ]
+        print(f"{REQUESTS} requests per route")
+        print(f"{'route':>22} {'token':>12} {'latency':>10} {'peak/request':>13} {'retained':>9}")
+        for path, kind, token in targets:
+            status, _ = await call(path, token)
+            assert status == 200, (path, status)
+            report(path, kind, await measure(lambda: call(path, token)))
+
+        handlers = [
+            ("verify_token", "access", routes.verify_token, access_token),
+            ("verify_token", "id (cached)", routes.verify_token, id_token),
+            ("get_current_user_info", "access", routes.get_current_user_info, access_token),
+            ("get_user_info", "access", example_protected_routes.get_user_info, access_token),
+        ]
+        print("handlers only")
+        for name, kind, route, token in handlers:
+            report(name, kind, await measure(handler(route, token)))
+        print("routes only")
+        for name, kind, route, token in handlers:
+            report(name, kind, await measure(await route_only(route, token)))
+        print(f"cached principal: {await cached_principal_bytes(backend):.0f} B each ({PRINCIPALS} in the cache)")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark /auth/verify latency with the verified-principal cache on and off.
+
+Run with: python -m benchmarks.bench_principal_cache
+"""
+
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.routes import router as auth_router
+
+BACKEND_LATENCY = 0.002
+REQUESTS = 500
+
+app = FastAPI()
+app.include_router(auth_router)
+
+
+def _slow(result):
+    def call(*args, **kwargs):
+        time.sleep(BACKEND_LATENCY)
+        return result(*args, **kwargs)
+    return call
+
+
+fake_auth = SimpleNamespace(
+    verify_id_token=_slow(lambda token: {"uid": "bench-user", "exp": time.time() + 3600}),
+    get_user=_slow(lambda uid: SimpleNamespace(
+        uid=uid, email="bench@example.com", custom_claims={"first_name": "Bench", "last_name": "User", "role": "user"}
+    )),
+)
+
+
+async def measure(enabled: bool):
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.clear()
+    service.principal_cache.enabled = enabled
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"Authorization": "Bearer bench-token"}
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            response = await client.get("/auth/verify", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"cache {'on ' if enabled else 'off'}: p50={p50:.3f}ms p99={p99:.3f}ms stats={service.principal_cache.stats()}")
+
+
+def main():
+    firebase_auth_module.auth = fake_auth
+    asyncio.run(measure(enabled=False))
+    asyncio.run(measure(enabled=True))
+
+
+if __name__ == "__main__":
+    main()
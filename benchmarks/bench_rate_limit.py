@@ -0,0 +1,93 @@
+"""
+Measure the per-request cost of rate limiting with millions of distinct keys.
+
+Fills a limit's in-memory store with BENCH_KEYS distinct client IPs, then times
+a check for a key already tracked, for a new key, and the two-limit check a
+login performs. Reports memory per tracked key, the worst single call while an
+old generation drains, and the SQLite (shared) store for comparison.
+
+Run with: python -m benchmarks.bench_rate_limit
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from app.auth.ratelimit import RateLimit, RateLimiter, SQLiteRateLimitStore
+
+KEYS = int(os.getenv("BENCH_KEYS", "2000000"))
+LOOKUPS = 200_000
+ROUNDS = 5
+
+
+def ip(i: int) -> str:
+    return f"{10 + (i >> 24)}.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def best_of(func, keys):
+    per_call = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        for key in keys:
+            func(key)
+        per_call.append((time.perf_counter() - start) / len(keys))
+    return min(per_call) * 1e9, statistics.median(per_call) * 1e9
+
+
+def main():
+    # Generous limit, so every timed call takes the allow path and writes its bucket
+    limit = RateLimit("login_ip", 1_000_000, 60)
+    keys = [ip(i) for i in range(KEYS)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for key in keys:
+        limit.acquire(key)
+    filled = time.perf_counter() - start
+    per_key = (tracemalloc.get_traced_memory()[0] - before) / KEYS
+    tracemalloc.stop()
+    print(f"{KEYS:,} keys filled in {filled:.2f} s, {per_key:.0f} bytes per tracked key")
+
+    step = max(KEYS // LOOKUPS, 1)
+    tracked = keys[::step][:LOOKUPS]
+    fresh = [ip(KEYS + i) for i in range(LOOKUPS)]
+    limiter = RateLimiter({"login_ip": limit, "login_account": RateLimit("login_account", 1_000_000, 60)})
+    emails = [f"user{i}@example.com" for i in range(LOOKUPS)]
+    pairs = list(zip(tracked, emails))
+
+    print("per check (best / median):")
+    print("  tracked key         %7.0f / %7.0f ns" % best_of(limit.acquire, tracked))
+    # Each key is only new once, so this is a single round
+    start = time.perf_counter()
+    for key in fresh:
+        limit.acquire(key)
+    print(f"  new key             {(time.perf_counter() - start) / LOOKUPS * 1e9:7.0f} ns")
+    print("  login (ip+account)  %7.0f / %7.0f ns" % best_of(
+        lambda pair: limiter.check(login_ip=pair[0], login_account=pair[1]), pairs
+    ))
+
+    # Rotate the generation on the next call, then time every call while the old one drains
+    store = limit.store
+    store._rotate_at = 0.0
+    worst = 0.0
+    calls = 0
+    start = time.perf_counter()
+    while calls == 0 or store._previous:
+        began = time.perf_counter()
+        store.acquire(tracked[calls % len(tracked)], limit.emission)
+        worst = max(worst, time.perf_counter() - began)
+        calls += 1
+    drained = time.perf_counter() - start
+    print(f"drain old generation  {calls:,} calls, {drained / calls * 1e9:.0f} ns mean, worst {worst * 1e6:.0f} us")
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared = RateLimit("login_ip", 1_000_000, 60, SQLiteRateLimitStore(os.path.join(directory, "rl.db"), "login_ip", 60))
+        sample = tracked[:2000]
+        print("sqlite store          %7.0f / %7.0f ns" % best_of(shared.acquire, sample))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Compare FastAPI's generic response path with the fast JSON path.
+
+Part 1 times serialization alone for each route's payload: FastAPI's default
+(re-validate the returned model or run jsonable_encoder, then json.dumps)
+against ModelResponse / FastJSONResponse / a pre-encoded body.
+
+Part 2 measures end-to-end requests/sec on one worker for the same routes,
+against a copy of the handlers that return models and dicts the old way.
+
+Run with: python -m benchmarks.bench_responses
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+import httpx
+from fastapi import Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.auth.dependencies import get_current_user
+from app.auth.firebase_auth import firebase_auth
+from app.auth.models import AuthResponse, UserResponse
+from app.main import HEALTH_BODY, app
+from app.responses import FastJSONResponse, ModelResponse
+
+ITERATIONS = 20000
+CONCURRENT_CLIENTS = 16
+DURATION = 2.0
+ROUNDS = 3
+
+USER = {"id": "bench-user", "email": "bench@example.com", "first_name": "Bench", "last_name": "User",
+        "is_active": True, "created_at": "1700000000000"}
+USER_INFO = {
+    "message": "User information retrieved successfully",
+    "user": {"id": "bench-user", "email": "bench@example.com", "first_name": "Bench", "last_name": "User", "role": "user"},
+}
+HEALTH = {"status": "healthy", "message": "Authentication API is running"}
+
+
+def _default_model_path(model, adapter):
+    # What FastAPI does for a response_model: validate, dump to JSON types, encode
+    value = adapter.validate_python(model, from_attributes=True)
+    return JSONResponse(jsonable_encoder(adapter.dump_python(value, mode="json"))).body
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func()
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def serialization():
+    auth_response = AuthResponse(access_token="a" * 200, refresh_token="r" * 200, user=UserResponse(**USER))
+    user_response = UserResponse(**USER)
+    auth_adapter = TypeAdapter(AuthResponse)
+    user_adapter = TypeAdapter(UserResponse)
+
+    cases = [
+        ("/auth/login (AuthResponse)", lambda: _default_model_path(auth_response, auth_adapter),
+         lambda: ModelResponse(auth_response).body),
+        ("/auth/me (UserResponse)", lambda: _default_model_path(user_response, user_adapter),
+         lambda: ModelResponse(user_response).body),
+        ("/protected/user-info (dict)", lambda: JSONResponse(jsonable_encoder(USER_INFO)).body,
+         lambda: FastJSONResponse(USER_INFO).body),
+        ("/health (static)", lambda: JSONResponse(jsonable_encoder(HEALTH)).body,
+         lambda: HEALTH_BODY),
+    ]
+    print("serialization per response:")
+    for label, default, fast in cases:
+        assert default() == fast()
+        before, after = _time(default), _time(fast)
+        print(f"  {label:30s} default {before:6.2f}us  fast {after:6.2f}us  ({before / after:4.1f}x)")
+
+
+# The same handlers and middleware, returning models and dicts through FastAPI's generic path
+baseline_app = FastAPI()
+baseline_app.add_middleware(
+    CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"]
+)
+
+
+@baseline_app.get("/health")
+async def baseline_health():
+    return HEALTH
+
+
+@baseline_app.get("/auth/me", response_model=UserResponse)
+async def baseline_me(current_user: Dict[str, Any] = Depends(get_current_user)):
+    return UserResponse(id=current_user["uid"], email=current_user["email"], first_name=current_user["first_name"],
+                        last_name=current_user["last_name"], is_active=True, created_at="")
+
+
+@baseline_app.get("/protected/user-info")
+async def baseline_user_info(current_user: Dict[str, Any] = Depends(get_current_user)):
+    return {"message": "User information retrieved successfully", "user": {
+        "id": current_user["uid"], "email": current_user["email"], "first_name": current_user["first_name"],
+        "last_name": current_user["last_name"], "role": current_user["role"]}}
+
+
+async def requests_per_second(target, path: str, headers: Dict[str, str]) -> float:
+    completed = 0
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + DURATION
+
+        async def client_loop():
+            nonlocal completed
+            while time.perf_counter() < deadline:
+                response = await client.get(path, headers=headers)
+                assert response.status_code == 200
+                completed += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(CONCURRENT_CLIENTS)))
+        return completed / (time.perf_counter() - start)
+
+
+def end_to_end():
+    token = firebase_auth._generate_access_token("bench-user", "bench@example.com",
+                                                 {"first_name": "Bench", "last_name": "User", "role": "user"})
+    headers = {"Authorization": f"Bearer {token}"}
+    print("end-to-end requests/sec:")
+    for path in ("/health", "/auth/me", "/protected/user-info"):
+        # Interleave runs and keep the best of each, to dampen noise from the in-process client
+        before = after = 0.0
+        for _ in range(ROUNDS):
+            before = max(before, asyncio.run(requests_per_second(baseline_app, path, headers)))
+            after = max(after, asyncio.run(requests_per_second(app, path, headers)))
+        print(f"  {path:22s} default {before:8.1f}  fast {after:8.1f}  ({after / before - 1:+.1%})")
+
+
+def main():
+    serialization()
+    end_to_end()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Measure throughput of the production server (serve.py) as workers go from 1 to N.
+
+For each worker count, starts serve.py on a free port and drives it with
+LOAD_PROCESSES client processes, each holding CONNECTIONS_PER_PROCESS
+keep-alive connections, against /health and the authenticated /auth/me.
+Prints requests/sec and the speedup over one worker.
+
+The load generator runs on the same machine and competes for the same cores,
+so for a clean curve pin it elsewhere (or run it from another host) and treat
+these numbers as a lower bound.
+
+Run with: python -m benchmarks.bench_server_scaling
+Environment: BENCH_MAX_WORKERS (default: CPU count), BENCH_DURATION (seconds, default 5)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+import serve
+
+DURATION = float(os.getenv("BENCH_DURATION", "5"))
+LOAD_PROCESSES = max(serve.default_workers(), 2)
+CONNECTIONS_PER_PROCESS = 32
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker_counts() -> List[int]:
+    """1, 2, 4, ... up to the CPU count (always including it)"""
+    maximum = int(os.getenv("BENCH_MAX_WORKERS", "0")) or serve.default_workers()
+    counts, n = [], 1
+    while n < maximum:
+        counts.append(n)
+        n *= 2
+    return counts + [maximum]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _connection(port: int, request: bytes, deadline: float) -> int:
+    # Raw HTTP/1.1 keep-alive loop; a full client library would be the bottleneck
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    completed = 0
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head.startswith(b"HTTP/1.1 200"):
+                raise RuntimeError(head.split(b"\r\n", 1)[0].decode())
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            completed += 1
+    finally:
+        writer.close()
+    return completed
+
+
+def _load_process(port: int, request: bytes, deadline: float) -> int:
+    async def run():
+        counts = await asyncio.gather(*(_connection(port, request, deadline) for _ in range(CONNECTIONS_PER_PROCESS)))
+        return sum(counts)
+
+    return asyncio.run(run())
+
+
+def _request(path: str, headers: Dict[str, str]) -> bytes:
+    lines = [f"GET {path} HTTP/1.1", "Host: bench"] + [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+
+def requests_per_second(port: int, request: bytes) -> float:
+    start = time.perf_counter()
+    deadline = start + DURATION
+    with multiprocessing.Pool(LOAD_PROCESSES) as pool:
+        total = sum(pool.starmap(_load_process, [(port, request, deadline)] * LOAD_PROCESSES))
+    return total / (time.perf_counter() - start)
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), HOST="127.0.0.1", PORT=str(port), LOG_LEVEL="warning")
+    process = subprocess.Popen([sys.executable, "serve.py"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                # Give every worker time to finish starting before measuring
+                time.sleep(1.0)
+                return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("serve.py did not start")
+
+
+def main():
+    from app.auth.firebase_auth import firebase_auth
+
+    token = firebase_auth._generate_access_token("bench-user", "bench@example.com",
+                                                 {"first_name": "Bench", "last_name": "User", "role": "user"})
+    targets = {
+        "/health": _request("/health", {}),
+        "/auth/me": _request("/auth/me", {"Authorization": f"Bearer {token}"}),
+    }
+
+    print(f"{len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()} CPUs, "
+          f"{LOAD_PROCESSES} load processes x {CONNECTIONS_PER_PROCESS} connections, {DURATION:.0f}s per run")
+    baseline: Dict[str, float] = {}
+    for workers in worker_counts():
+        port = _free_port()
+        process = start_server(workers, port)
+        try:
+            for path, request in targets.items():
+                rate = requests_per_second(port, request)
+                baseline.setdefault(path, rate)
+                print(f"  workers={workers:<3d} {path:10s} {rate:10.1f} req/s  ({rate / baseline[path]:4.2f}x)")
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
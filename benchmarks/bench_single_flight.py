@@ -0,0 +1,78 @@
+"""
+Latency of a burst of concurrent /auth/verify calls with the same token right
+after login, with single-flight coalescing on and off.
+
+Run with: python -m benchmarks.bench_single_flight
+"""
+
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.executor import track_backend_calls
+
+BACKEND_LATENCY = 0.02
+BURST_SIZE = 50
+BURSTS = 10
+
+
+def _slow(result):
+    def call(*args, **kwargs):
+        time.sleep(BACKEND_LATENCY)
+        return result(*args, **kwargs)
+    call.__name__ = result.__name__
+    return call
+
+
+def verify_id_token(token):
+    return {"uid": "bench-user", "exp": time.time() + 3600}
+
+
+def get_user(uid):
+    return SimpleNamespace(uid=uid, email="bench@example.com", custom_claims={"role": "user"})
+
+
+fake_auth = SimpleNamespace(verify_id_token=_slow(verify_id_token), get_user=_slow(get_user))
+
+
+async def measure(enabled: bool):
+    service = firebase_auth_module.firebase_auth
+    service.single_flight.enabled = enabled
+    latencies = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(headers):
+            start = time.perf_counter()
+            response = await client.get("/auth/verify", headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+        with track_backend_calls() as calls:
+            for burst in range(BURSTS):
+                # A fresh token per burst, as a client would have right after login
+                service.principal_cache.clear()
+                headers = {"Authorization": f"Bearer bench-token-{burst}"}
+                await asyncio.gather(*(call(headers) for _ in range(BURST_SIZE)))
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    label = "single-flight on " if enabled else "single-flight off"
+    print(f"{label}: p50={p50:.1f}ms p99={p99:.1f}ms backend calls={calls.count}")
+
+
+def main():
+    firebase_auth_module.auth = fake_auth
+    asyncio.run(measure(enabled=False))
+    asyncio.run(measure(enabled=True))
+    firebase_auth_module.firebase_auth.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measure cold start: from a fresh interpreter to the first served responses.
+
+Each run starts a new Python process that imports app.main, runs the app's
+lifespan startup (which initializes the Admin SDK unless AUTH_INIT_ON_STARTUP
+is false), then serves /health and an authenticated /auth/me by calling the
+ASGI app directly. Reports the median of each phase over RUNS processes, with
+startup on and deferred to first use.
+
+Set BENCH_STARTUP_BUDGET_MS to exit non-zero when the median
+import-to-first-response time exceeds it, e.g. in CI.
+
+Run with: python -m benchmarks.bench_startup
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = int(os.getenv("BENCH_RUNS", "7"))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _get(app, path: str, headers) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+def child() -> None:
+    """One cold start, timed phase by phase; prints the phases as JSON"""
+    start = time.perf_counter()
+    phases = {}
+
+    from app.main import app
+    phases["import"] = time.perf_counter() - start
+
+    async def serve_first_requests():
+        async with app.router.lifespan_context(app):
+            phases["startup"] = time.perf_counter() - start
+            assert await _get(app, "/health", []) == 200
+            phases["first /health"] = time.perf_counter() - start
+            headers = [(b"authorization", f"Bearer {os.environ['BENCH_TOKEN']}".encode())]
+            assert await _get(app, "/auth/me", headers) == 200
+            phases["first /auth/me"] = time.perf_counter() - start
+
+    asyncio.run(serve_first_requests())
+    print(json.dumps({name: elapsed * 1000 for name, elapsed in phases.items()}))
+
+
+def cold_starts(env) -> dict:
+    runs = []
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+
+def main():
+    from app.auth.firebase_auth import firebase_auth
+
+    token = firebase_auth._generate_access_token("bench-user", "bench@example.com", {"role": "user"})
+    budget = float(os.getenv("BENCH_STARTUP_BUDGET_MS", "0"))
+
+    print(f"median of {RUNS} cold starts, ms since interpreter start:")
+    worst = 0.0
+    for label, init_on_startup in (("init on startup", "true"), ("init on first use", "false")):
+        env = dict(os.environ, BENCH_TOKEN=token, AUTH_INIT_ON_STARTUP=init_on_startup)
+        phases = cold_starts(env)
+        print(f"  {label}: " + "  ".join(f"{name} {ms:7.1f}" for name, ms in phases.items()))
+        worst = max(worst, phases["first /auth/me"])
+
+    if budget and worst > budget:
+        print(f"import-to-first-response {worst:.1f}ms exceeds budget {budget:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child()
+    else:
+        main()
@@ -0,0 +1,188 @@
+"""
+A deterministic stand-in for the Firebase backend, for load tests and benchmarks.
+
+FakeFirebase replaces firebase_admin.auth (verify_id_token, get_user) and the
+Identity Toolkit's accounts:signInWithPassword endpoint for a fixed set of
+users. Each call waits `latency` seconds plus up to `jitter` drawn from a
+seeded generator. Calls fail with an UNAVAILABLE error at `error_rate`, spaced
+evenly, so any run of N calls fails the same number of them. Admin SDK calls
+block their executor thread as the real SDK does; sign-in is an async HTTP
+call in the app, so the fake awaits instead.
+
+installed() patches the running service to use a FakeFirebase and restores it
+on exit. The service also gets a fresh backend guard and principal cache, built
+from the environment, so every run starts from the same state.
+"""
+
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+
+ID_TOKEN_PREFIX = "fake-id-token."
+_MISSING = object()
+
+
+class UnavailableError(Exception):
+    """What the Admin SDK raises when Firebase is down; counts against the backend"""
+
+    code = "UNAVAILABLE"
+
+
+class InvalidIdTokenError(Exception):
+    pass
+
+
+class UserNotFoundError(Exception):
+    pass
+
+
+class FakeFirebase:
+    """Users, tokens and sign-in of a Firebase project, with configurable latency and failures"""
+
+    def __init__(
+        self,
+        users: int = 1000,
+        latency: float = 0.005,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        admin_every: int = 10,
+    ):
+        self.users = users
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.admin_every = admin_every
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self._random = random.Random(seed)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    # Users
+
+    def uid(self, index: int) -> str:
+        return f"user-{index % self.users}"
+
+    def email(self, index: int) -> str:
+        return f"user{index % self.users}@example.com"
+
+    def password(self, index: int) -> str:
+        return f"password-{index % self.users}"
+
+    def id_token(self, index: int) -> str:
+        return ID_TOKEN_PREFIX + self.uid(index)
+
+    def _index(self, uid: str) -> Optional[int]:
+        number = uid[len("user-"):] if uid.startswith("user-") else ""
+        return int(number) if number.isdigit() and int(number) < self.users else None
+
+    def _claims(self, index: int) -> Dict[str, Any]:
+        role = "admin" if index % self.admin_every == 0 else "user"
+        return {"first_name": "Load", "last_name": f"User{index}", "role": role}
+
+    # firebase_admin.auth
+
+    def verify_id_token(self, id_token: str, check_revoked: bool = False) -> Dict[str, Any]:
+        self._call("verify_id_token")
+        index = self._index(id_token[len(ID_TOKEN_PREFIX):]) if id_token.startswith(ID_TOKEN_PREFIX) else None
+        if index is None:
+            raise InvalidIdTokenError("Could not verify token")
+        now = time.time()
+        return {"uid": self.uid(index), "email": self.email(index), "iat": now, "exp": now + 3600}
+
+    def get_user(self, uid: str) -> Any:
+        self._call("get_user")
+        index = self._index(uid)
+        if index is None:
+            raise UserNotFoundError(f"No user record found for the provided user ID: {uid}")
+        return SimpleNamespace(
+            uid=uid,
+            email=self.email(index),
+            disabled=False,
+            custom_claims=self._claims(index),
+            user_metadata=SimpleNamespace(creation_timestamp=1700000000000),
+        )
+
+    def _call(self, operation: str) -> None:
+        delay, failed = self._next(operation)
+        time.sleep(delay)
+        if failed:
+            raise UnavailableError(f"{operation}: fake backend unavailable")
+
+    def _next(self, operation: str):
+        with self._lock:
+            count = self._total
+            self._total += 1
+            self.calls[operation] += 1
+            # Fails the calls where the running count of expected failures ticks over
+            failed = int((count + 1) * self.error_rate) > int(count * self.error_rate)
+            if failed:
+                self.failures[operation] += 1
+            return self.latency + self._random.random() * self.jitter, failed
+
+    # Identity Toolkit accounts:signInWithPassword
+
+    async def sign_in_with_password(self, payload: Dict[str, Any]) -> httpx.Response:
+        delay, failed = self._next("sign_in_with_password")
+        await asyncio.sleep(delay)
+        if failed:
+            return httpx.Response(503, json={"error": {"code": 503, "message": "UNAVAILABLE"}})
+        email = payload.get("email", "")
+        index = self._index("user-" + email[len("user"):-len("@example.com")]) if email.endswith("@example.com") else None
+        if index is None or payload.get("password") != self.password(index):
+            return httpx.Response(400, json={"error": {"code": 400, "message": "INVALID_LOGIN_CREDENTIALS"}})
+        return httpx.Response(200, json={"localId": self.uid(index), "email": email, "idToken": self.id_token(index)})
+
+
+class FakeTransport:
+    """Answers the Identity Toolkit client's requests from a FakeFirebase"""
+
+    def __init__(self, backend: FakeFirebase):
+        self.backend = backend
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.backend.sign_in_with_password(kwargs.get("json") or {})
+
+
+@contextlib.contextmanager
+def installed(backend: FakeFirebase) -> Iterator[FakeFirebase]:
+    """Point the app's Firebase service at backend, with rate limiting off, until the block exits"""
+    from app.auth import firebase_auth as firebase_auth_module
+    from app.auth.breaker import BackendGuard
+    from app.auth.cache import PrincipalCache
+    from app.auth.identity_toolkit import IdentityToolkitClient
+    from app.auth.ratelimit import rate_limiter
+
+    service = firebase_auth_module.firebase_auth
+    guard = BackendGuard.from_env()
+    identity_toolkit = IdentityToolkitClient(api_key="fake", transport=FakeTransport(backend))
+    identity_toolkit.guard = guard
+    patches = [
+        (firebase_auth_module, "auth", backend),
+        (service, "identity_toolkit", identity_toolkit),
+        (service, "backend_guard", guard),
+        (service.executor, "guard", guard),
+        (service, "principal_cache", PrincipalCache.from_env()),
+        # Nothing to initialize: no credentials, no Admin SDK app
+        (service, "initialize", lambda: None),
+        (rate_limiter, "enabled", False),
+    ]
+    saved = [(target, name, vars(target).get(name, _MISSING)) for target, name, _ in patches]
+    for target, name, value in patches:
+        setattr(target, name, value)
+    try:
+        yield backend
+    finally:
+        for target, name, value in reversed(saved):
+            if value is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, value)
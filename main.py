@@ -1,23 +1,617 @@
-import os
+"""
+GitHub event logger, run by .github/workflows/reviewer.yml.
+
+By default only the fields a reviewer needs are printed: action, PR or issue
+number, head/base SHAs, changed-file counts and the comment body. The event
+file is memory-mapped and scanned once, front to back. Subtrees that hold no
+selected field (bodies, label and reviewer lists, repository objects) are
+skipped without being decoded, and pages already scanned are released, so
+memory stays bounded by the selected values rather than the payload.
+
+Archived events can be replayed in bulk: --replay takes a directory of JSON
+files or an NDJSON archive, summarizes the events across a process pool, and
+writes one result per event, in archive order, to an NDJSON file. Progress is
+checkpointed after every chunk; rerunning the same command resumes.
+
+With --diffs, the files a pull request changes are diffed from the local git
+checkout, between the merge base of its base and head commits and the head.
+Parsed hunks are cached in a SQLite file keyed by the pair of blob SHAs, so a
+rerun for the same PR (a comment edit, a re-requested review, a push touching
+a few files) only diffs the files whose content changed. The cache evicts the
+least recently used entries once it grows past DIFF_CACHE_MAX_MB.
+
+Run with: python main.py [--fields a.b,c.*.d] [--full] [--diffs] [event_path]
+          python main.py --replay ARCHIVE --output results.ndjson [--workers N]
+Environment: GITHUB_EVENT_NAME, GITHUB_EVENT_PATH, EVENT_FIELDS (comma-separated
+field paths), EVENT_LOG_MODE ("summary" or "full"), EVENT_MAX_VALUE_CHARS,
+EVENT_REPLAY_WORKERS, EVENT_REPLAY_CHUNK_SIZE, EVENT_DIFFS, DIFF_REPO,
+DIFF_BASE_SHA, DIFF_HEAD_SHA, DIFF_CACHE_PATH, DIFF_CACHE_MAX_MB,
+DIFF_CONTEXT_LINES.
+"""
+
+import argparse
+import contextlib
 import json
+import mmap
+import os
+import re
+import sqlite3
+import subprocess
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Dotted paths into the event; "*" matches any array index or object key
+DEFAULT_FIELDS = (
+    "action",
+    "number",
+    "issue.number",
+    "pull_request.head.sha",
+    "pull_request.base.sha",
+    "pull_request.changed_files",
+    "pull_request.additions",
+    "pull_request.deletions",
+    "comment.body",
+)
+
+# Scanned pages are handed back to the kernel once this much of the file is behind the scanner
+RELEASE_BYTES = 4 * 1024 * 1024
+
+# Text up to the next bracket, stepping over up to 16 strings without escapes. The repeat is
+# bounded because the regex engine keeps backtracking state for every repetition it makes
+_FLAT = re.compile(rb'[^\[\]{}"\\]*(?:"[^"\\]*"[^\[\]{}"\\]*){0,16}')
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+
+# Object name git reports for the missing side of an added or deleted file
+NULL_SHA = "0" * 40
+_HUNK_HEADER = re.compile(r"@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)")
+_INDEX_LINE = re.compile(r"index ([0-9a-f]+)\.\.([0-9a-f]+)")
+
+
+class EventScanner:
+    """Extracts the values at selected paths from a JSON document in one forward pass"""
+
+    def __init__(self, buffer: Any, fields: Sequence[str]):
+        self.buffer = buffer
+        self.fields = [tuple(field.split(".")) for field in fields]
+        self.values: Dict[str, Any] = {}
+        self._released = 0
+        # Start of a value being extracted; pages from here on must stay mapped
+        self._pinned: Optional[int] = None
+
+    def scan(self) -> Dict[str, Any]:
+        """Return {field: value} for every selected field present; wildcard fields map to lists"""
+        self._value(self._skip_whitespace(0), ())
+        return {field: self.values[field] for field in map(".".join, self.fields) if field in self.values}
+
+    def _value(self, pos: int, path: Tuple[str, ...]) -> int:
+        match = self._match(path)
+        if match is not None:
+            self._pinned = pos
+            end = self._value_end(pos)
+            self._pinned = None
+            self._record(match, json.loads(self.buffer[pos:end]))
+            return end
+        if not self._is_prefix(path):
+            return self._value_end(pos)
+
+        opening = self.buffer[pos:pos + 1]
+        if opening == b"{":
+            return self._members(pos + 1, path, b"}")
+        if opening == b"[":
+            return self._members(pos + 1, path, b"]")
+        return self._value_end(pos)
+
+    def _members(self, pos: int, path: Tuple[str, ...], closing: bytes) -> int:
+        buffer = self.buffer
+        index = 0
+        pos = self._skip_whitespace(pos)
+        if buffer[pos:pos + 1] == closing:
+            return pos + 1
+        while True:
+            if closing == b"}":
+                if buffer[pos:pos + 1] != b'"':
+                    raise ValueError(f"Expected an object key at byte {pos}")
+                key_end = self._string_end(pos)
+                name = json.loads(buffer[pos:key_end])
+                pos = self._skip_whitespace(key_end)
+                if buffer[pos:pos + 1] != b":":
+                    raise ValueError(f"Expected ':' at byte {pos}")
+                pos = self._value(self._skip_whitespace(pos + 1), path + (name,))
+            else:
+                pos = self._value(pos, path + (str(index),))
+                index += 1
+            self._release(pos)
+
+            pos = self._skip_whitespace(pos)
+            separator = buffer[pos:pos + 1]
+            if separator == closing:
+                return pos + 1
+            if separator != b",":
+                raise ValueError(f"Expected ',' or {closing.decode()!r} at byte {pos}")
+            pos = self._skip_whitespace(pos + 1)
+
+    def _value_end(self, pos: int) -> int:
+        """End of the value starting at pos, found without decoding it"""
+        buffer = self.buffer
+        opening = buffer[pos:pos + 1]
+        if opening == b'"':
+            return self._string_end(pos)
+        if opening not in (b"{", b"["):
+            scalar_end = _SCALAR_END.search(buffer, pos)
+            return scalar_end.start() if scalar_end else len(buffer)
+
+        depth = 0
+        while True:
+            pos = _FLAT.match(buffer, pos).end()
+            char = buffer[pos:pos + 1]
+            if char == b'"':
+                pos = self._string_end(pos)
+                continue
+            if char in (b"{", b"["):
+                depth += 1
+            elif char in (b"}", b"]"):
+                depth -= 1
+            else:
+                raise ValueError(f"Unexpected {char!r} at byte {pos}")
+            pos += 1
+            if depth == 0:
+                return pos
+            self._release(pos)
+
+    def _string_end(self, pos: int) -> int:
+        """End of the string whose opening quote is at pos"""
+        buffer = self.buffer
+        end = pos
+        while True:
+            end = buffer.find(b'"', end + 1)
+            if end < 0:
+                raise ValueError(f"Unterminated string at byte {pos}")
+            # A quote after an odd number of backslashes is escaped
+            backslashes = 0
+            while buffer[end - 1 - backslashes] == 0x5C:
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return end + 1
+
+    def _skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE.match(self.buffer, pos).end()
+
+    def _match(self, path: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+        for field in self.fields:
+            if len(field) == len(path) and all(want in ("*", got) for want, got in zip(field, path)):
+                return field
+        return None
+
+    def _is_prefix(self, path: Tuple[str, ...]) -> bool:
+        return any(
+            len(field) > len(path) and all(want in ("*", got) for want, got in zip(field, path))
+            for field in self.fields
+        )
+
+    def _record(self, field: Tuple[str, ...], value: Any) -> None:
+        name = ".".join(field)
+        if "*" in field:
+            self.values.setdefault(name, []).append(value)
+        else:
+            self.values[name] = value
+
+    def _release(self, pos: int) -> None:
+        if self._pinned is not None:
+            pos = min(pos, self._pinned)
+        if pos - self._released < RELEASE_BYTES or not hasattr(self.buffer, "madvise"):
+            return
+        end = pos - pos % mmap.PAGESIZE
+        # Clean file-backed pages: dropping them only costs a re-read, which never happens going forward
+        self.buffer.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+        self._released = end
+
+
+def summarize_event(path: str, fields: Sequence[str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+    """Scan an event file and return the values of the selected fields"""
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise ValueError("Event file is empty")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return EventScanner(buffer, fields).scan()
+
+
+def iter_archive(source: str) -> Iterator[Tuple[str, str, int, int]]:
+    """Yield (id, path, offset, length) per event: each .json file of a directory, or each NDJSON line"""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, names in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in names if name.endswith(".json"))
+        for path in sorted(paths):
+            yield os.path.relpath(path, source), path, 0, -1
+        return
+
+    offset = 0
+    with open(source, "rb") as file:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                yield str(number), source, offset, len(line)
+            offset += len(line)
+
+
+def replay_chunk(events: List[Tuple[str, str, int, int]], fields: Sequence[str]) -> bytes:
+    """Summarize a chunk of archived events in a worker process, returning their NDJSON result lines"""
+    lines = []
+    for event_id, path, offset, length in events:
+        try:
+            if length < 0:
+                summary = summarize_event(path, fields)
+            else:
+                with open(path, "rb") as file:
+                    file.seek(offset)
+                    summary = EventScanner(file.read(length), fields).scan()
+            result = {"id": event_id, "summary": summary}
+        except Exception as e:
+            result = {"id": event_id, "error": str(e)}
+        lines.append(json.dumps(result, separators=(",", ":"), ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def replay(
+    source: str,
+    output: str,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+) -> Dict[str, Any]:
+    """Summarize every event of an archive into an NDJSON file, resuming from its checkpoint if present"""
+    checkpoint_path = output + ".checkpoint"
+    run = {"source": os.path.abspath(source), "fields": list(fields)}
+    done, output_bytes = 0, 0
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as file:
+            checkpoint = json.load(file)
+        if {key: checkpoint.get(key) for key in run} != run:
+            raise ValueError(f"{checkpoint_path} belongs to a different replay; remove it to start over")
+        done, output_bytes = checkpoint["done"], checkpoint["output_bytes"]
+
+    events = iter_archive(source)
+    for _ in range(done):
+        next(events, None)
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    processed = 0
+    with open(output, "ab") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        # Drop whatever was written after the last checkpoint
+        out.truncate(output_bytes)
+        out.seek(output_bytes)
+        # A few chunks per worker in flight; results are taken in submission order
+        pending: Deque[Tuple[Future, int]] = deque()
+        while True:
+            while len(pending) < workers * 4:
+                chunk = [event for _, event in zip(range(chunk_size), events)]
+                if not chunk:
+                    break
+                pending.append((pool.submit(replay_chunk, chunk, fields), len(chunk)))
+            if not pending:
+                break
+
+            future, count = pending.popleft()
+            out.write(future.result())
+            out.flush()
+            done += count
+            processed += count
+            _write_checkpoint(checkpoint_path, {**run, "done": done, "output_bytes": out.tell()})
+
+    os.remove(checkpoint_path)
+    elapsed = time.perf_counter() - started
+    return {
+        "events": done,
+        "processed": processed,
+        "seconds": elapsed,
+        "events_per_second": processed / elapsed if elapsed else 0.0,
+    }
+
+
+def _write_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    with open(path + ".tmp", "w") as file:
+        json.dump(checkpoint, file)
+    os.replace(path + ".tmp", path)
+
+
+def git(repo: str, *args: str) -> str:
+    """Run a git command in repo and return its output"""
+    result = subprocess.run(
+        ["git", "-C", repo, "--literal-pathspecs", "-c", "core.quotePath=false", *args],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def changed_files(repo: str, base: str, head: str) -> Tuple[str, List[Tuple[str, str, str, str]]]:
+    """The merge base of base and head, and (status, old blob, new blob, path) per file head changed since"""
+    merge_base = git(repo, "merge-base", base, head).strip()
+    fields = git(repo, "diff-tree", "-r", "-z", "--no-renames", merge_base, head).split("\0")
+    files = []
+    # Each entry is ":old_mode new_mode old_blob new_blob status", then the path
+    for meta, path in zip(fields[0::2], fields[1::2]):
+        _, _, old_blob, new_blob, status = meta.lstrip(":").split(" ")
+        files.append((status, old_blob, new_blob, path))
+    return merge_base, files
+
+
+def parse_diff(text: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Split `git diff --full-index` output into {(old blob, new blob): {"binary", "hunks"}}"""
+    diffs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None
+    hunk: Optional[Dict[str, Any]] = None
+    for line in text.split("\n"):
+        if line.startswith("diff --git "):
+            current, hunk = None, None
+            continue
+        if hunk is not None:
+            # Inside hunks every content line starts with " ", "+", "-" or "\\", never "@@"
+            if not line.startswith("@@ "):
+                if line:
+                    hunk["lines"].append(line)
+                continue
+        elif current is None:
+            index = _INDEX_LINE.match(line)
+            if index:
+                current = diffs.setdefault(index.groups(), {"binary": False, "hunks": []})
+            continue
+        elif line.startswith("Binary files "):
+            current["binary"] = True
+            continue
+
+        header = _HUNK_HEADER.match(line)
+        if header and current is not None:
+            old_start, old_lines, new_start, new_lines, section = header.groups()
+            hunk = {
+                "old_start": int(old_start),
+                "old_lines": int(old_lines or 1),
+                "new_start": int(new_start),
+                "new_lines": int(new_lines or 1),
+                "section": section,
+                "lines": [],
+            }
+            current["hunks"].append(hunk)
+    return diffs
+
+
+class DiffCache:
+    """Parsed hunks in a SQLite file, keyed by blob pair, evicting least recently used entries past max_bytes"""
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS diffs ("
+                "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS diffs_used ON diffs (used)")
+        # Recency is a counter carried across runs, not a clock
+        self._clock = self._db.execute("SELECT COALESCE(MAX(used), 0) FROM diffs").fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """The cached entries among keys, marked as just used"""
+        found: Dict[str, Any] = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT key, data FROM diffs WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            for key, data in rows:
+                found[key] = json.loads(zlib.decompress(data))
+        if found:
+            self._clock += 1
+            with self._db:
+                self._db.executemany("UPDATE diffs SET used = ? WHERE key = ?", [(self._clock, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Dict[str, Any]) -> None:
+        """Store entries, then evict the least recently used ones until the cache fits in max_bytes"""
+        if not entries:
+            return
+        self._clock += 1
+        rows = []
+        for key, value in entries.items():
+            data = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+            rows.append((key, data, len(key) + len(data), self._clock))
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO diffs (key, data, size, used) VALUES (?, ?, ?, ?)", rows)
+            self._evict()
+
+    def _evict(self) -> None:
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM diffs").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM diffs ORDER BY used"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM diffs WHERE key = ?", victims)
+        self.evicted += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM diffs").fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def diff_pull_request(
+    repo: str,
+    base: str,
+    head: str,
+    cache: Optional[DiffCache] = None,
+    context: int = 3,
+) -> List[Dict[str, Any]]:
+    """Per-file hunks of the changes head makes since it forked from base, diffing only blob pairs not cached"""
+    merge_base, files = changed_files(repo, base, head)
+    keys = [f"{old_blob}:{new_blob}:U{context}" for _, old_blob, new_blob, _ in files]
+    cached = cache.get_many(keys) if cache is not None else {}
+
+    missing = [(key, file) for key, file in zip(keys, files) if key not in cached]
+    computed: Dict[str, Any] = {}
+    if missing:
+        # Name the paths only when some are cached; diffing everything needs no pathspec
+        paths = ["--"] + [path for _, (_, _, _, path) in missing] if len(missing) < len(files) else []
+        text = git(
+            repo, "diff", "--no-color", "--no-ext-diff", "--no-textconv", "--no-renames", "--full-index",
+            f"-U{context}", merge_base, head, *paths,
+        )
+        diffs = parse_diff(text)
+        for key, (_, old_blob, new_blob, _) in missing:
+            # Mode-only changes have no index line and no hunks
+            computed[key] = diffs.get((old_blob, new_blob), {"binary": False, "hunks": []})
+        if cache is not None:
+            cache.put_many(computed)
+
+    results = []
+    for key, (status, _, _, path) in zip(keys, files):
+        entry = cached.get(key) or computed[key]
+        lines = [line for hunk in entry["hunks"] for line in hunk["lines"]]
+        results.append({
+            "path": path,
+            "status": status,
+            "additions": sum(line.startswith("+") for line in lines),
+            "deletions": sum(line.startswith("-") for line in lines),
+            "binary": entry["binary"],
+            "hunks": entry["hunks"],
+            "cached": key in cached,
+        })
+    return results
+
+
+def log_diffs(args: argparse.Namespace, summary: Dict[str, Any]) -> None:
+    """Print one line per file the pull request changes"""
+    base = args.base or summary.get("pull_request.base.sha")
+    head = args.head or summary.get("pull_request.head.sha")
+    if not (base and head):
+        print("Diff: skipped, the event names no base and head commits")
+        return
+
+    started = time.perf_counter()
+    with contextlib.closing(DiffCache(args.diff_cache, args.diff_cache_mb * 1024 * 1024)) as cache:
+        files = diff_pull_request(args.repo, base, head, cache, args.context)
+    elapsed = time.perf_counter() - started
+    cached = sum(file["cached"] for file in files)
+    print(
+        f"Diff {base[:12]}...{head[:12]}: {len(files)} files, {cached} from cache, "
+        f"{len(files) - cached} computed in {elapsed * 1000:.0f}ms"
+    )
+    for file in files:
+        detail = "binary" if file["binary"] else f"{len(file['hunks'])} hunks"
+        print(f"  {file['status']} {file['path']} +{file['additions']} -{file['deletions']} ({detail})")
+
+
+def format_value(value: Any, max_chars: int) -> str:
+    """One log line's worth of a value: compact JSON, with long strings cut short"""
+    if isinstance(value, str) and len(value) > max_chars:
+        return json.dumps(value[:max_chars], ensure_ascii=False) + f" ... ({len(value) - max_chars} more chars)"
+    text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    if len(text) > max_chars:
+        return text[:max_chars] + f" ... ({len(text) - max_chars} more chars)"
+    return text
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Log a GitHub event payload")
+    parser.add_argument("event_path", nargs="?", default=os.getenv("GITHUB_EVENT_PATH"))
+    parser.add_argument(
+        "--fields",
+        default=os.getenv("EVENT_FIELDS", ",".join(DEFAULT_FIELDS)),
+        help="comma-separated dotted field paths to print; '*' matches any index or key",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        default=os.getenv("EVENT_LOG_MODE", "summary").lower() == "full",
+        help="print the whole payload instead of the selected fields",
+    )
+    parser.add_argument("--max-value-chars", type=int, default=int(os.getenv("EVENT_MAX_VALUE_CHARS", "2000")))
+    parser.add_argument("--replay", metavar="ARCHIVE", help="directory of event JSON files or an NDJSON archive")
+    parser.add_argument("--output", help="NDJSON file for replay results (default: ARCHIVE.results.ndjson)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("EVENT_REPLAY_WORKERS", "0")) or None)
+    parser.add_argument("--chunk-size", type=int, default=int(os.getenv("EVENT_REPLAY_CHUNK_SIZE", "64")))
+    parser.add_argument(
+        "--diffs",
+        action="store_true",
+        default=os.getenv("EVENT_DIFFS", "false").lower() == "true",
+        help="list the files the pull request changes, diffed from the local checkout",
+    )
+    parser.add_argument("--repo", default=os.getenv("DIFF_REPO", os.getenv("GITHUB_WORKSPACE", ".")))
+    parser.add_argument("--base", default=os.getenv("DIFF_BASE_SHA"), help="base commit (default: from the event)")
+    parser.add_argument("--head", default=os.getenv("DIFF_HEAD_SHA"), help="head commit (default: from the event)")
+    parser.add_argument("--diff-cache", default=os.getenv("DIFF_CACHE_PATH", ".diff-cache.db"))
+    parser.add_argument("--diff-cache-mb", type=int, default=int(os.getenv("DIFF_CACHE_MAX_MB", "64")))
+    parser.add_argument("--context", type=int, default=int(os.getenv("DIFF_CONTEXT_LINES", "3")))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    fields = [field.strip() for field in args.fields.split(",") if field.strip()]
+    if args.diffs:
+        fields += [field for field in ("pull_request.base.sha", "pull_request.head.sha") if field not in fields]
+    if args.replay:
+        output = args.output or args.replay.rstrip("/") + ".results.ndjson"
+        stats = replay(args.replay, output, fields, args.workers, args.chunk_size)
+        print(
+            f"Replayed {stats['processed']} events ({stats['events']} in total) into {output} "
+            f"in {stats['seconds']:.2f}s, {stats['events_per_second']:.0f} events/s"
+        )
+        return
 
-def main():
     github_event_name = os.getenv("GITHUB_EVENT_NAME")
-    github_event_path = os.getenv("GITHUB_EVENT_PATH")
 
     print(f"Received GitHub event: {github_event_name}")
 
-    if not github_event_path:
+    if not args.event_path:
         print("GITHUB_EVENT_PATH not set, cannot read event data.")
         return
 
     try:
-        with open(github_event_path, "r") as file:
-            event_data = json.load(file)
-        print("Event JSON Payload:")
-        print(json.dumps(event_data, indent=2))
+        if args.full:
+            with open(args.event_path, "r") as file:
+                event_data = json.load(file)
+            print("Event JSON Payload:")
+            print(json.dumps(event_data, indent=2))
+            return
+
+        summary = summarize_event(args.event_path, fields)
+        print("Event summary:")
+        for field, value in summary.items():
+            print(f"  {field}: {format_value(value, args.max_value_chars)}")
     except Exception as e:
         print(f"Error reading event data: {e}")
+        return
+
+    if args.diffs:
+        try:
+            log_diffs(args, summary)
+        except Exception as e:
+            print(f"Error computing diffs: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
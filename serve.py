@@ -0,0 +1,227 @@
+"""
+Production entry point.
+
+A supervisor process binds the listening socket, imports the app and parses
+the Firebase credentials once, before forking. It then forks uvicorn workers
+(uvloop event loop, httptools parser) that all accept on that socket; each
+worker initializes its own Admin SDK app and connection pools at startup.
+With more than one worker, refresh tokens, revocations and rate limits default
+to SQLite files that every worker shares; the in-memory stores are refused.
+
+Run with: python serve.py
+Signals to the supervisor:
+  SIGTERM / SIGINT  graceful shutdown (workers finish in-flight requests)
+  SIGHUP            graceful reload: re-exec with new code, start new workers,
+                    then drain the old ones; the socket stays open throughout
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+# Environment used to hand the socket and old workers to the re-executed supervisor
+LISTEN_FD_ENV = "SERVE_LISTEN_FD"
+OLD_WORKERS_ENV = "SERVE_OLD_WORKERS"
+
+# A worker that dies sooner than this after starting is crash-looping; wait before respawning
+MIN_WORKER_LIFETIME = 1.0
+
+# Stores whose state must be seen by every worker: refresh tokens (and the denylist built on them), rate limits
+SHARED_STORE_ENVS = ("AUTH_REFRESH_STORE", "AUTH_RATE_LIMIT_STORE")
+
+
+def default_workers() -> int:
+    """One worker per usable CPU, unless WEB_CONCURRENCY says otherwise"""
+    configured = os.getenv("WEB_CONCURRENCY")
+    if configured:
+        return max(int(configured), 1)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def use_shared_stores(workers: int) -> None:
+    """Default the shared stores to SQLite when several workers are forked, and refuse per-process ones"""
+    if workers <= 1:
+        return
+    for variable in SHARED_STORE_ENVS:
+        if os.environ.setdefault(variable, "sqlite").lower() == "memory":
+            # Each worker would keep its own copy: refresh tokens issued by one are unknown to the others,
+            # logouts only reach one worker and every limit is multiplied by the worker count
+            raise SystemExit(f"{variable}=memory cannot be shared by {workers} workers; use sqlite or WEB_CONCURRENCY=1")
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Bind the shared listening socket, or adopt the one inherited across a reload"""
+    inherited = os.environ.pop(LISTEN_FD_ENV, None)
+    if inherited:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def build_config(app) -> uvicorn.Config:
+    """Uvicorn settings for production, from SERVER_* environment variables"""
+    limit_concurrency = int(os.getenv("SERVER_LIMIT_CONCURRENCY", "1000"))
+    return uvicorn.Config(
+        app,
+        loop="uvloop",
+        http="httptools",
+        backlog=int(os.getenv("SERVER_BACKLOG", "2048")),
+        timeout_keep_alive=int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75")),
+        # Beyond this many connections/tasks per worker, respond 503 instead of queueing
+        limit_concurrency=limit_concurrency or None,
+        timeout_graceful_shutdown=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+        access_log=os.getenv("SERVER_ACCESS_LOG", "false").lower() == "true",
+        log_level=os.getenv("LOG_LEVEL", "info").lower(),
+        proxy_headers=True,
+        server_header=False,
+    )
+
+
+class Supervisor:
+    """Forks uvicorn workers on a shared socket, respawns crashed ones and handles reloads"""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.num_workers = workers
+        self.workers: Dict[int, float] = {}
+        self._pending_signal: Optional[int] = None
+
+    def run(self) -> None:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT, signal.SIGHUP):
+            signal.signal(sig, self._on_signal)
+
+        for _ in range(self.num_workers):
+            self.spawn()
+        print(f"Supervisor {os.getpid()} serving on {self.sock.getsockname()} with {self.num_workers} workers")
+        # Workers from before a reload keep serving until the new ones are up
+        self._retire(_pids_from_env())
+
+        while True:
+            sig, self._pending_signal = self._pending_signal, None
+            if sig == signal.SIGHUP:
+                self.reload()
+            elif sig is not None:
+                self.stop()
+                return
+            self._reap()
+            time.sleep(0.2)
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return
+
+        # Worker: uvicorn installs its own SIGINT/SIGTERM handling; hangups are the supervisor's business
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGQUIT):
+            signal.signal(sig, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        status = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.sock])
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed: {e}")
+            status = 1
+        finally:
+            os._exit(status)
+
+    def reload(self) -> None:
+        """Re-exec the supervisor in place (same pid), handing over the socket and current workers"""
+        print(f"Supervisor {os.getpid()} reloading")
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.environ[OLD_WORKERS_ENV] = ",".join(str(pid) for pid in self.workers)
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    def stop(self) -> None:
+        """Ask every worker to finish in-flight requests, then wait for them"""
+        print(f"Supervisor {os.getpid()} shutting down")
+        workers, self.workers = list(self.workers), {}
+        self._retire(workers, wait=True)
+
+    def _retire(self, pids: List[int], wait: bool = False) -> None:
+        for pid in pids:
+            _signal_worker(pid, signal.SIGTERM)
+        if not wait:
+            return
+
+        deadline = time.monotonic() + (self.config.timeout_graceful_shutdown or 30) + 5
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            remaining -= {pid for pid in remaining if _reaped(pid)}
+            time.sleep(0.1)
+        for pid in remaining:
+            _signal_worker(pid, signal.SIGKILL)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            started = self.workers.pop(pid, None)
+            if started is None:
+                # A worker retired by a reload has finished draining
+                continue
+            print(f"Worker {pid} exited; respawning")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            self.spawn()
+
+    def _on_signal(self, sig: int, frame) -> None:
+        self._pending_signal = sig
+
+
+def _pids_from_env() -> List[int]:
+    value = os.environ.pop(OLD_WORKERS_ENV, "")
+    return [int(pid) for pid in value.split(",") if pid]
+
+
+def _signal_worker(pid: int, sig: int) -> None:
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _reaped(pid: int) -> bool:
+    try:
+        return os.waitpid(pid, os.WNOHANG)[0] == pid
+    except ChildProcessError:
+        return True
+
+
+def main() -> None:
+    workers = default_workers()
+    # Stores are chosen when the app is imported, so this has to come first
+    use_shared_stores(workers)
+
+    # Preload: import the app and parse credentials once, before any worker is forked
+    from app.auth.firebase_auth import firebase_auth
+    from app.main import app
+
+    firebase_auth.load_credential()
+    config = build_config(app)
+    sock = bind_socket(os.getenv("HOST", "0.0.0.0"), int(os.getenv("PORT", "8000")), config.backlog)
+    Supervisor(config, sock, workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.denylist import AccessTokenDenylist, BloomFilter, _hash_pair
+from app.auth.refresh_tokens import MemoryRefreshTokenStore, SQLiteRefreshTokenStore
+from app.main import app
+
+
+class Clock:
+    def __init__(self, monkeypatch):
+        self.now = time.time()
+        monkeypatch.setattr(time, "time", lambda: self.now)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    for n in range(10000):
+        bloom.add(_hash_pair(f"member-{n}"))
+
+    assert all(bloom.contains(_hash_pair(f"member-{n}")) for n in range(10000))
+    false_positives = sum(bloom.contains(_hash_pair(f"other-{n}")) for n in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+
+def test_denylist_stays_exact_under_churn(monkeypatch):
+    clock = Clock(monkeypatch)
+    store = MemoryRefreshTokenStore(ttl_seconds=3600)
+    denylist = AccessTokenDenylist(store, ttl_seconds=60, capacity=200, error_rate=0.01, sync_interval=0)
+    rng = random.Random(7)
+    sessions = []
+
+    for _ in range(3000):
+        uid = f"user-{rng.randrange(50)}"
+        sid = store.issue(uid)
+        sessions.append((sid, uid, clock.now))
+        if rng.random() < 0.3:
+            store.revoke(sid)
+            denylist.revoke_session(sid)
+
+        # Present a few recent tokens, including some that have just expired
+        for sid, uid, issued_at in rng.choices(sessions[-700:], k=5):
+            if issued_at + 60 > clock.now:
+                assert denylist.is_revoked(sid, uid, issued_at) == store.is_revoked(sid, uid, issued_at)
+        clock.advance(0.1)
+
+    stats = denylist.stats()
+    # ~900 sessions were revoked over 300s; generations older than the 60s lifetime were dropped
+    assert stats["entries"] < 450
+    assert stats["generations"] >= 2
+    assert stats["filter_hits"] > 0
+
+
+def test_revoked_user_only_blocks_tokens_issued_before_logout(monkeypatch):
+    clock = Clock(monkeypatch)
+    store = MemoryRefreshTokenStore(ttl_seconds=3600)
+    denylist = AccessTokenDenylist(store, ttl_seconds=60)
+    issued_before = clock.now
+
+    clock.advance(1)
+    store.revoke_user("user-1")
+    denylist.revoke_user("user-1")
+    clock.advance(1)
+
+    assert denylist.is_revoked(None, "user-1", issued_before)
+    assert not denylist.is_revoked(None, "user-1", clock.now)
+    assert not denylist.is_revoked(None, "user-2", issued_before)
+
+    # Once every token issued before the logout has expired, the entry is dropped
+    clock.advance(61)
+    assert not denylist.is_revoked(None, "user-1", issued_before)
+    assert denylist.stats()["generations"] == 0
+
+
+def test_workers_sharing_a_store_pick_up_each_others_revocations(tmp_path):
+    path = str(tmp_path / "refresh_tokens.db")
+    worker_a = SQLiteRefreshTokenStore(path, ttl_seconds=3600)
+    worker_b = SQLiteRefreshTokenStore(path, ttl_seconds=3600)
+    denylist_b = AccessTokenDenylist(worker_b, ttl_seconds=60, sync_interval=0)
+    sid = worker_a.issue("user-1")
+
+    assert not denylist_b.is_revoked(sid, "user-1", time.time())
+    worker_a.revoke(sid)
+    assert denylist_b.is_revoked(sid, "user-1", time.time())
+
+
+class FakeAuth:
+    def get_user(self, uid):
+        return SimpleNamespace(uid=uid, email="a@example.com", disabled=False, custom_claims={"role": "user"})
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    store = MemoryRefreshTokenStore(ttl_seconds=3600)
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeAuth())
+    monkeypatch.setattr(service, "refresh_tokens", store)
+    monkeypatch.setattr(service, "denylist", AccessTokenDenylist(store, ttl_seconds=3600))
+    return service
+
+
+def _session(service, uid="user-1"):
+    sid = service.refresh_tokens.issue(uid)
+    access_token = service._generate_access_token(uid, "a@example.com", {"role": "user"}, sid)
+    return access_token, service._generate_refresh_token(uid, sid, sid)
+
+
+def _verify(access_token):
+    return TestClient(app).get("/auth/verify", headers={"Authorization": f"Bearer {access_token}"}).status_code
+
+
+def test_logout_rejects_the_sessions_access_tokens(service):
+    access_token, refresh_token = _session(service)
+    other_access_token, _ = _session(service)
+
+    TestClient(app).post("/auth/logout", json={"refresh_token": refresh_token})
+
+    assert _verify(access_token) == 401
+    assert _verify(other_access_token) == 200
+
+
+def test_refresh_token_reuse_rejects_the_sessions_access_tokens(service):
+    _, refresh_token = _session(service)
+    client = TestClient(app)
+    rotated = client.post("/auth/refresh", json={"refresh_token": refresh_token}).json()
+
+    assert _verify(rotated["access_token"]) == 200
+    assert client.post("/auth/refresh", json={"refresh_token": refresh_token}).status_code == 401
+    assert _verify(rotated["access_token"]) == 401
+
+
+def test_logout_all_rejects_every_access_token(service):
+    tokens = [_session(service)[0] for _ in range(3)]
+
+    assert TestClient(app).post("/auth/logout-all", headers={"Authorization": f"Bearer {tokens[0]}"}).status_code == 200
+    assert [_verify(token) for token in tokens] == [401, 401, 401]
+
+
+def test_logout_all_spares_sessions_started_later_in_the_same_second(service, monkeypatch):
+    clock = Clock(monkeypatch)
+    clock.now = int(clock.now) - 1 + 0.2
+    before, _ = _session(service)
+
+    clock.advance(0.3)
+    service.revoke_user_sessions("user-1")
+    clock.advance(0.3)
+    after, _ = _session(service)
+
+    assert service.verify_access_token(before) is None
+    assert service.verify_access_token(after).uid == "user-1"
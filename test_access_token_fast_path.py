@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth.dependencies import get_current_user
+from app.auth.executor import track_backend_calls
+from app.auth.firebase_auth import firebase_auth, load_jwt_secret
+
+
+def _current_user(token):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    return asyncio.run(get_current_user(credentials))
+
+
+def test_own_access_token_is_verified_without_backend_calls():
+    token = firebase_auth._generate_access_token(
+        "user-1", "a@example.com", {"first_name": "Ada", "last_name": "Lovelace", "role": "admin"}
+    )
+
+    with track_backend_calls() as calls:
+        user = _current_user(token)
+
+    assert user == {"uid": "user-1", "email": "a@example.com", "first_name": "Ada", "last_name": "Lovelace", "role": "admin"}
+    assert calls.count == 0
+
+
+@pytest.mark.parametrize("overrides", [
+    {"type": "refresh"},
+    {"iss": "someone-else"},
+    {"exp": datetime.utcnow() - timedelta(minutes=1)},
+])
+def test_invalid_access_tokens_are_rejected_in_memory(overrides):
+    payload = {
+        "user_id": "user-1",
+        "email": "a@example.com",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+        "iat": datetime.utcnow(),
+        "iss": firebase_auth.jwt_issuer,
+        "type": "access",
+    }
+    payload.update(overrides)
+    token = jwt.encode(payload, firebase_auth.jwt_secret, algorithm="HS256")
+
+    with track_backend_calls() as calls, pytest.raises(HTTPException) as exc_info:
+        _current_user(token)
+
+    assert exc_info.value.status_code == 401
+    assert calls.count == 0
+
+
+def test_placeholder_jwt_secrets_are_refused(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "your-secret-key")
+    with pytest.raises(ValueError, match="JWT_SECRET"):
+        load_jwt_secret()
+
+    monkeypatch.delenv("JWT_SECRET")
+    assert load_jwt_secret() != load_jwt_secret()
+
+
+def test_tokens_forged_with_the_old_default_secret_are_rejected():
+    payload = {
+        "user_id": "attacker",
+        "email": "a@example.com",
+        "role": "admin",
+        "exp": datetime.utcnow() + timedelta(hours=1),
+        "iat": datetime.utcnow(),
+        "iss": firebase_auth.jwt_issuer,
+        "type": "access",
+    }
+    token = jwt.encode(payload, "your-secret-key", algorithm="HS256")
+
+    with pytest.raises(HTTPException) as exc_info:
+        _current_user(token)
+    assert exc_info.value.status_code == 401
@@ -0,0 +1,118 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.breaker import BackendGuard
+from app.auth.firebase_auth import firebase_auth
+
+
+class UnavailableError(Exception):
+    pass
+
+
+class FakeImportAuth:
+    def __init__(self, failing_emails=()):
+        self.failing_emails = set(failing_emails)
+        self.batches = []
+        self.error = None
+
+    def import_users(self, users, hash_alg=None):
+        self.batches.append(users)
+        if self.error is not None:
+            raise self.error
+        errors = [
+            SimpleNamespace(index=index, reason="EMAIL_EXISTS")
+            for index, user in enumerate(users)
+            if user.email in self.failing_emails
+        ]
+        return SimpleNamespace(errors=errors)
+
+
+def _user(n, **overrides):
+    user = {"email": f"user{n}@example.com", "password": "secret123", "first_name": "User", "last_name": str(n)}
+    user.update(overrides)
+    return user
+
+
+def _headers(role="admin"):
+    token = firebase_auth._generate_access_token("admin-1", "admin@example.com", {"role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_auth(monkeypatch):
+    fake = FakeImportAuth(failing_emails={"user2@example.com"})
+    monkeypatch.setattr(firebase_auth_module, "auth", fake)
+    monkeypatch.setattr(firebase_auth, "import_chunk_size", 2)
+    monkeypatch.setattr(firebase_auth, "import_hash_rounds", 1)
+    return fake
+
+
+def test_batch_create_from_json_array(fake_auth):
+    users = [_user(1), _user(2), {"email": "not-an-email"}, _user(3, role="admin")]
+    response = TestClient(app).post("/auth/admin/users:batchCreate", json=users, headers=_headers())
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert {r["index"]: r["status"] for r in results} == {0: "created", 1: "failed", 2: "invalid", 3: "created"}
+    # Chunks are imported concurrently, so they may finish in any order
+    assert sorted(len(batch) for batch in fake_auth.batches) == [1, 2]
+    last_chunk = next(batch for batch in fake_auth.batches if len(batch) == 1)
+    assert last_chunk[0].custom_claims["role"] == "admin"
+
+
+def test_batch_create_from_ndjson(fake_auth):
+    body = "\n".join(json.dumps(_user(n)) for n in range(5)) + "\n"
+    response = TestClient(app).post(
+        "/auth/admin/users:batchCreate",
+        content=body,
+        headers={**_headers(), "Content-Type": "application/x-ndjson"},
+    )
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert sum(r["status"] == "created" for r in results) == 4
+    # Chunks are imported concurrently, so they may finish in any order
+    assert sorted(len(batch) for batch in fake_auth.batches) == [1, 2, 2]
+
+
+def test_batch_create_requires_admin(fake_auth):
+    response = TestClient(app).post("/auth/admin/users:batchCreate", json=[_user(1)], headers=_headers("user"))
+    assert response.status_code == 403
+    assert fake_auth.batches == []
+
+
+def test_invalid_records_do_not_echo_passwords(fake_auth):
+    missing_last_name = {"email": "user1@example.com", "password": "hunter2", "first_name": "User"}
+    response = TestClient(app).post("/auth/admin/users:batchCreate", json=[missing_last_name], headers=_headers())
+    assert json.loads(response.text)["status"] == "invalid"
+    assert "hunter2" not in response.text
+
+    response = TestClient(app).post(
+        "/auth/admin/users:batchCreate",
+        content='{"email": "user1@example.com", "password": "hunter2",\n',
+        headers={**_headers(), "Content-Type": "application/x-ndjson"},
+    )
+    assert json.loads(response.text)["status"] == "invalid"
+    assert "hunter2" not in response.text
+
+
+def test_backend_failures_are_reported_per_record_and_trip_the_breaker(fake_auth, monkeypatch):
+    guard = BackendGuard(min_calls=2, window=4, cooldown=60.0)
+    monkeypatch.setattr(firebase_auth.executor, "guard", guard)
+    monkeypatch.setattr(firebase_auth, "import_concurrency", 1)
+    fake_auth.error = UnavailableError("backend down")
+
+    response = TestClient(app).post("/auth/admin/users:batchCreate", json=[_user(n) for n in range(8)], headers=_headers())
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    # Every record gets a line, including those rejected once the breaker opened
+    assert [r["index"] for r in results] == list(range(8))
+    assert {r["status"] for r in results} == {"failed"}
+    assert len(fake_auth.batches) == 2
+    assert "circuit open" in results[-1]["error"]
+    assert guard.stats()["operations"]["import_users"]["state"] == "open"
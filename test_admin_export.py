@@ -0,0 +1,91 @@
+import asyncio
+import json
+import resource
+import tracemalloc
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.admin_routes import _export_users
+from app.auth.firebase_auth import firebase_auth
+
+
+class FakeListAuth:
+    """Generates users on demand so the fake backend itself holds no state"""
+
+    def __init__(self, total_users):
+        self.total_users = total_users
+        self.pages_fetched = 0
+
+    def list_users(self, page_token=None, max_results=1000):
+        self.pages_fetched += 1
+        start = int(page_token or 0)
+        end = min(start + max_results, self.total_users)
+        users = [
+            SimpleNamespace(
+                uid=f"uid-{n}",
+                email=f"user{n}@example.com",
+                disabled=n % 10 == 0,
+                custom_claims={"first_name": "User", "last_name": str(n)},
+                user_metadata=SimpleNamespace(creation_timestamp=1700000000000 + n),
+            )
+            for n in range(start, end)
+        ]
+        return SimpleNamespace(users=users, next_page_token=str(end) if end < self.total_users else None)
+
+
+def _headers(role="admin"):
+    token = firebase_auth._generate_access_token("admin-1", "admin@example.com", {"role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_export_streams_all_users_and_resumes(monkeypatch):
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeListAuth(2500))
+    client = TestClient(app)
+
+    response = client.get("/auth/admin/users:export", headers=_headers())
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2500
+    assert set(lines[0]) == {"id", "email", "first_name", "last_name", "is_active", "created_at", "page_token"}
+    assert lines[0]["is_active"] is False
+
+    resume_token = lines[1500]["page_token"]
+    response = client.get("/auth/admin/users:export", params={"page_token": resume_token}, headers=_headers())
+    resumed = [json.loads(line) for line in response.text.splitlines()]
+    assert resumed[0]["id"] == "uid-1000"
+    assert resumed[-1]["id"] == "uid-2499"
+
+
+def test_export_requires_admin(monkeypatch):
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeListAuth(10))
+    response = TestClient(app).get("/auth/admin/users:export", headers=_headers("user"))
+    assert response.status_code == 403
+
+
+def test_export_memory_stays_flat(monkeypatch):
+    total_users = 100_000
+    fake_auth = FakeListAuth(total_users)
+    monkeypatch.setattr(firebase_auth_module, "auth", fake_auth)
+
+    async def consume():
+        count = 0
+        async for chunk in _export_users(None, 1000):
+            count += chunk.count(b"\n")
+        return count
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    try:
+        exported = asyncio.run(consume())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rss_growth_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    assert exported == total_users
+    assert fake_auth.pages_fetched == total_users // 1000
+    # Two pages (current + prefetched) at a time, regardless of the total user count
+    assert peak < 8 * 1024 * 1024
+    assert rss_growth_kb < 64 * 1024
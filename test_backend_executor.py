@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.auth.executor import BackendExecutor
+
+
+def test_executor_runs_blocking_calls_concurrently():
+    executor = BackendExecutor(max_workers=8)
+
+    async def run_all():
+        return await asyncio.gather(*(executor.run(time.sleep, 0.05) for _ in range(8)))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+    executor.shutdown()
+
+    assert elapsed < 0.05 * 4
+    stats = executor.stats()
+    assert stats["completed"] == 8
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_executor_propagates_errors_and_counts_failures():
+    executor = BackendExecutor(max_workers=1)
+
+    def fail():
+        raise ValueError("backend down")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+    executor.shutdown()
+    assert executor.stats()["failed"] == 1
+
+
+def test_calls_cancelled_while_queued_leave_the_queue():
+    executor = BackendExecutor(max_workers=1)
+    release = threading.Event()
+
+    async def cancel_queued_call():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(time.sleep, 0))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queue_depth"] == 1
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        release.set()
+        await running
+
+    asyncio.run(cancel_queued_call())
+    executor.shutdown()
+    stats = executor.stats()
+    assert (stats["queue_depth"], stats["in_flight"], stats["completed"]) == (0, 0, 1)
+
+
+def test_disabled_executor_runs_inline():
+    executor = BackendExecutor(enabled=False)
+    assert asyncio.run(executor.run(lambda x: x * 2, 21)) == 42
+    assert executor.stats()["completed"] == 0
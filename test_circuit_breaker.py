@@ -0,0 +1,164 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.breaker import BackendGuard, BackendUnavailableError, CircuitBreaker
+from app.auth.cache import PrincipalCache
+from app.main import app
+
+
+class UnavailableError(Exception):
+    pass
+
+
+class InvalidIdTokenError(Exception):
+    pass
+
+
+class StubBackend:
+    """Admin SDK stand-in that adds latency and fails on demand"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def verify_id_token(self, token):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"uid": "u1", "iat": time.time(), "exp": time.time() + 3600}
+
+    def get_user(self, uid):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(uid=uid, email="u1@example.com", disabled=False, custom_claims={"role": "user"})
+
+
+def _install(monkeypatch, backend, **settings):
+    service = firebase_auth_module.firebase_auth
+    guard = BackendGuard(**{"min_calls": 4, "window": 8, "cooldown": 5.0, "slow_call_seconds": 1.0, **settings})
+    monkeypatch.setattr(service, "backend_guard", guard)
+    monkeypatch.setattr(service.executor, "guard", guard)
+    monkeypatch.setattr(service, "principal_cache", PrincipalCache(enabled=False))
+    monkeypatch.setattr(service, "claims_source", "user")
+    monkeypatch.setattr(firebase_auth_module, "auth", backend)
+    return service, guard
+
+
+def test_open_breaker_fails_fast_and_bounds_tail_latency(monkeypatch):
+    backend = StubBackend(delay=0.2, error=UnavailableError("backend down"))
+    _install(monkeypatch, backend)
+    client = TestClient(app)
+
+    latencies, statuses = [], []
+    for _ in range(30):
+        started = time.perf_counter()
+        response = client.get("/auth/me", headers={"Authorization": "Bearer id-token"})
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code)
+
+    assert backend.calls == 4
+    # Backend failures are never reported as bad credentials, before or after the breaker opens
+    assert statuses[:4] == [503] * 4
+    assert statuses[4:] == [503] * 26
+    assert response.headers["Retry-After"] in ("4", "5")
+    # Only the calls that tripped the breaker waited on the backend
+    assert sorted(latencies)[int(len(latencies) * 0.85)] < 0.1
+
+
+def test_calls_beyond_the_concurrency_limit_are_shed(monkeypatch):
+    backend = StubBackend(delay=0.2)
+    service, guard = _install(monkeypatch, backend, initial_limit=4)
+
+    async def lookup(uid):
+        started = time.perf_counter()
+        try:
+            await service.get_user(uid)
+            return "ok", time.perf_counter() - started
+        except BackendUnavailableError as e:
+            return e.reason, time.perf_counter() - started
+
+    async def burst():
+        return await asyncio.gather(*(lookup(f"user-{i}") for i in range(12)))
+
+    results = asyncio.run(burst())
+
+    assert [reason for reason, _ in results].count("ok") == 4
+    assert backend.calls == 4
+    assert max(elapsed for reason, elapsed in results if reason == "overloaded") < 0.1
+    assert guard.operation("get_user").stats()["in_flight"] == 0
+
+
+def test_open_breaker_serves_verified_principal_from_cache(monkeypatch):
+    backend = StubBackend()
+    service, guard = _install(monkeypatch, backend)
+    # Every entry is past its TTL at once, but stays usable until the token expires
+    monkeypatch.setattr(service, "principal_cache", PrincipalCache(ttl_seconds=0))
+    user = asyncio.run(service.verify_token("id-token"))
+
+    backend.error = UnavailableError("backend down")
+    guard.operation("verify_id_token").breaker._open(time.monotonic())
+
+    assert asyncio.run(service.verify_token("id-token")) == user
+    assert backend.calls == 2
+    with pytest.raises(BackendUnavailableError):
+        asyncio.run(service.verify_token("other-token"))
+
+
+def test_rejected_tokens_do_not_trip_the_breaker(monkeypatch):
+    _install(monkeypatch, StubBackend(error=InvalidIdTokenError("bad token")))
+    client = TestClient(app)
+
+    statuses = {client.get("/auth/me", headers={"Authorization": "Bearer bad"}).status_code for _ in range(10)}
+
+    assert statuses == {401}
+
+
+def test_half_open_probe_closes_the_breaker():
+    breaker = CircuitBreaker(window=4, min_calls=2, cooldown=1.0)
+    breaker.record(True, 0.0)
+    breaker.record(True, 0.0)
+
+    assert breaker.state == "open"
+    assert not breaker.allow(0.5)
+    assert breaker.allow(1.0)
+    assert not breaker.allow(1.1)
+    breaker.record(False, 1.2)
+    assert breaker.state == "closed"
+    assert breaker.allow(1.3)
+
+
+def test_backend_failures_fall_back_to_a_stale_principal_before_the_breaker_opens(monkeypatch):
+    backend = StubBackend()
+    service, guard = _install(monkeypatch, backend)
+    monkeypatch.setattr(service, "principal_cache", PrincipalCache(ttl_seconds=0))
+    user = asyncio.run(service.verify_token("id-token"))
+
+    backend.error = UnavailableError("backend down")
+
+    assert asyncio.run(service.verify_token("id-token")) == user
+    assert guard.operation("verify_id_token").breaker.state == "closed"
+    with pytest.raises(BackendUnavailableError):
+        asyncio.run(service.verify_token("other-id-token"))
+
+
+def test_login_reports_backend_failures_as_unavailable(monkeypatch):
+    backend = StubBackend(error=UnavailableError("backend down"))
+    service, _ = _install(monkeypatch, backend)
+
+    async def sign_in_with_password(email, password):
+        return {"localId": "u1"}
+
+    monkeypatch.setattr(service.identity_toolkit, "sign_in_with_password", sign_in_with_password)
+    response = TestClient(app).post("/auth/login", json={"email": "u1@example.com", "password": "secret123"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
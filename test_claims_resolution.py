@@ -0,0 +1,95 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.executor import track_backend_calls
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.clear()
+    monkeypatch.setattr(service.principal_cache, "enabled", False)
+    yield service
+
+
+class FakeAuth:
+    def __init__(self, decoded_token):
+        self.decoded_token = decoded_token
+
+    def verify_id_token(self, token):
+        return dict(self.decoded_token)
+
+    def get_user(self, uid):
+        return SimpleNamespace(
+            uid=uid,
+            email="a@example.com",
+            disabled=False,
+            custom_claims={"first_name": "Ada", "last_name": "Lovelace", "role": "admin"},
+            user_metadata=SimpleNamespace(creation_timestamp=0),
+        )
+
+    def get_user_by_email(self, email):
+        return self.get_user("a")
+
+
+def _mock_auth(monkeypatch, decoded_token):
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeAuth(decoded_token))
+
+
+def test_user_mode_makes_single_get_user(monkeypatch, service):
+    _mock_auth(monkeypatch, {"uid": "a", "iat": time.time()})
+    monkeypatch.setattr(service, "claims_source", "user")
+
+    with track_backend_calls() as calls:
+        user = asyncio.run(service.verify_token("id-token"))
+
+    assert user["role"] == "admin"
+    assert calls.operations == ["verify_id_token", "get_user"]
+
+
+def test_token_mode_reads_claims_from_token(monkeypatch, service):
+    _mock_auth(monkeypatch, {
+        "uid": "a", "email": "a@example.com", "iat": time.time(),
+        "first_name": "Ada", "last_name": "Lovelace", "role": "admin",
+    })
+    monkeypatch.setattr(service, "claims_source", "token")
+
+    with track_backend_calls() as calls:
+        user = asyncio.run(service.verify_token("id-token"))
+
+    assert user == {"uid": "a", "email": "a@example.com", "first_name": "Ada", "last_name": "Lovelace", "role": "admin"}
+    assert calls.operations == ["verify_id_token"]
+
+
+@pytest.mark.parametrize("decoded_token", [
+    {"uid": "a", "iat": time.time()},
+    {"uid": "a", "iat": time.time() - 7200, "role": "user"},
+])
+def test_token_mode_falls_back_when_claims_missing_or_stale(monkeypatch, service, decoded_token):
+    _mock_auth(monkeypatch, decoded_token)
+    monkeypatch.setattr(service, "claims_source", "token")
+
+    with track_backend_calls() as calls:
+        user = asyncio.run(service.verify_token("id-token"))
+
+    assert user["role"] == "admin"
+    assert calls.operations == ["verify_id_token", "get_user"]
+
+
+def test_sign_in_reads_claims_from_user_record(monkeypatch, service):
+    _mock_auth(monkeypatch, {})
+
+    async def sign_in_with_password(email, password):
+        return {"localId": "a", "email": email}
+
+    monkeypatch.setattr(service.identity_toolkit, "sign_in_with_password", sign_in_with_password)
+
+    with track_backend_calls() as calls:
+        result = asyncio.run(service.sign_in_user("a@example.com", "password"))
+
+    assert result["user"]["first_name"] == "Ada"
+    assert calls.operations == ["get_user"]
@@ -0,0 +1,64 @@
+import json
+
+import main
+from main import EventScanner, summarize_event
+
+
+def _event(body_size=0):
+    return {
+        "action": "opened",
+        "number": 42,
+        "pull_request": {
+            "body": 'quote " brace { bracket ] backslash \\ ' + "x" * body_size,
+            "labels": [{"name": "bug"}, {"name": "ünïcode"}],
+            "requested_reviewers": [{"login": f"user{i}", "id": i} for i in range(50)],
+            "head": {"sha": "a" * 40, "repo": {"topics": [[], {}, [{"deep": [1, 2.5, None, True]}]]}},
+            "base": {"sha": "b" * 40},
+            "changed_files": 3,
+            "additions": 120,
+            "deletions": 7,
+        },
+    }
+
+
+def test_selected_fields_match_a_full_parse(tmp_path):
+    event = _event()
+    path = tmp_path / "event.json"
+    path.write_text(json.dumps(event, indent=2))
+    fields = ["pull_request.head.sha", "pull_request.labels.*.name", "pull_request.head.repo", "comment.body"]
+
+    summary = summarize_event(str(path), fields)
+
+    assert summary == {
+        "pull_request.head.sha": event["pull_request"]["head"]["sha"],
+        "pull_request.labels.*.name": ["bug", "ünïcode"],
+        "pull_request.head.repo": event["pull_request"]["head"]["repo"],
+    }
+
+
+def test_large_payload_releases_scanned_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "RELEASE_BYTES", 1 << 16)
+    data = json.dumps(_event(body_size=1 << 20)).encode()
+    released = []
+
+    class Buffer(bytes):
+        def madvise(self, option, start, length):
+            released.append((start, length))
+
+    values = EventScanner(Buffer(data), main.DEFAULT_FIELDS).scan()
+
+    assert values["pull_request.deletions"] == 7
+    assert sum(length for _, length in released) >= 1 << 20
+
+
+def test_main_prints_compact_summary(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "event.json"
+    path.write_text(json.dumps(_event(body_size=5000)))
+    monkeypatch.setenv("GITHUB_EVENT_NAME", "pull_request")
+
+    main.main([str(path), "--fields", "action,number,pull_request.body", "--max-value-chars", "10"])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Received GitHub event: pull_request"
+    assert lines[2:4] == ['  action: "opened"', "  number: 42"]
+    assert lines[4].startswith('  pull_request.body: "quote \\" br" ... (')
@@ -0,0 +1,49 @@
+import json
+
+import main
+
+
+def _write_archive(tmp_path, count):
+    archive = tmp_path / "events.ndjson"
+    lines = [json.dumps({"action": "opened", "number": i, "pull_request": {"body": "x" * i}}) for i in range(count)]
+    lines.insert(3, "")
+    lines.insert(5, '{"action": ')
+    archive.write_text("\n".join(lines) + "\n")
+    return archive
+
+
+def _results(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_replay_writes_results_in_archive_order(tmp_path):
+    archive = _write_archive(tmp_path, 50)
+    output = tmp_path / "results.ndjson"
+
+    stats = main.replay(str(archive), str(output), ["number"], workers=2, chunk_size=4)
+
+    results = _results(output)
+    assert stats["events"] == 51
+    assert [result["id"] for result in results] == [str(n) for n in range(1, 53) if n != 4]
+    assert [result["summary"]["number"] for result in results if "summary" in result] == list(range(50))
+    assert "error" in results[4]
+    assert not (tmp_path / "results.ndjson.checkpoint").exists()
+
+
+def test_replay_resumes_from_checkpoint(tmp_path):
+    archive = _write_archive(tmp_path, 30)
+    expected_output = tmp_path / "expected.ndjson"
+    main.replay(str(archive), str(expected_output), ["number"], workers=1)
+    expected = expected_output.read_bytes()
+
+    # Interrupted after ten events, halfway through writing the eleventh result
+    output = tmp_path / "results.ndjson"
+    first_ten = b"".join(expected.splitlines(keepends=True)[:10])
+    output.write_bytes(first_ten + b'{"id":"12","summ')
+    checkpoint = {"source": str(archive), "fields": ["number"], "done": 10, "output_bytes": len(first_ten)}
+    (tmp_path / "results.ndjson.checkpoint").write_text(json.dumps(checkpoint))
+
+    stats = main.replay(str(archive), str(output), ["number"], workers=2, chunk_size=3)
+
+    assert stats["processed"] == 21
+    assert output.read_bytes() == expected
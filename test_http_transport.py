@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.auth.transport import HttpTransport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    flaky_failures = 0
+
+    def do_GET(self):
+        status = 200
+        if self.path == "/flaky" and Handler.flaky_failures > 0:
+            Handler.flaky_failures -= 1
+            status = 503
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_sync_requests_reuse_connections(server_url):
+    transport = HttpTransport(retries=0)
+    for _ in range(20):
+        assert transport.request("GET", f"{server_url}/ok").status_code == 200
+    transport.close()
+
+    rest = transport.stats()["pools"]["rest"]
+    assert rest["requests"] == 20
+    assert rest["connections_created"] == 1
+    assert rest["reuse_ratio"] == pytest.approx(0.95)
+
+
+def test_async_requests_retry_with_backoff(server_url):
+    transport = HttpTransport(retries=2, backoff_factor=0.01)
+    Handler.flaky_failures = 2
+
+    async def call():
+        return await transport.arequest("GET", f"{server_url}/flaky")
+
+    assert asyncio.run(call()).status_code == 200
+    stats = transport.stats()["pools"]["rest"]
+    assert stats["retried"] == 2
+    assert stats["connections_created"] == 1
+
+
+def test_posts_are_not_retried_on_status(server_url):
+    transport = HttpTransport(retries=2, backoff_factor=0.01)
+    session = requests.Session()
+    transport.mount(session, "admin_sdk")
+    Handler.flaky_failures = 2
+
+    async def sign_in():
+        return await transport.arequest("POST", f"{server_url}/flaky", json={})
+
+    assert asyncio.run(sign_in()).status_code == 503
+    assert session.post(f"{server_url}/flaky", timeout=transport.timeout).status_code == 503
+    assert transport.stats()["pools"]["rest"]["retried"] == 0
+    Handler.flaky_failures = 0
+
+
+def test_mounted_requests_session_is_pooled_and_retried(server_url):
+    transport = HttpTransport(pool_maxsize=4, retries=2, backoff_factor=0.01)
+    session = requests.Session()
+    transport.mount(session, "admin_sdk")
+    Handler.flaky_failures = 1
+
+    assert session.get(f"{server_url}/flaky", timeout=transport.timeout).status_code == 200
+    for _ in range(9):
+        session.get(f"{server_url}/ok", timeout=transport.timeout)
+
+    pool = transport.stats()["pools"]["admin_sdk"]
+    assert pool["connections_created"] == 1
+    assert pool["idle_connections"] == 1
+    assert pool["reuse_ratio"] > 0.8
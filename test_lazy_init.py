@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.auth.firebase_auth import firebase_auth
+
+
+def test_importing_the_app_defers_the_admin_sdk():
+    code = (
+        "import sys\n"
+        "from app.main import app\n"
+        "from app.auth.firebase_auth import firebase_auth\n"
+        "heavy = [m for m in ('firebase_admin', 'requests', 'httpx', 'google.auth') if m in sys.modules]\n"
+        "print(heavy, firebase_auth._firebase_app)\n"
+    )
+    env = dict(os.environ, JWT_SECRET="test-secret")
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[] None"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_gets_its_own_sdk_app_and_pools():
+    import firebase_admin
+
+    firebase_auth.initialize()
+    parent_app = firebase_auth._firebase_app
+    parent_pool = firebase_auth.executor._get_pool()
+    parent_client = firebase_auth.transport.client()
+
+    firebase_auth.initialize()
+    assert firebase_auth._firebase_app is parent_app
+
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            firebase_auth.initialize()
+            fresh = (
+                firebase_auth._firebase_app is not parent_app
+                and firebase_admin.get_app() is firebase_auth._firebase_app
+                and firebase_auth.executor._get_pool() is not parent_pool
+                and firebase_auth.transport.client() is not parent_client
+            )
+            status = 0 if fresh else 1
+        finally:
+            os._exit(status)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert firebase_auth._firebase_app is parent_app
+    assert firebase_admin.get_app() is parent_app
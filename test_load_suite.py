@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.auth import firebase_auth as firebase_auth_module
+from benchmarks import bench_load
+from benchmarks.fake_firebase import FakeFirebase, InvalidIdTokenError, UnavailableError
+
+
+def test_fake_backend_fails_evenly_at_its_error_rate():
+    backend = FakeFirebase(users=10, latency=0, error_rate=0.25)
+
+    outcomes = []
+    for index in range(40):
+        try:
+            backend.get_user(backend.uid(index))
+            outcomes.append("ok")
+        except UnavailableError:
+            outcomes.append("failed")
+
+    assert outcomes.count("failed") == 10
+    assert outcomes[:8] == ["ok", "ok", "ok", "failed"] * 2
+    backend.error_rate = 0
+    with pytest.raises(InvalidIdTokenError):
+        backend.verify_id_token("not-a-fake-token")
+
+
+def test_every_scenario_runs_in_process_against_the_fake():
+    backend = FakeFirebase(users=50, latency=0.001)
+
+    results = asyncio.run(bench_load.run_suite(backend, concurrency=4, requests=40, rounds=1))
+
+    assert list(results) == list(bench_load.SCENARIOS)
+    for result in results.values():
+        assert (result["requests"], result["errors"]) == (40, 0)
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    # 40 distinct ID tokens, each verified once before the principal cache takes over
+    assert backend.calls["verify_id_token"] == 40
+    assert firebase_auth_module.auth is not backend
+
+
+def test_injected_failures_are_reported_as_errors():
+    backend = FakeFirebase(users=50, latency=0, error_rate=0.5)
+
+    result = asyncio.run(bench_load.run_suite(backend, concurrency=4, requests=40, scenarios=["login"], rounds=1))["login"]
+
+    assert result["errors"] >= 20
+    assert backend.failures["sign_in_with_password"] > 0
+
+
+def test_regressions_are_measured_against_the_baseline():
+    baseline = {"login": {"rps": 1000.0, "p99_ms": 10.0, "errors": 0, "requests": 100}}
+
+    within = {"login": {"rps": 800.0, "p99_ms": 12.0, "errors": 0, "requests": 100}}
+    slower = {"login": {"rps": 600.0, "p99_ms": 20.0, "errors": 1, "requests": 100}}
+
+    assert bench_load.regressions(within, baseline, tolerance=0.3) == []
+    problems = bench_load.regressions(slower, baseline, tolerance=0.3)
+    assert [problem.split(":")[1].split()[0] for problem in problems] == ["600", "p99", "1"]
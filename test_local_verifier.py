@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.auth.breaker import BackendUnavailableError
+from app.auth.jwks import LocalTokenVerifier
+
+PROJECT_ID = "test-project"
+
+
+def _write_jwks(path, keys):
+    jwks = {"keys": []}
+    for kid, private_key in keys.items():
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+        jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+        jwks["keys"].append(jwk)
+    path.write_text(json.dumps(jwks))
+
+
+def _id_token(private_key, kid, **overrides):
+    now = int(time.time())
+    payload = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-1",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    payload.update(overrides)
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def verifier(tmp_path, signing_key):
+    key_file = tmp_path / "jwks.json"
+    _write_jwks(key_file, {"k1": signing_key})
+    verifier = LocalTokenVerifier(PROJECT_ID, key_source=str(key_file), min_refresh_interval=0)
+    assert verifier.start(wait=5)
+    yield verifier
+    verifier.stop()
+
+
+def test_verifies_valid_token(verifier, signing_key):
+    decoded = verifier.verify(_id_token(signing_key, "k1"))
+    assert decoded["uid"] == "user-1"
+
+
+@pytest.mark.parametrize("overrides", [
+    {"aud": "other-project"},
+    {"iss": "https://securetoken.google.com/other-project"},
+    {"exp": int(time.time()) - 10},
+    {"sub": ""},
+])
+def test_rejects_invalid_claims(verifier, signing_key, overrides):
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(_id_token(signing_key, "k1", **overrides))
+
+
+def test_rejects_wrong_signature(verifier):
+    other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(_id_token(other_key, "k1"))
+
+
+def test_picks_up_rotated_keys(tmp_path, verifier, signing_key):
+    verifier.verify(_id_token(signing_key, "k1"))
+    new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    _write_jwks(tmp_path / "jwks.json", {"k1": signing_key, "k2": new_key})
+
+    # An unknown kid wakes the refresher and asks the client to retry, without a fetch on the caller's thread
+    with pytest.raises(BackendUnavailableError):
+        verifier.verify(_id_token(new_key, "k2"))
+    deadline = time.time() + 5
+    while "k2" not in verifier.stats()["kids"] and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert verifier.verify(_id_token(new_key, "k2"))["uid"] == "user-1"
+    assert verifier.stats()["kids"] == ["k1", "k2"]
+
+
+def test_tokens_are_answered_with_503_until_keys_are_loaded(tmp_path, signing_key):
+    verifier = LocalTokenVerifier(PROJECT_ID, key_source=str(tmp_path / "not-written-yet.json"), min_refresh_interval=0.05)
+    try:
+        with pytest.raises(BackendUnavailableError):
+            verifier.verify(_id_token(signing_key, "k1"))
+
+        _write_jwks(tmp_path / "not-written-yet.json", {"k1": signing_key})
+        assert verifier.start(wait=5)
+        assert verifier.verify(_id_token(signing_key, "k1"))["uid"] == "user-1"
+    finally:
+        verifier.stop()
+
+
+def test_unknown_kids_never_fetch_on_the_caller_and_are_rate_limited(tmp_path, signing_key, monkeypatch):
+    key_file = tmp_path / "jwks.json"
+    _write_jwks(key_file, {"k1": signing_key})
+    verifier = LocalTokenVerifier(PROJECT_ID, key_source=str(key_file), min_refresh_interval=30)
+    loads = []
+    load_source = verifier._load_source
+
+    def counting_load_source():
+        loads.append(threading.current_thread().name)
+        return load_source()
+
+    monkeypatch.setattr(verifier, "_load_source", counting_load_source)
+    try:
+        assert verifier.start(wait=5)
+        for n in range(20):
+            with pytest.raises(jwt.InvalidTokenError):
+                verifier.verify(_id_token(signing_key, f"made-up-{n}"))
+        time.sleep(0.1)
+    finally:
+        verifier.stop()
+
+    assert loads == ["jwks-refresher"]
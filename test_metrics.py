@@ -0,0 +1,72 @@
+import time
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.main import app
+from app.metrics import AUTH_OUTCOMES, AUTH_STAGE_LATENCY, HTTP_LATENCY, Registry
+
+
+class FakeAuth:
+    def verify_id_token(self, token):
+        if token == "expired-token":
+            raise ExpiredIdTokenError("Token expired")
+        return {"uid": "a", "iat": time.time()}
+
+    def get_user(self, uid):
+        return SimpleNamespace(uid=uid, email="a@example.com", disabled=False, custom_claims={"role": "user"})
+
+
+class ExpiredIdTokenError(Exception):
+    pass
+
+
+def _stage_count(stage):
+    return AUTH_STAGE_LATENCY.labels(stage).count
+
+
+def _outcome(token_type, outcome):
+    return AUTH_OUTCOMES.labels(token_type, outcome).get()
+
+
+def test_mocked_request_records_each_stage(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    monkeypatch.setattr(service.principal_cache, "enabled", False)
+    monkeypatch.setattr(service, "claims_source", "user")
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeAuth())
+    stages = ("get_current_user", "verify_id_token", "get_user", "verify_access_token")
+    before = {stage: _stage_count(stage) for stage in stages}
+    valid, expired = _outcome("firebase", "valid"), _outcome("firebase", "expired")
+    routed = HTTP_LATENCY.labels("GET", "/auth/me", "200").count
+    client = TestClient(app)
+
+    assert client.get("/auth/me", headers={"Authorization": "Bearer id-token"}).status_code == 200
+    assert client.get("/auth/me", headers={"Authorization": "Bearer expired-token"}).status_code == 401
+
+    recorded = {stage: _stage_count(stage) - before[stage] for stage in stages}
+    assert recorded == {"get_current_user": 2, "verify_id_token": 2, "get_user": 1, "verify_access_token": 0}
+    assert (_outcome("firebase", "valid") - valid, _outcome("firebase", "expired") - expired) == (1, 1)
+    assert HTTP_LATENCY.labels("GET", "/auth/me", "200").count == routed + 1
+
+
+def test_metrics_endpoint_renders_prometheus_text():
+    response = TestClient(app).get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE auth_stage_duration_seconds histogram" in response.text
+    assert "# TYPE http_requests_in_flight gauge" in response.text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels("x").observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="x",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="x",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="x"} 3' in lines
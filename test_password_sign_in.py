@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.firebase_auth import firebase_auth
+from app.auth.identity_toolkit import IdentityToolkitClient
+
+ACCOUNTS = {"a@example.com": ("uid-a", "correct-horse")}
+
+
+class StubIdentityToolkit(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        account = ACCOUNTS.get(payload["email"])
+        if self.path.startswith("/v1/accounts:signInWithPassword") and account and account[1] == payload["password"]:
+            status, body = 200, {"localId": account[0], "email": payload["email"], "idToken": "id-token"}
+        else:
+            status, body = 400, {"error": {"code": 400, "message": "INVALID_LOGIN_CREDENTIALS"}}
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubIdentityToolkit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+
+
+@pytest.fixture
+def identity_toolkit(monkeypatch, stub_url):
+    client = IdentityToolkitClient(api_key="test-key", transport=firebase_auth.transport, base_url=stub_url)
+    monkeypatch.setattr(firebase_auth, "identity_toolkit", client)
+    monkeypatch.setattr(firebase_auth_module, "auth", SimpleNamespace(
+        get_user=lambda uid: SimpleNamespace(
+            uid=uid,
+            email="a@example.com",
+            disabled=False,
+            custom_claims={"first_name": "Ada", "last_name": "Lovelace", "role": "user"},
+            user_metadata=SimpleNamespace(creation_timestamp=1700000000000),
+        )
+    ))
+    return client
+
+
+def test_login_with_correct_password(identity_toolkit):
+    response = TestClient(app).post("/auth/login", json={"email": "a@example.com", "password": "correct-horse"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user"]["id"] == "uid-a"
+    assert firebase_auth.verify_access_token(body["access_token"])["first_name"] == "Ada"
+
+
+@pytest.mark.parametrize("email, password", [
+    ("a@example.com", "wrong"),
+    ("nobody@example.com", "correct-horse"),
+])
+def test_login_rejects_bad_credentials(identity_toolkit, email, password):
+    response = TestClient(app).post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 401
+
+
+def test_login_fails_closed_without_api_key(identity_toolkit, monkeypatch):
+    monkeypatch.setattr(identity_toolkit, "api_key", None)
+    response = TestClient(app).post("/auth/login", json={"email": "a@example.com", "password": "correct-horse"})
+    assert response.status_code == 401
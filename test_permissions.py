@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth.dependencies import require_permission, require_role
+from app.auth.firebase_auth import firebase_auth
+from app.auth.permissions import AuthorizationPolicy
+
+
+def test_roles_inherit_permissions_and_roles():
+    policy = AuthorizationPolicy({
+        "viewer": {"permissions": ["docs:read"]},
+        "editor": {"inherits": ["viewer"], "permissions": ["docs:write"]},
+        "owner": {"inherits": ["editor"], "permissions": ["*"]},
+    }, ["docs:delete"])
+
+    assert policy.has_permissions("editor", policy.permission_mask("docs:read", "docs:write"))
+    assert not policy.has_permissions("editor", policy.permission_mask("docs:delete"))
+    assert policy.has_permissions("owner", policy.permission_mask("docs:delete"))
+    assert policy.has_role("owner", "viewer")
+    assert not policy.has_role("viewer", "editor")
+    assert not policy.has_permissions("unknown-role", policy.permission_mask("docs:read"))
+
+
+def test_invalid_declarations_fail_at_compile_time():
+    with pytest.raises(ValueError, match="cycle"):
+        AuthorizationPolicy({"a": {"inherits": ["b"]}, "b": {"inherits": ["a"]}})
+    with pytest.raises(ValueError, match="Unknown role"):
+        AuthorizationPolicy({"a": {"inherits": ["missing"]}})
+    with pytest.raises(ValueError, match="Unknown permission"):
+        require_permission("no-such:permission")
+
+
+def test_dependencies_are_reused():
+    assert require_permission("resources:create") is require_permission("resources:create")
+    assert require_role("admin") is require_role("admin")
+
+
+@pytest.mark.parametrize("role, path, method, expected", [
+    ("user", "/protected/create-resource", "post", 200),
+    # Undeclared roles get no permissions, even on routes any active user could reach before
+    ("guest", "/protected/create-resource", "post", 403),
+    ("user", "/protected/delete-resource/1", "delete", 403),
+    ("admin", "/protected/delete-resource/1", "delete", 200),
+    ("user", "/protected/admin-only", "get", 403),
+    ("admin", "/protected/user-or-admin", "get", 200),
+])
+def test_protected_routes(role, path, method, expected):
+    token = firebase_auth._generate_access_token("user-1", "a@example.com", {"role": role})
+    client = TestClient(app)
+    kwargs = {"json": {"name": "thing"}} if method == "post" else {}
+    response = getattr(client, method)(path, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+    assert response.status_code == expected
@@ -0,0 +1,134 @@
+import json
+import os
+import subprocess
+
+import main
+from main import DiffCache, diff_pull_request
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+def _git(repo, *args):
+    env = {**os.environ, **GIT_ENV}
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True, env=env).stdout.strip()
+
+
+def _commit(repo, files, message):
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+        else:
+            path.write_bytes(content) if isinstance(content, bytes) else path.write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", message)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+def _lines(count, changed=()):
+    return "".join(f"line {i} changed\n" if i in changed else f"line {i}\n" for i in range(1, count + 1))
+
+
+def _repository(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _commit(repo, {"a.txt": _lines(30), "b.txt": "gone soon\n", "logo.bin": b"\x00\x01\x02", "d.txt": "d\n"}, "base")
+    _git(repo, "checkout", "-qb", "feature")
+    head = _commit(repo, {
+        "a.txt": _lines(30, changed=(2, 25)),
+        "b.txt": None,
+        "c.txt": "new\nfile\n",
+        "logo.bin": b"\x00\x01\x03",
+    }, "feature")
+    _git(repo, "checkout", "-q", "main")
+    # Moves the base branch on after the fork; the diff must not show it
+    base = _commit(repo, {"d.txt": "d changed on main\n"}, "main moves on")
+    return repo, base, head
+
+
+def test_files_are_diffed_from_the_merge_base(tmp_path):
+    repo, base, head = _repository(tmp_path)
+
+    files = {file["path"]: file for file in diff_pull_request(str(repo), base, head)}
+
+    assert sorted(files) == ["a.txt", "b.txt", "c.txt", "logo.bin"]
+    a = files["a.txt"]
+    assert (a["status"], a["additions"], a["deletions"]) == ("M", 2, 2)
+    assert [(hunk["old_start"], hunk["new_start"]) for hunk in a["hunks"]] == [(1, 1), (22, 22)]
+    assert a["hunks"][0]["lines"][:3] == [" line 1", "-line 2", "+line 2 changed"]
+    assert (files["b.txt"]["status"], files["b.txt"]["deletions"]) == ("D", 1)
+    assert (files["c.txt"]["status"], files["c.txt"]["additions"]) == ("A", 2)
+    assert files["logo.bin"]["binary"] and files["logo.bin"]["hunks"] == []
+
+
+def test_reruns_only_diff_blobs_that_changed(tmp_path, monkeypatch):
+    repo, base, head = _repository(tmp_path)
+    cache = DiffCache(str(tmp_path / "diffs.db"))
+    diffed = []
+    git = main.git
+
+    def recording_git(repo, *args):
+        if args[0] == "diff":
+            diffed.append(args[-1])
+        return git(repo, *args)
+
+    monkeypatch.setattr(main, "git", recording_git)
+
+    cold = diff_pull_request(str(repo), base, head, cache)
+    # A comment edit or re-requested review: same commits, nothing to diff
+    warm = diff_pull_request(str(repo), base, head, cache)
+    assert not any(file["cached"] for file in cold)
+    assert all(file["cached"] for file in warm)
+    assert [dict(file, cached=False) for file in warm] == cold
+    assert len(diffed) == 1
+
+    _git(repo, "checkout", "-q", "feature")
+    pushed = _commit(repo, {"c.txt": "new\nfile\nmore\n"}, "push")
+    rerun = diff_pull_request(str(repo), base, pushed, cache)
+
+    assert [file["path"] for file in rerun if not file["cached"]] == ["c.txt"]
+    assert diffed[-1] == "c.txt"
+    assert cache.stats()["hits"] == 7
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = DiffCache(str(tmp_path / "diffs.db"), max_bytes=1 << 30)
+    entry = {"binary": False, "hunks": [{"lines": ["+x" * 50]}]}
+    cache.put_many({"a": entry})
+    cache.max_bytes = cache.stats()["bytes"] * 2
+
+    cache.put_many({"b": entry})
+    cache.get_many(["a"])
+    cache.put_many({"c": entry})
+
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+    assert cache.stats()["evicted"] == 1
+    cache.close()
+
+    # Recency survives reopening the file
+    reopened = DiffCache(str(tmp_path / "diffs.db"), max_bytes=cache.max_bytes)
+    reopened.get_many(["a"])
+    reopened.put_many({"d": entry})
+    assert sorted(reopened.get_many(["a", "c", "d"])) == ["a", "d"]
+
+
+def test_main_lists_changed_files(tmp_path, capsys):
+    repo, base, head = _repository(tmp_path)
+    event = tmp_path / "event.json"
+    event.write_text(json.dumps({"action": "synchronize", "pull_request": {"base": {"sha": base}, "head": {"sha": head}}}))
+    args = [str(event), "--fields", "action", "--diffs", "--repo", str(repo), "--diff-cache", str(tmp_path / "diffs.db")]
+
+    main.main(args)
+    main.main(args)
+
+    output = capsys.readouterr().out
+    assert "4 files, 0 from cache, 4 computed" in output
+    assert "4 files, 4 from cache, 0 computed" in output
+    assert "  M a.txt +2 -2 (2 hunks)" in output
+    assert "  M logo.bin +0 -0 (binary)" in output
@@ -0,0 +1,63 @@
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.auth.cache import PrincipalCache
+from app.auth.firebase_auth import firebase_auth
+from app.auth.principal import Principal
+
+
+def test_principal_is_immutable():
+    principal = Principal("user-1", "a@example.com", "Ada", "Lovelace", "admin")
+
+    with pytest.raises(AttributeError):
+        principal.role = "user"
+    with pytest.raises(AttributeError):
+        del principal.email
+    with pytest.raises(TypeError):
+        principal["role"] = "user"
+    with pytest.raises(AttributeError):
+        principal.extra = 1
+    assert principal.role == "admin"
+
+
+def test_principal_reads_like_the_dict_it_replaced():
+    role = "".join(["ad", "min"])
+    principal = Principal.from_claims("user-1", "a@example.com", {"first_name": "Ada", "role": role})
+
+    assert principal.role is sys.intern("admin")
+    assert principal == {"uid": "user-1", "email": "a@example.com", "first_name": "Ada", "last_name": "", "role": "admin"}
+    assert principal["email"] == principal.email
+    assert principal.get("is_active", True) is True
+    with pytest.raises(KeyError):
+        principal["is_active"]
+
+
+def test_cache_hands_out_the_same_instance():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    principal = Principal("user-1", "a@example.com")
+    cache.set("token", principal)
+
+    assert cache.get("token") is principal
+    assert cache.get("token") is cache.get("token")
+
+
+def test_json_fragments_match_the_response_bodies():
+    token = firebase_auth._generate_access_token(
+        "user-1", "a@example.com", {"first_name": "Ada", "last_name": "Lovelace", "role": "admin"}
+    )
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    verify = client.get("/auth/verify", headers=headers)
+    assert verify.headers["content-type"] == "application/json"
+    assert verify.json() == {"valid": True, "user": {"id": "user-1", "email": "a@example.com", "role": "admin"}}
+    assert client.get("/auth/me", headers=headers).json() == {
+        "id": "user-1", "email": "a@example.com", "first_name": "Ada", "last_name": "Lovelace",
+        "is_active": True, "created_at": "",
+    }
+    assert client.get("/protected/user-info", headers=headers).json()["user"] == {
+        "id": "user-1", "email": "a@example.com", "first_name": "Ada", "last_name": "Lovelace", "role": "admin",
+    }
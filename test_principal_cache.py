@@ -0,0 +1,71 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.auth.cache import PrincipalCache
+from app.auth import firebase_auth as firebase_auth_module
+
+
+def _principal(uid):
+    return {"uid": uid, "email": f"{uid}@example.com", "first_name": "", "last_name": "", "role": "user"}
+
+
+def test_cache_hit_and_miss_counters():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    assert cache.get("token-a") is None
+    cache.set("token-a", _principal("a"))
+    assert cache.get("token-a")["uid"] == "a"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expires_at_token_exp_before_ttl():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.set("token-a", _principal("a"), token_exp=time.time() - 1)
+    assert cache.get("token-a") is None
+
+
+def test_cache_lru_eviction():
+    cache = PrincipalCache(max_size=2, ttl_seconds=60)
+    cache.set("token-a", _principal("a"))
+    cache.set("token-b", _principal("b"))
+    cache.get("token-a")
+    cache.set("token-c", _principal("c"))
+    assert cache.get("token-b") is None
+    assert cache.get("token-a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_evict_uid():
+    cache = PrincipalCache(max_size=10, ttl_seconds=60)
+    cache.set("token-a1", _principal("a"))
+    cache.set("token-a2", _principal("a"))
+    cache.set("token-b", _principal("b"))
+    assert cache.evict_uid("a") == 2
+    assert cache.get("token-a1") is None
+    assert cache.get("token-b") is not None
+
+
+def test_verify_token_uses_cache(monkeypatch):
+    calls = []
+    fake_auth = SimpleNamespace(
+        verify_id_token=lambda token: calls.append("verify_id_token") or {"uid": "a", "exp": time.time() + 3600},
+        get_user=lambda uid: calls.append("get_user") or SimpleNamespace(
+            uid=uid, email="a@example.com", custom_claims={"role": "admin"}
+        ),
+    )
+    monkeypatch.setattr(firebase_auth_module, "auth", fake_auth)
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.clear()
+
+    first = asyncio.run(service.verify_token("id-token"))
+    second = asyncio.run(service.verify_token("id-token"))
+
+    assert first == second
+    assert second["role"] == "admin"
+    assert calls == ["verify_id_token", "get_user"]
+
+    service.invalidate_user("a")
+    asyncio.run(service.verify_token("id-token"))
+    assert len(calls) == 4
+    service.principal_cache.clear()
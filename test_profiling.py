@@ -0,0 +1,75 @@
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.auth.firebase_auth import firebase_auth
+from app.main import app
+from app.profiling import fold_spans, profiler
+
+
+def _headers(role="admin"):
+    token = firebase_auth._generate_access_token("admin-1", "admin@example.com", {"role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "output_dir", str(tmp_path))
+    yield tmp_path
+    profiler.disable()
+
+
+def test_disabled_profiler_adds_no_work(monkeypatch, profiles):
+    async def fail(*args):
+        raise AssertionError("profiled while disabled")
+
+    monkeypatch.setattr(profiler, "profile_request", fail)
+    monkeypatch.setattr("app.profiling.random.random", lambda: pytest.fail("sampled while disabled"))
+    client = TestClient(app)
+    threads_before = set(threading.enumerate())
+
+    for _ in range(5):
+        assert client.get("/auth/me", headers=_headers()).status_code == 200
+
+    assert metrics._span_sink is None
+    assert not any(thread.name == "request-profiler" for thread in set(threading.enumerate()) - threads_before)
+    assert list(profiles.iterdir()) == []
+
+
+def test_sampled_request_writes_folded_profiles(profiles):
+    client = TestClient(app)
+    response = client.put("/auth/admin/profiling", json={"enabled": True, "sample_rate": 1.0}, headers=_headers())
+    assert response.json()["enabled"] is True
+
+    assert client.get("/auth/me", headers=_headers()).status_code == 200
+    files = client.put("/auth/admin/profiling", json={"enabled": False}, headers=_headers()).json()["files"]
+
+    assert sorted(os.path.basename(path).split("-")[0] for path in files) == ["cpu", "wall"]
+    wall = next(path for path in files if "wall-" in path)
+    with open(wall) as file:
+        stacks = [line.rsplit(" ", 1)[0] for line in file]
+    assert "GET /auth/me;get_current_user;verify_access_token" in stacks
+    assert metrics._span_sink is None
+
+
+def test_profiling_switch_requires_permission(profiles):
+    response = TestClient(app).put("/auth/admin/profiling", json={"enabled": True}, headers=_headers("user"))
+
+    assert response.status_code == 403
+    assert profiler.enabled is False
+
+
+def test_stages_nest_by_time_containment():
+    spans = [("get_current_user", 1.0, 1.5), ("verify_id_token", 1.1, 1.2), ("get_user", 1.2, 1.4)]
+
+    folded = fold_spans("GET /auth/me", 0.0, 2.0, spans)
+
+    assert folded == {
+        "GET /auth/me": 1500000,
+        "GET /auth/me;get_current_user": 200000,
+        "GET /auth/me;get_current_user;verify_id_token": 100000,
+        "GET /auth/me;get_current_user;get_user": 200000,
+    }
@@ -0,0 +1,119 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.auth import ratelimit
+from app.auth.ratelimit import MemoryRateLimitStore, RateLimit, RateLimiter, SQLiteRateLimitStore, rate_limiter
+from app.main import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_login_is_limited_per_account_with_retry_after(monkeypatch):
+    monkeypatch.setitem(rate_limiter.limits, "login_account", RateLimit("login_account", 2, 60))
+    monkeypatch.setattr(rate_limiter, "forwarded_hops", 1)
+    client = TestClient(app)
+    body = {"email": "Victim@example.com", "password": "guess"}
+    attacker = {"X-Forwarded-For": "6.6.6.6"}
+
+    statuses = [client.post("/auth/login", json=body, headers=attacker).status_code for _ in range(2)]
+    response = client.post("/auth/login", json={**body, "email": "victim@example.com"}, headers=attacker)
+    # The owner, from their own address, is not locked out by the attacker's guesses
+    owner = client.post("/auth/login", json=body, headers={"X-Forwarded-For": "203.0.113.7"})
+
+    assert 429 not in statuses
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert owner.status_code != 429
+
+
+def test_bucket_refills_evenly(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    limit = RateLimit("test", 2, 10)
+
+    assert [limit.acquire("1.2.3.4") for _ in range(2)] == [0.0, 0.0]
+    assert limit.acquire("1.2.3.4") == 5.0
+    assert limit.acquire("5.6.7.8") == 0.0
+
+    clock.now += 5
+    assert limit.acquire("1.2.3.4") == 0.0
+    assert limit.acquire("1.2.3.4") == 5.0
+
+
+def test_idle_keys_are_swept_and_refilling_keys_kept(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    store = MemoryRateLimitStore("test", 10)
+    for i in range(50):
+        store.acquire(f"idle-{i}", 1.0)
+    clock.now += 9
+    for _ in range(5):
+        store.acquire("busy", 1.0)
+
+    clock.now += 1
+    store.acquire("other", 1.0)
+    for _ in range(10):
+        store.acquire("other", 0.0)
+
+    # "busy" has 4 seconds of refill left; everything else was full and is gone
+    assert store.stats()["keys"] == 2
+    assert store.acquire("busy", 7.0) == 1.0
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    workers = [RateLimit("login_ip", 3, 60, SQLiteRateLimitStore(path, "login_ip", 60)) for _ in range(2)]
+
+    waits = [workers[i % 2].acquire("1.2.3.4") for i in range(4)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 19 < waits[3] <= 20
+    assert workers[0].store.stats()["keys"] == 1
+
+
+
+def test_shared_store_is_checked_off_the_event_loop(tmp_path):
+    store = SQLiteRateLimitStore(str(tmp_path / "rate_limits.db"), "signup_ip", 60)
+    limiter = RateLimiter({"signup_ip": RateLimit("signup_ip", 1, 60, store)})
+    on_loop = []
+    acquire = store.acquire
+
+    def recording_acquire(*args):
+        try:
+            on_loop.append(asyncio.get_running_loop() is not None)
+        except RuntimeError:
+            on_loop.append(False)
+        return acquire(*args)
+
+    store.acquire = recording_acquire
+
+    async def signups():
+        await limiter.aenforce(signup_ip="1.2.3.4")
+        with pytest.raises(HTTPException) as exc_info:
+            await limiter.aenforce(signup_ip="1.2.3.4")
+        return exc_info.value
+
+    error = asyncio.run(signups())
+
+    assert error.status_code == 429
+    assert on_loop == [False, False]
+
+
+def test_client_ip_honours_trusted_proxy_hops():
+    limiter = RateLimiter({}, forwarded_hops=1)
+    request = SimpleNamespace(
+        headers={"x-forwarded-for": "6.6.6.6, 203.0.113.7"}, client=SimpleNamespace(host="10.0.0.1")
+    )
+
+    assert limiter.client_ip(request) == "203.0.113.7"
+    assert RateLimiter({}).client_ip(request) == "10.0.0.1"
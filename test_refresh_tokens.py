@@ -0,0 +1,151 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.breaker import BackendUnavailableError
+from app.auth.refresh_tokens import MemoryRefreshTokenStore, RefreshTokenError, SQLiteRefreshTokenStore
+from app.main import app
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteRefreshTokenStore(str(tmp_path / "refresh_tokens.db"), ttl_seconds=60)
+    return MemoryRefreshTokenStore(ttl_seconds=60)
+
+
+def _rejected(store, jti, uid="user-1"):
+    with pytest.raises(RefreshTokenError) as exc_info:
+        store.rotate(jti, uid)
+    return exc_info.value.code
+
+
+def test_rotation_consumes_each_token_once(store):
+    first = store.issue("user-1")
+    second = store.rotate(first, "user-1")
+    third = store.rotate(second, "user-1")
+
+    assert len({first, second, third}) == 3
+    assert store.stats()["rotated"] == 2
+
+
+def test_reuse_revokes_the_whole_family(store):
+    first = store.issue("user-1")
+    second = store.rotate(first, "user-1")
+
+    assert _rejected(store, first) == "reused"
+    # The legitimate successor is revoked too, since we cannot tell who holds it
+    assert _rejected(store, second) == "revoked"
+    assert store.stats()["reuse_detected"] == 1
+
+
+def test_unknown_foreign_and_expired_tokens_are_rejected(store, monkeypatch):
+    jti = store.issue("user-1")
+
+    assert _rejected(store, "missing") == "unknown"
+    assert _rejected(store, jti, uid="user-2") == "unknown"
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert _rejected(store, jti) == "unknown"
+
+
+def test_revoke_ends_one_session(store):
+    session = store.issue("user-1")
+    other_session = store.issue("user-1")
+
+    store.revoke(session)
+
+    assert _rejected(store, session) == "revoked"
+    store.rotate(other_session, "user-1")
+
+
+def test_revoke_user_ends_every_earlier_session(store):
+    sessions = [store.issue("user-1") for _ in range(3)]
+    other_user = store.issue("user-2")
+
+    store.revoke_user("user-1")
+    new_session = store.issue("user-1")
+
+    assert all(_rejected(store, jti) == "revoked" for jti in sessions)
+    store.rotate(new_session, "user-1")
+    store.rotate(other_user, "user-2")
+
+
+def test_memory_store_purges_expired_entries(monkeypatch):
+    store = MemoryRefreshTokenStore(ttl_seconds=60)
+    for _ in range(10):
+        store.revoke(store.issue("user-1"))
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    store.issue("user-2")
+
+    assert store.stats()["tokens"] == 1
+    assert store.stats()["revoked_families"] == 0
+
+
+class FakeAuth:
+    def get_user(self, uid):
+        return SimpleNamespace(uid=uid, email="a@example.com", disabled=False, custom_claims={"role": "user"})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    monkeypatch.setattr(firebase_auth_module, "auth", FakeAuth())
+    monkeypatch.setattr(service, "refresh_tokens", MemoryRefreshTokenStore(ttl_seconds=60))
+    return TestClient(app)
+
+
+def _refresh(client, refresh_token):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_endpoint_rotates_and_detects_reuse(client):
+    login_token = firebase_auth_module.firebase_auth._generate_refresh_token("user-1")
+
+    response = _refresh(client, login_token)
+    assert response.status_code == 200
+    rotated = response.json()["refresh_token"]
+    assert rotated != login_token
+
+    assert _refresh(client, login_token).status_code == 401
+    assert _refresh(client, rotated).status_code == 401
+
+
+def test_refresh_that_cannot_load_the_user_leaves_the_token_usable(client, monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    refresh_token = service._generate_refresh_token("user-1")
+    get_user = service.get_user
+
+    async def shed(uid):
+        raise BackendUnavailableError("get_user", "concurrency limit reached", 1.0)
+
+    monkeypatch.setattr(service, "get_user", shed)
+    assert _refresh(client, refresh_token).status_code == 503
+
+    monkeypatch.setattr(service, "get_user", get_user)
+    assert _refresh(client, refresh_token).status_code == 200
+    assert service.refresh_tokens.stats()["reuse_detected"] == 0
+
+
+def test_logout_revokes_the_session(client):
+    refresh_token = firebase_auth_module.firebase_auth._generate_refresh_token("user-1")
+
+    assert client.post("/auth/logout", json={"refresh_token": refresh_token}).status_code == 200
+    assert _refresh(client, refresh_token).status_code == 401
+
+
+def test_logout_all_revokes_every_session(client):
+    service = firebase_auth_module.firebase_auth
+    refresh_tokens = [service._generate_refresh_token("user-1") for _ in range(2)]
+    access_token = service._generate_access_token("user-1", "a@example.com")
+
+    response = client.post("/auth/logout-all", headers={"Authorization": f"Bearer {access_token}"})
+
+    assert response.status_code == 200
+    assert all(_refresh(client, token).status_code == 401 for token in refresh_tokens)
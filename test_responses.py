@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.models import UserResponse
+from app.main import app
+from app.responses import FastJSONResponse, ModelResponse
+
+
+def test_model_response_matches_pydantic_json():
+    user = UserResponse(id="u", email="a@example.com", first_name="Ada", last_name="Lovelace", is_active=True, created_at="")
+
+    assert ModelResponse(user).body == user.model_dump_json().encode("utf-8")
+
+
+def test_fast_json_response_uses_orjson():
+    pytest.importorskip("orjson")
+
+    assert FastJSONResponse({"a": [1, 2]}).body == b'{"a":[1,2]}'
+
+
+def test_static_payloads_are_served_as_json():
+    client = TestClient(app)
+
+    health = client.get("/health")
+    root = client.get("/")
+
+    assert health.headers["content-type"] == "application/json"
+    assert health.json() == {"status": "healthy", "message": "Authentication API is running"}
+    assert root.json()["endpoints"] == {"auth": "/auth", "protected": "/protected"}
+
+
+def test_signup_keeps_its_status_code_and_schema(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    user = {"id": "u", "email": "a@example.com", "first_name": "Ada", "last_name": "Lovelace", "is_active": True, "created_at": "0"}
+
+    async def create_user(**kwargs):
+        return user
+
+    async def sign_in_user(email, password):
+        return {"access_token": "access", "refresh_token": "refresh", "user": user}
+
+    monkeypatch.setattr(service, "create_user", create_user)
+    monkeypatch.setattr(service, "sign_in_user", sign_in_user)
+
+    response = TestClient(app).post("/auth/signup", json={
+        "email": "a@example.com", "password": "secret123", "first_name": "Ada", "last_name": "Lovelace",
+    })
+
+    assert response.status_code == 201
+    assert response.json() == {"access_token": "access", "refresh_token": "refresh", "token_type": "bearer", "user": user}
@@ -0,0 +1,94 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+import serve
+from app.main import app
+
+
+def test_workers_follow_web_concurrency(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert serve.default_workers() == 3
+
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    assert serve.default_workers() >= 1
+
+
+def test_config_selects_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setenv("SERVER_BACKLOG", "512")
+    monkeypatch.setenv("SERVER_LIMIT_CONCURRENCY", "0")
+
+    config = serve.build_config(app)
+
+    assert (config.loop, config.http) == ("uvloop", "httptools")
+    assert config.backlog == 512
+    assert config.limit_concurrency is None
+
+
+def test_several_workers_share_sqlite_stores(monkeypatch):
+    for variable in serve.SHARED_STORE_ENVS:
+        monkeypatch.delenv(variable, raising=False)
+    serve.use_shared_stores(1)
+    assert all(variable not in os.environ for variable in serve.SHARED_STORE_ENVS)
+
+    serve.use_shared_stores(4)
+    assert [os.environ[variable] for variable in serve.SHARED_STORE_ENVS] == ["sqlite", "sqlite"]
+
+    monkeypatch.setenv("AUTH_RATE_LIMIT_STORE", "memory")
+    with pytest.raises(SystemExit, match="AUTH_RATE_LIMIT_STORE=memory"):
+        serve.use_shared_stores(4)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_health(url, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError(f"{url} did not become healthy")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="the supervisor forks workers")
+def test_supervisor_serves_reloads_and_shuts_down_gracefully(tmp_path):
+    port = _free_port()
+    env = dict(os.environ, WEB_CONCURRENCY="2", HOST="127.0.0.1", PORT=str(port), LOG_LEVEL="warning")
+    for variable in serve.SHARED_STORE_ENVS:
+        env.pop(variable, None)
+    env["AUTH_REFRESH_STORE_PATH"] = str(tmp_path / "refresh_tokens.db")
+    env["AUTH_RATE_LIMIT_STORE_PATH"] = str(tmp_path / "rate_limits.db")
+    process = subprocess.Popen([sys.executable, "serve.py"], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}/health"
+    try:
+        _wait_for_health(url)
+
+        # Keep a request stream going across the reload; none should fail
+        process.send_signal(signal.SIGHUP)
+        deadline = time.monotonic() + 3.0
+        while time.monotonic() < deadline:
+            assert httpx.get(url, timeout=5.0).status_code == 200
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=15) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    output = process.stdout.read().decode()
+    assert output.count("with 2 workers") == 2
+    assert "shutting down" in output
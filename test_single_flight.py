@@ -0,0 +1,82 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.auth import firebase_auth as firebase_auth_module
+from app.auth.executor import track_backend_calls
+from app.auth.singleflight import SingleFlight
+
+
+class SlowAuth:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def verify_id_token(self, token):
+        time.sleep(0.05)
+        if self.fail:
+            raise ValueError("token revoked")
+        return {"uid": "a", "exp": time.time() + 3600}
+
+    def get_user(self, uid):
+        time.sleep(0.05)
+        return SimpleNamespace(uid=uid, email="a@example.com", custom_claims={"role": "user"})
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = firebase_auth_module.firebase_auth
+    service.principal_cache.clear()
+    monkeypatch.setattr(service.principal_cache, "enabled", False)
+    return service
+
+
+def test_concurrent_verifications_share_one_backend_call(monkeypatch, service):
+    monkeypatch.setattr(firebase_auth_module, "auth", SlowAuth())
+
+    async def burst():
+        return await asyncio.gather(*(service.verify_token("same-token") for _ in range(50)))
+
+    with track_backend_calls() as calls:
+        users = asyncio.run(burst())
+
+    assert all(user["uid"] == "a" for user in users)
+    assert calls.operations == ["verify_id_token", "get_user"]
+    # Waiters share one immutable principal rather than each getting a copy
+    assert all(user is users[0] for user in users)
+    with pytest.raises(TypeError):
+        users[0]["role"] = "admin"
+
+
+def test_failures_reach_every_waiter(monkeypatch, service):
+    monkeypatch.setattr(firebase_auth_module, "auth", SlowAuth(fail=True))
+
+    async def burst():
+        return await asyncio.gather(*(service.verify_token("bad-token") for _ in range(10)))
+
+    with track_backend_calls() as calls:
+        users = asyncio.run(burst())
+
+    assert users == [None] * 10
+    assert calls.operations == ["verify_id_token"]
+
+
+def test_single_flight_propagates_exceptions_and_forgets_key():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("key", failing)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+    assert flight.stats()["in_flight"] == 0